@@ -0,0 +1,281 @@
+import asyncio
+import json
+import math
+import time
+from array import array
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.metrics import loop_lag_monitor, registry
+
+# Routes whose handlers hash or verify passwords, with the JSON body field naming the tenant.
+# Bulk create is a batch across tenants, so it is only limited per client IP.
+EXPENSIVE_ROUTES: Dict[Tuple[str, str], Optional[str]] = {
+    ("POST", "/admin/login"): "email",
+    ("POST", "/org/create"): "organization_name",
+    ("PUT", "/org/update"): "organization_name",
+    ("POST", "/org/restore"): "organization_name",
+    ("POST", "/org/bulk-create"): None,
+}
+
+
+class RateTable:
+    """Token buckets for an unbounded set of keys in a fixed amount of memory.
+
+    Each bucket is kept in GCRA form: a single float "theoretical arrival time" instead of a
+    (tokens, last refill) pair. Keys are hashed into two slots of one ``array('d')``, a
+    count-min sketch with conservative update: a key is limited on the least loaded of its
+    slots, so a collision can only make a limit stricter, never let extra requests through.
+    Memory is 8 bytes per slot, however many keys are seen.
+    """
+
+    def __init__(self, rate: float, burst: int, slots: int):
+        self.interval = 1.0 / rate
+        # A full bucket admits ``burst`` back-to-back requests
+        self.tolerance = self.interval * max(1, burst)
+        size = 1 << max(1, (slots - 1).bit_length())
+        self.mask = size - 1
+        self._arrivals = array("d", bytes(8 * size))
+
+    def acquire(self, key: str, now: float) -> float:
+        """Take one token for ``key``; returns 0 when admitted, else seconds until one is free"""
+        h = hash(key)
+        first = h & self.mask
+        second = (h >> 32) & self.mask
+        arrivals = self._arrivals
+        arrival = max(min(arrivals[first], arrivals[second]), now) + self.interval
+        wait = arrival - now - self.tolerance
+        if wait > 0:
+            return wait
+        if arrivals[first] < arrival:
+            arrivals[first] = arrival
+        if arrivals[second] < arrival:
+            arrivals[second] = arrival
+        return 0.0
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._arrivals.itemsize * len(self._arrivals)
+
+
+class ConcurrencyGate:
+    """Concurrency limit with a FIFO wait queue and queue-time based shedding.
+
+    A request is refused up front when the expected wait (queue length times the average
+    hold time over the limit) exceeds ``max_wait``, and refused after waiting ``max_wait``
+    otherwise, so queued work never outlives what a client would wait for.
+    """
+
+    def __init__(self, limit: int, max_wait: float):
+        self.limit = limit
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Exponentially weighted average of how long a slot is held
+        self.hold_time = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self) -> float:
+        if self.active < self.limit:
+            return 0.0
+        return (len(self._waiters) + 1) * self.hold_time / self.limit
+
+    async def acquire(self) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if self.expected_wait() > self.max_wait:
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the timeout fired
+                return True
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(0.0)
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+
+    def release(self, held: float):
+        if held:
+            self.hold_time = held if not self.hold_time else 0.8 * self.hold_time + 0.2 * held
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter; ``active`` is unchanged
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+# Gates of installed middleware instances (one per app), read by the gauges below
+_gates: list = []
+
+admission_decisions = registry.counter(
+    "admission_decisions_total",
+    "Admission control outcomes for password-hashing routes, by route and decision",
+    labels=("route", "decision")
+)
+admission_queue_wait = registry.histogram(
+    "admission_queue_wait_seconds",
+    "Time admitted requests waited for a concurrency slot",
+    labels=("route",)
+)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware guarding the bcrypt-heavy routes in ``EXPENSIVE_ROUTES``.
+
+    In order, a request is refused with:
+    - 503 when the event loop lags more than ``ADMISSION_MAX_LOOP_LAG_MS`` (the process is CPU bound)
+    - 429 when its client IP or its tenant (organization name, or admin email for login)
+      is over its rate
+    - 503 when the concurrency gate cannot admit it within ``ADMISSION_MAX_QUEUE_MS``
+    Every refusal carries ``Retry-After``. Other routes pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        slots = settings.admission_table_slots
+        self.ip_limits = (
+            RateTable(settings.admission_ip_rate, settings.admission_ip_burst, slots)
+            if settings.admission_ip_rate > 0 else None
+        )
+        self.tenant_limits = (
+            RateTable(settings.admission_tenant_rate, settings.admission_tenant_burst, slots)
+            if settings.admission_tenant_rate > 0 else None
+        )
+        limit = settings.admission_max_concurrent or 2 * settings.password_hash_workers
+        self.gate = ConcurrencyGate(max(1, limit), settings.admission_max_queue_ms / 1000)
+        _gates.append(self.gate)
+
+    @staticmethod
+    def _client_ip(scope) -> str:
+        if settings.admission_trust_forwarded_for:
+            for name, value in scope["headers"]:
+                if name == b"x-forwarded-for":
+                    return value.split(b",")[0].strip().decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    async def _read_body(receive) -> Tuple[list, bytes, bool]:
+        """Buffer up to ``ADMISSION_MAX_BODY_BYTES`` of the body; returns (messages, body, complete)"""
+        messages = []
+        body = b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                return messages, body, False
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                return messages, body, True
+            if len(body) > settings.admission_max_body_bytes:
+                return messages, body, False
+
+    @staticmethod
+    def _tenant_key(body: bytes, field: str) -> Optional[str]:
+        try:
+            value = json.loads(body).get(field)
+        except (ValueError, AttributeError):
+            return None
+        return value.lower() if isinstance(value, str) and value else None
+
+    async def _reject(self, scope, receive, send, route: str, decision: str, status_code: int, retry_after: float, detail: str):
+        admission_decisions.inc(route, decision)
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+        key = (scope["method"], scope["path"].rstrip("/") or "/")
+        if key not in EXPENSIVE_ROUTES:
+            await self.app(scope, receive, send)
+            return
+        route = key[1]
+
+        lag_limit = settings.admission_max_loop_lag_ms / 1000
+        if lag_limit > 0 and loop_lag_monitor.lag > lag_limit:
+            await self._reject(
+                scope, receive, send, route, "shed_loop_lag", 503, loop_lag_monitor.lag,
+                "Server is overloaded, retry later"
+            )
+            return
+
+        now = time.monotonic()
+        if self.ip_limits is not None:
+            wait = self.ip_limits.acquire(self._client_ip(scope), now)
+            if wait:
+                await self._reject(scope, receive, send, route, "ip_rate_limited", 429, wait, "Too many requests")
+                return
+
+        field = EXPENSIVE_ROUTES[key]
+        if field is not None and self.tenant_limits is not None:
+            messages, body, complete = await self._read_body(receive)
+            tenant = self._tenant_key(body, field) if complete else None
+            if tenant is not None:
+                wait = self.tenant_limits.acquire(tenant, now)
+                if wait:
+                    await self._reject(scope, receive, send, route, "tenant_rate_limited", 429, wait, "Too many requests")
+                    return
+            receive = _replay(messages, receive)
+
+        start = time.monotonic()
+        if not await self.gate.acquire():
+            await self._reject(
+                scope, receive, send, route, "shed_overload", 503,
+                self.gate.expected_wait() or self.gate.max_wait, "Server is overloaded, retry later"
+            )
+            return
+        admitted = time.monotonic()
+        admission_queue_wait.observe(admitted - start, route)
+        admission_decisions.inc(route, "admitted")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gate.release(time.monotonic() - admitted)
+
+
+def _replay(messages: list, receive):
+    """Receive callable yielding the buffered messages before reading on"""
+    pending = deque(messages)
+
+    async def replay_receive():
+        if pending:
+            return pending.popleft()
+        return await receive()
+
+    return replay_receive
+
+registry.gauge(
+    "admission_in_flight",
+    "Requests holding an admission concurrency slot",
+    callback=lambda: {(): sum(gate.active for gate in _gates)}
+)
+registry.gauge(
+    "admission_queued",
+    "Requests waiting for an admission concurrency slot",
+    callback=lambda: {(): sum(gate.queued for gate in _gates)}
+)
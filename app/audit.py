@@ -0,0 +1,398 @@
+import asyncio
+import base64
+import glob
+import json
+import os
+import re
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, Optional
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+from pymongo import DESCENDING
+from pymongo.errors import BulkWriteError, CollectionInvalid, OperationFailure
+from app.config import settings
+from app.database import db_manager
+from app.metrics import registry
+
+class AuditLog:
+    """Audit trail of organization mutations, written in batches off the request path.
+
+    ``record`` only appends to a bounded in-memory buffer. A background task writes the
+    buffer to a master-DB collection with ``insert_many`` every
+    ``AUDIT_FLUSH_INTERVAL_SECONDS``, or as soon as ``AUDIT_BATCH_SIZE`` events are waiting.
+    When the buffer is full, ``AUDIT_OVERFLOW_POLICY`` decides: ``drop`` the event, ``block``
+    the caller until there is room (up to ``AUDIT_BLOCK_TIMEOUT_MS``, then drop), or ``spill``
+    it to a per-process JSON-lines file that is replayed once the database accepts writes again.
+    """
+
+    def __init__(self):
+        self._buffer: Deque[dict] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._batch_ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._flush_lock = asyncio.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed_flushes = 0
+
+    @property
+    def collection(self):
+        return db_manager.master_collection(settings.audit_collection)
+
+    async def start(self):
+        """Create the audit collection and its index, replay spilled events, start the flusher"""
+        if not settings.audit_enabled or self._task is not None:
+            return
+        try:
+            await self._ensure_collection()
+        except Exception as e:
+            print(f"Warning: Could not prepare audit collection: {e}")
+        try:
+            await self._replay_spill()
+        except Exception as e:
+            print(f"Warning: Could not replay spilled audit events: {e}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        # Whatever the final flush could not write would be lost with the process
+        if self._buffer:
+            leftover = list(self._buffer)
+            self._buffer.clear()
+            if settings.audit_overflow_policy == "spill":
+                self._spill(leftover)
+            else:
+                self.dropped += len(leftover)
+                print(f"Warning: Dropped {len(leftover)} unwritten audit event(s) at shutdown")
+
+    async def record(self, action: str, organization_name: str, actor: Optional[str] = None, **details):
+        """Queue one audit event; never waits on the database"""
+        if not settings.audit_enabled:
+            return
+        # The _id is assigned here so a retried or replayed batch cannot write an event twice.
+        # Only plain and capped collections enforce a unique _id; on a time-series collection
+        # a retry can store a second copy, which query() skips.
+        event = {
+            "_id": ObjectId(),
+            "ts": datetime.utcnow(),
+            "organization_name": organization_name,
+            "action": action,
+            "actor": actor,
+            "details": details,
+        }
+        if len(self._buffer) >= settings.audit_queue_size:
+            policy = settings.audit_overflow_policy
+            if policy == "block":
+                if not await self._wait_for_space():
+                    self.dropped += 1
+                    return
+            elif policy == "spill":
+                self._spill([event])
+                return
+            else:
+                self.dropped += 1
+                return
+        self._buffer.append(event)
+        self.enqueued += 1
+        if len(self._buffer) >= settings.audit_batch_size:
+            self._batch_ready.set()
+
+    async def _wait_for_space(self) -> bool:
+        deadline = asyncio.get_running_loop().time() + settings.audit_block_timeout_ms / 1000
+        while len(self._buffer) >= settings.audit_queue_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return False
+            self._space.clear()
+            self._batch_ready.set()
+            try:
+                await asyncio.wait_for(self._space.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), settings.audit_flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            try:
+                await self.flush()
+                if self._buffer:
+                    continue
+                await self._replay_spill()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error flushing audit log: {e}")
+
+    async def flush(self):
+        """Write buffered events in batches of ``AUDIT_BATCH_SIZE``"""
+        async with self._flush_lock:
+            while self._buffer:
+                count = min(len(self._buffer), settings.audit_batch_size)
+                batch = [self._buffer.popleft() for _ in range(count)]
+                self._space.set()
+                try:
+                    await self._insert(batch)
+                except asyncio.CancelledError:
+                    self._requeue(batch)
+                    raise
+                except Exception as e:
+                    self.failed_flushes += 1
+                    print(f"Error writing {len(batch)} audit event(s): {e}")
+                    self._requeue(batch)
+                    return
+
+    async def _insert(self, batch: List[dict]):
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate _ids are events a previous attempt already wrote
+            details = e.details
+            if details.get("writeConcernErrors") or any(
+                error.get("code") != 11000 for error in details.get("writeErrors", [])
+            ):
+                raise
+        self.written += len(batch)
+
+    def _requeue(self, batch: List[dict]):
+        """Put a failed batch back in front of the buffer; what does not fit is spilled or dropped"""
+        room = max(0, settings.audit_queue_size - len(self._buffer))
+        self._buffer.extendleft(reversed(batch[:room]))
+        overflow = batch[room:]
+        if overflow:
+            if settings.audit_overflow_policy == "spill":
+                self._spill(overflow)
+            else:
+                self.dropped += len(overflow)
+
+    def _spill(self, events: List[dict]):
+        """Append events to the spill file (overflow path only, so a blocking write is acceptable)"""
+        try:
+            with open(self._spill_file(), "a", encoding="utf-8") as spill:
+                for event in events:
+                    spill.write(json_util.dumps(event, json_options=json_util.RELAXED_JSON_OPTIONS) + "\n")
+            self.spilled += len(events)
+        except OSError as e:
+            print(f"Error spilling audit events: {e}")
+            self.dropped += len(events)
+
+    @staticmethod
+    def _spill_file() -> str:
+        """This process's spill file; each worker appends only to its own"""
+        return f"{settings.audit_spill_path}.{os.getpid()}"
+
+    def _claim_spill(self) -> Optional[str]:
+        """Take one spill file to replay and return its new name, or None if there is nothing to do
+
+        Candidates are this process's own spill file and files left by workers that are no
+        longer running (plus the unsuffixed file of older releases). A file is claimed by
+        renaming it to ``<path>.<pid>.replay``; the rename is atomic, so only one worker wins.
+        """
+        path = settings.audit_spill_path
+        claimed = f"{self._spill_file()}.replay"
+        # A replay interrupted by a write error leaves its file behind; finish it first
+        if os.path.exists(claimed):
+            return claimed
+        pattern = re.compile(re.escape(path) + r"(?:\.(\d+))?(?:\.replay)?")
+        for candidate in sorted(glob.glob(glob.escape(path) + "*")):
+            match = pattern.fullmatch(candidate)
+            if not match:
+                continue
+            owner = match.group(1)
+            if owner is not None and int(owner) != os.getpid() and self._process_alive(int(owner)):
+                continue
+            try:
+                os.replace(candidate, claimed)
+            except FileNotFoundError:
+                # Another worker claimed it first
+                continue
+            return claimed
+        return None
+
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        if os.name == "nt":
+            # os.kill cannot probe a process on Windows; leave other workers' files alone
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    async def _replay_spill(self):
+        """Insert spilled events, removing each spill file once it is fully written"""
+        while True:
+            replaying = self._claim_spill()
+            if replaying is None:
+                return
+            try:
+                spill = await asyncio.to_thread(open, replaying, encoding="utf-8")
+                try:
+                    while True:
+                        batch = await asyncio.to_thread(self._read_spill_batch, spill, settings.audit_batch_size)
+                        if not batch:
+                            break
+                        await self._insert(batch)
+                finally:
+                    spill.close()
+                await asyncio.to_thread(os.remove, replaying)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                # Left in place and retried on the next idle flush
+                print(f"Error replaying spilled audit events: {e}")
+                return
+
+    @staticmethod
+    def _read_spill_batch(spill, size: int) -> List[dict]:
+        """Parse up to ``size`` events from an open spill file (blocking; runs in a thread)"""
+        batch = []
+        while len(batch) < size:
+            line = spill.readline()
+            if not line:
+                break
+            if line.strip():
+                batch.append(json_util.loads(line))
+        return batch
+
+    async def _ensure_collection(self):
+        master_db = db_manager.get_master_db()
+        name = settings.audit_collection
+        options = {}
+        if settings.audit_collection_type == "timeseries":
+            options["timeseries"] = {"timeField": "ts", "metaField": "organization_name", "granularity": "seconds"}
+            if settings.audit_retention_days:
+                options["expireAfterSeconds"] = settings.audit_retention_days * 86400
+        elif settings.audit_collection_type == "capped":
+            options.update(capped=True, size=settings.audit_capped_size_bytes)
+        if options:
+            try:
+                await master_db.create_collection(name, **options)
+            except CollectionInvalid:
+                pass
+            except Exception as e:
+                # Time-series collections need MongoDB 5.0+; fall back to a plain collection
+                print(f"Warning: Could not create {settings.audit_collection_type} audit collection, using a plain one: {e}")
+        # Newest-first pages per organization; _id breaks ties between events with the same ts
+        try:
+            await master_db[name].create_index(
+                [("organization_name", 1), ("ts", DESCENDING), ("_id", DESCENDING)],
+                name="organization_name_ts"
+            )
+        except OperationFailure:
+            await master_db[name].create_index(
+                [("organization_name", 1), ("ts", DESCENDING)],
+                name="organization_name_ts"
+            )
+
+    async def query(
+        self,
+        organization_name: str,
+        limit: int,
+        after: Optional[tuple] = None,
+        action: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[dict]:
+        """Up to ``limit + 1`` distinct events of an organization, newest first"""
+        conditions = [{"organization_name": organization_name}]
+        ts_range = {}
+        if since is not None:
+            ts_range["$gte"] = since
+        if until is not None:
+            ts_range["$lt"] = until
+        if ts_range:
+            conditions.append({"ts": ts_range})
+        if action:
+            conditions.append({"action": action})
+        if after is not None:
+            ts, event_id = after
+            conditions.append({"$or": [
+                {"ts": {"$lt": ts}},
+                {"ts": ts, "_id": {"$lt": event_id}}
+            ]})
+        cursor = db_manager.master_collection(settings.audit_collection, "metadata_read").find(
+            {"$and": conditions},
+            sort=[("ts", DESCENDING), ("_id", DESCENDING)],
+            batch_size=limit + 1
+        )
+        # Time-series collections may hold retried copies of an event; they sort next to each other
+        events = []
+        try:
+            async for event in cursor:
+                if events and event["_id"] == events[-1]["_id"]:
+                    continue
+                events.append(event)
+                if len(events) > limit:
+                    break
+        finally:
+            await cursor.close()
+        return events
+
+    @staticmethod
+    def encode_cursor(event: dict) -> str:
+        """Opaque keyset cursor pointing just past an event"""
+        raw = json.dumps([event["ts"].isoformat(), str(event["_id"])])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        """Return (ts, _id) from a cursor produced by encode_cursor"""
+        try:
+            ts, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(ts), ObjectId(event_id)
+        except (ValueError, TypeError, InvalidId):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._buffer)
+
+    def stats(self) -> dict:
+        """Snapshot of audit writer counters"""
+        return {
+            "queued": len(self._buffer),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+# Global audit log writer
+audit_log = AuditLog()
+
+registry.counter(
+    "audit_events_total",
+    "Audit events by outcome (enqueued, written, dropped, spilled)",
+    labels=("outcome",),
+    callback=lambda: {
+        (outcome,): getattr(audit_log, outcome) for outcome in ("enqueued", "written", "dropped", "spilled")
+    }
+)
+registry.gauge(
+    "audit_queue_depth",
+    "Audit events buffered in memory waiting for a flush",
+    callback=lambda: {(): audit_log.queue_depth}
+)
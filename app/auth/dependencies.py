@@ -1,7 +1,10 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.auth.jwt_handler import JWTHandler
+from app.auth.token_cache import revocation_list, token_cache, token_digest
+from app.profiling import verify_profile_token
 from typing import Optional
+import time
 
 security = HTTPBearer()
 
@@ -11,6 +14,20 @@ async def get_current_admin(
 ) -> dict:
     """Dependency to get current authenticated admin from JWT token"""
     token = credentials.credentials
+    digest = token_digest(token)
+    
+    # Revocations are checked before the cache so a revoked token is never served from it
+    if revocation_list.is_revoked(digest):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    cached_admin = token_cache.get(digest)
+    if cached_admin is not None:
+        return dict(cached_admin)
+    
     payload = JWTHandler.decode_access_token(token)
     
     if payload is None:
@@ -31,10 +48,32 @@ async def get_current_admin(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return {
+    current_admin = {
         "admin_id": admin_id,
         "organization_name": organization_name
     }
+    
+    # Cache the verified claims until the token expires
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        token_cache.set(digest, current_admin, ttl=ttl)
+    
+    return dict(current_admin)
+
+
+async def get_operator(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> None:
+    """Dependency for operator-only endpoints: a signed token from ``python -m app.manage profile-token``.
+
+    Organization admin tokens are not accepted, since these endpoints expose every tenant.
+    """
+    if not verify_profile_token(credentials.credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Operator token required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
 
 async def verify_org_access(
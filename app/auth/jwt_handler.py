@@ -1,3 +1,4 @@
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,6 +8,13 @@ from app.config import settings
 class JWTHandler:
     """Handles JWT token creation and validation"""
     
+    @staticmethod
+    def access_token_lifetime() -> timedelta:
+        """Lifetime of admin access tokens"""
+        if settings.jwt_expiration_hours is not None:
+            return timedelta(hours=settings.jwt_expiration_hours)
+        return timedelta(minutes=settings.access_token_expire_minutes)
+    
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token"""
@@ -14,7 +22,7 @@ class JWTHandler:
         if expires_delta:
             expire = datetime.utcnow() + expires_delta
         else:
-            expire = datetime.utcnow() + timedelta(hours=settings.jwt_expiration_hours)
+            expire = datetime.utcnow() + JWTHandler.access_token_lifetime()
         
         to_encode.update({"exp": expire})
         encoded_jwt = jwt.encode(
@@ -43,7 +51,10 @@ class JWTHandler:
         data = {
             "sub": admin_id,
             "organization_name": organization_name,
-            "type": "admin"
+            "type": "admin",
+            # Unique per token: tokens issued in the same second must not collide, or
+            # revoking one (logout) would revoke the other
+            "jti": secrets.token_urlsafe(8)
         }
         return JWTHandler.create_access_token(data)
 
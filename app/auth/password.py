@@ -1,4 +1,11 @@
+import asyncio
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from app.config import settings
+from app.metrics import password_hash_duration, registry
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -12,3 +19,126 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+
+class PasswordHasherPool:
+    """Runs bcrypt work on a bounded worker pool so it never blocks the event loop"""
+
+    def __init__(self, executor_type: str, max_workers: int, max_queue: int):
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        # Jobs submitted but not yet finished (running + waiting for a worker), tracked on the
+        # pool future so a cancelled caller does not free a slot its job still occupies
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def _get_executor(self) -> Executor:
+        """Create the executor lazily so importing this module stays cheap"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a free worker"""
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, func, *args):
+        """Run a hashing function on the pool, failing fast with 503 when saturated"""
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password hashing capacity exhausted, retry later",
+                headers={"Retry-After": "1"},
+            )
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        self.in_flight += 1
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self.in_flight -= 1
+            raise
+        future.add_done_callback(lambda done: self._schedule(loop, done, func.__name__, start))
+        # Cancelling the caller cancels a queued job; a running one keeps its slot until it finishes
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop, future: Future, name: str, start: float):
+        """Done callback (runs on a pool thread): account for the job on the event loop"""
+        try:
+            loop.call_soon_threadsafe(self._finished, future, name, start)
+        except RuntimeError:
+            # Event loop already closed (shutdown)
+            pass
+
+    def _finished(self, future: Future, name: str, start: float):
+        self.in_flight -= 1
+        if future.cancelled():
+            return
+        elapsed = time.perf_counter() - start
+        password_hash_duration.observe(elapsed, name)
+        if future.exception() is not None:
+            self.failed += 1
+            return
+        self.completed += 1
+        self.total_latency += elapsed
+        self.max_latency = max(self.max_latency, elapsed)
+
+    def stats(self) -> dict:
+        """Snapshot of pool metrics"""
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_latency_seconds": self.total_latency / self.completed if self.completed else 0.0,
+            "max_latency_seconds": self.max_latency,
+        }
+
+    def shutdown(self):
+        """Shut down the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global password hashing pool
+hasher_pool = PasswordHasherPool(
+    executor_type=settings.password_hash_executor,
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue
+)
+
+
+registry.gauge(
+    "password_hash_in_flight",
+    "Password hashing jobs running or queued on the worker pool",
+    callback=lambda: {(): hasher_pool.in_flight}
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password using bcrypt on the worker pool"""
+    return await hasher_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash on the worker pool"""
+    return await hasher_pool.run(verify_password, plain_password, hashed_password)
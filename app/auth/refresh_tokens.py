@@ -0,0 +1,59 @@
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+from app.auth.token_cache import token_digest
+from app.config import settings
+from app.database import db_manager
+
+
+class RefreshTokenStore:
+    """Opaque refresh tokens, stored only as SHA-256 digests in the master database.
+
+    The tokens are 256 random bits, so a fast digest is enough to keep a database leak from
+    yielding usable tokens; no bcrypt is needed to check them. Documents are keyed by digest
+    (a lookup is one ``_id`` index probe) and removed by a TTL index once they expire.
+    """
+
+    @property
+    def collection(self):
+        return db_manager.master_collection("refresh_tokens")
+
+    async def issue(self, admin_id: str, organization_name: str) -> str:
+        token = secrets.token_urlsafe(32)
+        now = datetime.utcnow()
+        await self.collection.insert_one({
+            "_id": token_digest(token),
+            "admin_user_id": admin_id,
+            "organization_name": organization_name,
+            "created_at": now,
+            "expires_at": now + timedelta(days=settings.refresh_token_expire_days),
+        })
+        return token
+
+    async def redeem(self, token: str) -> Optional[dict]:
+        """Return the admin claims of a valid refresh token, or None"""
+        # The TTL monitor runs about once a minute, so expiry is also checked here
+        return await self.collection.find_one(
+            {"_id": token_digest(token), "expires_at": {"$gt": datetime.utcnow()}},
+            {"_id": 0, "admin_user_id": 1, "organization_name": 1}
+        )
+
+    async def revoke(self, token: str, admin_id: str) -> bool:
+        """Revoke one of the admin's refresh tokens (logout)"""
+        result = await self.collection.delete_one({"_id": token_digest(token), "admin_user_id": admin_id})
+        return result.deleted_count > 0
+
+    async def revoke_admin(self, admin_id: str):
+        """Revoke every refresh token of an admin (credentials changed or organization deleted)"""
+        await self.collection.delete_many({"admin_user_id": admin_id})
+
+    async def rename_organization(self, admin_id: str, new_organization_name: str):
+        """Keep refresh tokens issued during a background rename pointing at the new name"""
+        await self.collection.update_many(
+            {"admin_user_id": admin_id},
+            {"$set": {"organization_name": new_organization_name}}
+        )
+
+
+# Global refresh token store
+refresh_tokens = RefreshTokenStore()
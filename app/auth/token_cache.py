@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from app.auth.jwt_handler import JWTHandler
+from app.cache import TTLCache
+from app.config import settings
+from app.database import db_manager
+from app.metrics import track_cache
+
+
+def token_digest(token: str) -> str:
+    """Stable digest used to key tokens without keeping them in memory or the database"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# Verified token payloads keyed by token digest; each entry expires at the token's exp
+token_cache = TTLCache(
+    maxsize=settings.token_cache_size,
+    ttl=JWTHandler.access_token_lifetime().total_seconds(),
+    name="tokens"
+)
+track_cache(token_cache)
+
+
+class TokenRevocationList:
+    """In-memory set of revoked token digests, synced incrementally from the master database"""
+
+    def __init__(self):
+        self._revoked: Dict[str, datetime] = {}
+        self._synced_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self):
+        return db_manager.get_master_db()["revoked_tokens"]
+
+    def is_revoked(self, digest: str) -> bool:
+        """Check the local revocation set (no database round trip)"""
+        return digest in self._revoked
+
+    async def revoke(self, token: str, expires_at: datetime):
+        """Revoke a token until it expires"""
+        digest = token_digest(token)
+        # revoked_at comes from the server clock, which every worker syncs against
+        await self.collection.update_one(
+            {"_id": digest},
+            {"$set": {"expires_at": expires_at}, "$currentDate": {"revoked_at": True}},
+            upsert=True
+        )
+        self._revoked[digest] = expires_at
+        token_cache.invalidate(digest)
+
+    async def refresh(self):
+        """Pull revocations recorded since the last sync and drop expired ones"""
+        now = datetime.utcnow()
+        query = {"expires_at": {"$gt": now}}
+        if self._synced_until is not None:
+            # _synced_until is the newest server-assigned revoked_at seen; the overlap covers
+            # revocations that were stamped earlier but committed after the last sync
+            overlap = timedelta(seconds=settings.token_revocation_sync_overlap_seconds)
+            query["revoked_at"] = {"$gte": self._synced_until - overlap}
+        async for doc in self.collection.find(query, {"expires_at": 1, "revoked_at": 1}):
+            self._revoked[doc["_id"]] = doc["expires_at"]
+            revoked_at = doc.get("revoked_at")
+            if revoked_at is not None and (self._synced_until is None or revoked_at > self._synced_until):
+                self._synced_until = revoked_at
+
+        for digest in [d for d, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[digest]
+
+    async def start(self):
+        """Load the revocation set and keep it in sync in the background"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"Warning: Could not load token revocations: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(settings.token_revocation_refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing token revocations: {e}")
+
+
+# Global token revocation list
+revocation_list = TokenRevocationList()
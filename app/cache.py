@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from app.config import settings
+from app.metrics import track_cache
+
+
+class TTLCache:
+    """Bounded in-process LRU cache with per-entry TTL and request coalescing"""
+
+    def __init__(self, maxsize: int, ttl: float, name: str = "cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # Bumped on every invalidation so loads that raced with a write are not stored
+        self._generation = 0
+        # Called with (cache, keys) on local invalidations, e.g. to broadcast them to other workers
+        self._listeners: List[Callable[["TTLCache", tuple], None]] = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value or None, counting hits and misses"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys: Hashable, propagate: bool = True):
+        """Drop keys from the cache and detach any in-flight loads for them"""
+        self._generation += 1
+        for key in keys:
+            self._data.pop(key, None)
+            self._inflight.pop(key, None)
+        if propagate:
+            for listener in self._listeners:
+                listener(self, keys)
+
+    def add_listener(self, listener: Callable[["TTLCache", tuple], None]):
+        """Register a callback for local invalidations"""
+        self._listeners.append(listener)
+
+    def clear(self):
+        """Drop every entry"""
+        self._generation += 1
+        self._data.clear()
+        self._inflight.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value or load it, sharing one load among concurrent callers"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # The load runs as its own task so a cancelled caller does not abort it for the others
+            task = asyncio.ensure_future(self._load(key, loader, self._generation))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        try:
+            value = await loader()
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+        if generation == self._generation and value is not None:
+            self.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        """Snapshot of cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+        }
+
+
+# Organization metadata keyed by organization_name
+org_cache = TTLCache(
+    maxsize=settings.org_cache_size,
+    ttl=settings.org_cache_ttl_seconds,
+    name="organizations"
+)
+
+# Known tenant collections (collection name -> True), refreshed on create and drop
+collection_cache = TTLCache(
+    maxsize=settings.collection_registry_size,
+    ttl=settings.collection_registry_ttl_seconds,
+    name="collections"
+)
+
+track_cache(org_cache)
+track_cache(collection_cache)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -7,8 +7,152 @@ class Settings(BaseSettings):
     master_db_name: str = "master_db"
     jwt_secret_key: str = "your-secret-key-change-this-in-production"
     jwt_algorithm: str = "HS256"
-    jwt_expiration_hours: int = 24
-    
+    # Access tokens are short-lived; clients renew them at /admin/refresh without re-hashing
+    access_token_expire_minutes: int = 15
+    refresh_token_expire_days: int = 30
+    jwt_expiration_hours: Optional[int] = None  # deprecated: when set, overrides access_token_expire_minutes
+
+    # Connection pool (applies to every cluster client)
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_max_idle_time_ms: int = 0  # 0 keeps idle connections open
+
+    # Per-operation-class read preference and write concern ("" = server default).
+    # "metadata" covers master-DB writes and read-your-writes lookups and is the client default;
+    # "metadata_read" covers staleness-tolerant reads (get/list organization);
+    # "migration" covers tenant collection copies.
+    metadata_write_concern: str = ""  # e.g. "majority"
+    metadata_read_preference: str = "primary"  # e.g. "secondaryPreferred"
+    metadata_read_max_staleness_seconds: int = -1  # -1 = no bound; MongoDB requires at least 90
+    migration_write_concern: str = "1"
+
+    # Multi-document transactions: "auto" (when the deployment supports them) or "off"
+    transactions_mode: str = "auto"
+
+    # Tenant placement: "shared" (master database), "db_per_tenant" or "hashed"
+    tenancy_strategy: str = "shared"
+    tenant_db_prefix: str = "tenant_"
+    tenancy_hash_buckets: int = 16
+    # Extra clusters for hashed placement (JSON list in the environment); the primary is mongodb_url
+    tenant_cluster_urls: List[str] = []
+
+    # Password hashing worker pool ("thread" or "process")
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+
+    # Collection migration (organization rename)
+    migration_batch_size: int = 1000
+    migration_max_inflight_batches: int = 4
+    migration_writer_concurrency: int = 2
+
+    # Background jobs (async rename/delete)
+    job_max_concurrency: int = 2
+    job_max_documents_per_second: int = 5000  # 0 disables throttling
+    job_lease_seconds: int = 60
+    job_sweep_interval_seconds: float = 30.0  # 0 only resumes jobs at startup
+
+    # Bulk organization provisioning
+    bulk_create_max_items: int = 10000
+    bulk_create_chunk_size: int = 500
+    bulk_create_collection_concurrency: int = 16
+
+    # Organization listing page sizes
+    org_list_default_limit: int = 50
+    org_list_max_limit: int = 500
+
+    # Tenant data API (/org/{name}/data)
+    tenant_data_bulk_max_operations: int = 100000
+    tenant_data_bulk_chunk_size: int = 1000
+    tenant_data_max_reported_errors: int = 1000
+    tenant_data_max_line_bytes: int = 16 * 1024 * 1024  # MongoDB's maximum document size
+    tenant_data_query_default_limit: int = 100
+    tenant_data_query_max_limit: int = 10000
+    tenant_data_query_batch_size: int = 500
+    tenant_data_query_max_time_ms: int = 5000
+    tenant_data_max_indexes: int = 20
+
+    # Tenant snapshots (/org/{name}/export and /import)
+    snapshot_chunk_bytes: int = 4 * 1024 * 1024  # uncompressed BSON per chunk
+    snapshot_compression: str = "zlib"  # "zlib" or "none"
+    snapshot_compression_level: int = 1
+    snapshot_max_inflight_chunks: int = 4
+    snapshot_max_frame_bytes: int = 64 * 1024 * 1024
+
+    # Organization metadata cache (0 disables caching)
+    org_cache_size: int = 10000
+    org_cache_ttl_seconds: float = 30.0
+
+    # In-memory registry of known tenant collections
+    collection_registry_size: int = 100000
+    collection_registry_ttl_seconds: float = 300.0
+
+    # Cross-worker cache invalidation ("auto", "change_stream", "tailable" or "off")
+    invalidation_bus_mode: str = "auto"
+    invalidation_bus_collection: str = "cache_invalidations"
+    invalidation_bus_size_bytes: int = 1048576
+    invalidation_bus_retry_seconds: float = 1.0
+    invalidation_bus_resume_overlap_seconds: float = 5.0
+
+    # Verified JWT cache (0 disables caching), revocation sync interval and overlap window
+    token_cache_size: int = 10000
+    token_revocation_refresh_seconds: float = 5.0
+    token_revocation_sync_overlap_seconds: float = 30.0
+
+    # Routers whose responses skip re-validation and are serialized in one pass (orjson if installed)
+    fast_json_routers: List[str] = ["organization", "auth", "tenant_data", "snapshot", "audit"]
+
+    # /metrics endpoint and event loop lag probe interval (0 disables the probe)
+    metrics_enabled: bool = True
+    metrics_loop_lag_interval_seconds: float = 0.5
+
+    # Soft delete: deleted organizations can be restored for this long (0 = delete immediately)
+    trash_retention_hours: float = 72
+    trash_purge_interval_seconds: float = 60  # 0 disables the purger in this worker
+    trash_purge_window: str = ""  # UTC quiet period "HH:MM-HH:MM" for purges; empty = any time
+    trash_purge_max_loop_lag_ms: float = 50  # pause purges while the event loop lags more than this; 0 = never
+    trash_purge_drop_max_documents: int = 10000  # smaller trashed collections are dropped in one step
+    trash_purge_batch_size: int = 1000
+    trash_purge_documents_per_second: int = 5000  # 0 disables throttling
+
+    # Audit log of organization mutations, written in batches by a background task
+    audit_enabled: bool = True
+    audit_collection: str = "audit_log"
+    audit_collection_type: str = "timeseries"  # timeseries | capped | plain
+    audit_retention_days: int = 365  # time-series expiry; 0 keeps events forever
+    audit_capped_size_bytes: int = 268435456
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_interval_seconds: float = 1.0
+    audit_overflow_policy: str = "spill"  # drop | block | spill
+    audit_block_timeout_ms: float = 1000
+    audit_spill_path: str = "audit_spill.jsonl"  # each worker appends to <path>.<pid>
+    audit_query_default_limit: int = 100
+    audit_query_max_limit: int = 1000
+
+    # Admission control for the password-hashing routes (login, create, update, bulk create)
+    admission_enabled: bool = True
+    admission_ip_rate: float = 5.0  # requests/second per client IP; 0 disables
+    admission_ip_burst: int = 20
+    admission_tenant_rate: float = 1.0  # requests/second per organization (or admin email on login); 0 disables
+    admission_tenant_burst: int = 10
+    admission_table_slots: int = 1048576  # 8 bytes each per limiter, shared by all keys
+    admission_max_concurrent: int = 0  # 0 = 2 x password_hash_workers
+    admission_max_queue_ms: float = 1000
+    admission_max_loop_lag_ms: float = 0  # shed when the event loop lags this much; 0 disables
+    admission_max_body_bytes: int = 65536  # larger bodies are not parsed for the tenant key
+    admission_trust_forwarded_for: bool = False
+
+    # Sampling request profiler (off by default; nothing is installed unless enabled)
+    profiler_enabled: bool = False
+    profiler_sample_rate: int = 100  # profile 1 in N requests; 0 profiles only signed requests
+    profiler_interval_ms: float = 5.0
+    profiler_keep_slowest: int = 20
+    profiler_max_concurrent: int = 4
+    profiler_max_depth: int = 64
+    profiler_max_samples: int = 20000
+    profiler_secret: str = ""  # signs X-Profile-Token; defaults to jwt_secret_key
+
     class Config:
         env_file = ".env"
         case_sensitive = False
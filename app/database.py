@@ -1,6 +1,68 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import Optional
+import asyncio
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorClientSession,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase
+)
+from pymongo import read_preferences
+from pymongo.errors import BulkWriteError, CollectionInvalid, OperationFailure
+from pymongo.write_concern import WriteConcern
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.cache import collection_cache
 from app.config import settings
+from app.indexes import ensure_indexes
+from app.metrics import command_metrics
+from app.tenancy import Placement, TenantRouter
+
+
+READ_PREFERENCES = {
+    "primary": read_preferences.Primary,
+    "primaryPreferred": read_preferences.PrimaryPreferred,
+    "secondary": read_preferences.Secondary,
+    "secondaryPreferred": read_preferences.SecondaryPreferred,
+    "nearest": read_preferences.Nearest,
+}
+
+
+def _write_concern_w(value: str):
+    """Settings carry w as a string: "majority", a tag set name, or a node count"""
+    return int(value) if value.isdigit() else value
+
+
+def client_options() -> dict:
+    """Options shared by every MongoClient: pool sizing, default write concern, metrics"""
+    options = {
+        "serverSelectionTimeoutMS": 5000,
+        "maxPoolSize": settings.mongodb_max_pool_size,
+        "minPoolSize": settings.mongodb_min_pool_size,
+        "event_listeners": [command_metrics],
+    }
+    if settings.mongodb_max_idle_time_ms > 0:
+        options["maxIdleTimeMS"] = settings.mongodb_max_idle_time_ms
+    if settings.metadata_write_concern:
+        options["w"] = _write_concern_w(settings.metadata_write_concern)
+    return options
+
+
+def operation_options() -> Dict[str, dict]:
+    """Collection options per operation class (empty means the client defaults)"""
+    mode = settings.metadata_read_preference
+    if mode not in READ_PREFERENCES:
+        raise ValueError(f"Unknown metadata_read_preference: {mode}")
+    if mode == "primary":
+        read_preference = read_preferences.Primary()
+    else:
+        read_preference = READ_PREFERENCES[mode](max_staleness=settings.metadata_read_max_staleness_seconds)
+
+    migration = {}
+    if settings.migration_write_concern:
+        migration["write_concern"] = WriteConcern(w=_write_concern_w(settings.migration_write_concern))
+    return {
+        "metadata": {},
+        "metadata_read": {"read_preference": read_preference},
+        "migration": migration,
+    }
 
 
 class DatabaseManager:
@@ -9,24 +71,84 @@ class DatabaseManager:
     def __init__(self):
         self.client: Optional[AsyncIOMotorClient] = None
         self.master_db: Optional[AsyncIOMotorDatabase] = None
+        self.router = TenantRouter()
+        self.operation_options = operation_options()
+        # Set at connect(): replica sets and sharded clusters support multi-document transactions
+        self.supports_transactions = False
     
-    async def connect(self):
+    async def connect(self, bootstrap_indexes: bool = True):
         """Connect to MongoDB"""
         try:
-            self.client = AsyncIOMotorClient(settings.mongodb_url, serverSelectionTimeoutMS=5000)
+            self.client = AsyncIOMotorClient(settings.mongodb_url, **client_options())
             self.master_db = self.client[settings.master_db_name]
+            self.router.connect(self.client, **client_options())
             # Test connection
             await self.client.admin.command('ping')
             print("Connected to MongoDB")
+            await self.detect_transaction_support()
         except Exception as e:
             print(f"Warning: Could not connect to MongoDB: {e}")
             print("Server will start but database operations will fail until MongoDB is available.")
             # Create client anyway so server can start
-            self.client = AsyncIOMotorClient(settings.mongodb_url, serverSelectionTimeoutMS=5000)
+            self.client = AsyncIOMotorClient(settings.mongodb_url, **client_options())
             self.master_db = self.client[settings.master_db_name]
-    
+            self.router.connect(self.client, **client_options())
+            return
+
+        if bootstrap_indexes:
+            await self.bootstrap_indexes()
+        await self.load_collection_registry()
+
+    async def detect_transaction_support(self):
+        """Enable transactions when connected to a replica set or mongos"""
+        self.supports_transactions = False
+        if settings.transactions_mode == "off":
+            return
+        try:
+            hello = await self.client.admin.command("hello")
+        except Exception as e:
+            print(f"Warning: Could not detect deployment topology: {e}")
+            return
+        self.supports_transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+
+    async def run_in_transaction(self, callback: Callable[[Optional[AsyncIOMotorClientSession]], Awaitable]):
+        """Run ``callback(session)`` in a multi-document transaction on the primary cluster.
+
+        Without transaction support the callback gets ``None`` and must compensate on failure itself.
+        """
+        if not self.supports_transactions:
+            return await callback(None)
+        async with await self.client.start_session() as session:
+            # with_transaction retries transient errors and unknown commit results
+            return await session.with_transaction(callback)
+
+    async def bootstrap_indexes(self):
+        """Apply the master database index registry (idempotent)"""
+        try:
+            created = await ensure_indexes(self.master_db)
+            print(f"Ensured indexes: {', '.join(created)}")
+        except Exception as e:
+            print(f"Warning: Could not ensure indexes: {e}")
+
+    async def load_collection_registry(self):
+        """Seed the collection registry and tenant routes from the organization records"""
+        try:
+            cursor = self.master_db["organizations"].find(
+                {},
+                {"_id": 0, "org_collection_name": 1, "placement": 1},
+                batch_size=settings.migration_batch_size
+            ).limit(settings.collection_registry_size)
+            async for doc in cursor:
+                collection_cache.set(doc["org_collection_name"], True)
+                placement = Placement.from_dict(doc.get("placement"))
+                if placement is not None:
+                    self.router.routes.set(doc["org_collection_name"], placement)
+        except Exception as e:
+            print(f"Warning: Could not load collection registry: {e}")
+
     async def disconnect(self):
         """Disconnect from MongoDB"""
+        self.router.close_extra_clients()
         if self.client:
             self.client.close()
             print("Disconnected from MongoDB")
@@ -37,65 +159,273 @@ class DatabaseManager:
             raise RuntimeError("Database not connected. Call connect() first.")
         return self.master_db
     
-    def get_org_database(self, org_collection_name: str) -> AsyncIOMotorDatabase:
-        """Get database instance for a specific organization"""
+    def master_collection(self, name: str, operation: str = "metadata") -> AsyncIOMotorCollection:
+        """Master database collection with the read preference / write concern of an operation class"""
+        return self.get_master_db().get_collection(name, **self.operation_options[operation])
+    
+    async def tenant_collection(self, org_collection_name: str, operation: str = "metadata") -> AsyncIOMotorCollection:
+        """Tenant collection with the read preference / write concern of an operation class"""
+        db = await self.get_org_database(org_collection_name)
+        return db.get_collection(org_collection_name, **self.operation_options[operation])
+    
+    async def get_org_database(
+        self,
+        org_collection_name: str,
+        placement: Optional[Placement] = None
+    ) -> AsyncIOMotorDatabase:
+        """Get database instance for a specific organization (its stored placement unless one is given)"""
         if not self.client:
             raise RuntimeError("Database not connected. Call connect() first.")
-        # Using the same database but different collections
-        # In a true multi-tenant setup, you might use separate databases
-        return self.client[settings.master_db_name]
+        if not self.router.clients:
+            self.router.connect(self.client, **client_options())
+        return await self.router.get_database(org_collection_name, placement)
+    
+    async def same_database(self, first_collection: str, second_collection: str) -> bool:
+        """Whether two tenant collections are routed to the same database on the same cluster"""
+        return await self.router.resolve(first_collection) == await self.router.resolve(second_collection)
+    
+    async def same_cluster(self, first_collection: str, second_collection: str) -> bool:
+        """Whether two tenant collections are routed to the same cluster"""
+        first = await self.router.resolve(first_collection)
+        return first.cluster == (await self.router.resolve(second_collection)).cluster
     
     async def create_org_collection(self, org_collection_name: str) -> bool:
         """Dynamically create a collection for an organization"""
         try:
-            db = self.get_org_database(org_collection_name)
-            # Create collection by inserting and deleting a dummy document
-            # MongoDB creates collections lazily, so we force creation
-            await db[org_collection_name].insert_one({"_initialized": True})
-            await db[org_collection_name].delete_one({"_initialized": True})
+            db = await self.get_org_database(org_collection_name)
+            try:
+                await db.create_collection(org_collection_name)
+            except CollectionInvalid:
+                # Already exists
+                pass
+            collection_cache.set(org_collection_name, True)
             return True
         except Exception as e:
             print(f"Error creating collection {org_collection_name}: {e}")
             return False
     
-    async def delete_org_collection(self, org_collection_name: str) -> bool:
+    async def delete_org_collection(self, org_collection_name: str, placement: Optional[Placement] = None) -> bool:
         """Delete an organization's collection"""
         try:
-            db = self.get_org_database(org_collection_name)
+            db = await self.get_org_database(org_collection_name, placement)
             await db[org_collection_name].drop()
+            collection_cache.invalidate(org_collection_name)
+            self.router.forget(org_collection_name)
             return True
         except Exception as e:
             print(f"Error deleting collection {org_collection_name}: {e}")
             return False
     
-    async def collection_exists(self, org_collection_name: str) -> bool:
-        """Check if a collection exists"""
+    async def trash_org_collection(
+        self,
+        org_collection_name: str,
+        trash_name: str,
+        placement: Optional[Placement] = None
+    ) -> bool:
+        """Rename a tenant collection to a trash name in its own database (metadata-only on the server).
+
+        Returns False when the organization has no collection to trash.
+        """
+        if not await self.collection_exists(org_collection_name, use_registry=False, placement=placement):
+            return False
+        db = await self.get_org_database(org_collection_name, placement)
+        await db[org_collection_name].rename(trash_name)
+        collection_cache.invalidate(org_collection_name)
+        self.router.forget(org_collection_name)
+        return True
+
+    async def restore_org_collection(
+        self,
+        org_collection_name: str,
+        trash_name: str,
+        placement: Optional[Placement] = None
+    ):
+        """Rename a trashed collection back to its tenant collection name"""
+        db = await self.get_org_database(org_collection_name, placement)
+        await db[trash_name].rename(org_collection_name)
+        collection_cache.set(org_collection_name, True)
+
+    async def trashed_collection(
+        self,
+        org_collection_name: str,
+        trash_name: str,
+        placement: Optional[Placement] = None,
+        operation: str = "migration"
+    ) -> AsyncIOMotorCollection:
+        """A trashed collection, which stays in the database its tenant collection was placed in"""
+        db = await self.get_org_database(org_collection_name, placement)
+        return db.get_collection(trash_name, **self.operation_options[operation])
+
+    async def collection_exists(
+        self,
+        org_collection_name: str,
+        use_registry: bool = True,
+        placement: Optional[Placement] = None
+    ) -> bool:
+        """Check if a collection exists (registry first, then a name-filtered listCollections)"""
+        if use_registry and collection_cache.get(org_collection_name):
+            return True
         try:
-            db = self.get_org_database(org_collection_name)
-            collections = await db.list_collection_names()
-            return org_collection_name in collections
+            db = await self.get_org_database(org_collection_name, placement)
+            collections = await db.list_collection_names(filter={"name": org_collection_name})
+            if collections:
+                collection_cache.set(org_collection_name, True)
+            return bool(collections)
         except Exception:
             return False
     
     async def copy_collection_data(self, source_collection: str, target_collection: str) -> bool:
         """Copy all data from source collection to target collection"""
         try:
-            db = self.get_org_database(source_collection)
-            source_coll = db[source_collection]
-            target_coll = db[target_collection]
-            
-            # Get all documents from source
-            cursor = source_coll.find({})
-            documents = await cursor.to_list(length=None)
-            
-            if documents:
-                await target_coll.insert_many(documents)
-            
+            target_db = await self.get_org_database(target_collection)
+            # Copies are bulk work: writes use the relaxed migration write concern
+            source_coll = await self.tenant_collection(source_collection, "migration")
+            target_coll = await self.tenant_collection(target_collection, "migration")
+
+            # Same cluster: let the server copy the documents, nothing flows through Python
+            if await self.same_cluster(source_collection, target_collection):
+                try:
+                    await self._server_side_copy(source_coll, target_db.name, target_collection)
+                    return True
+                except (OperationFailure, NotImplementedError) as e:
+                    # Servers older than 4.2 (and in-memory stand-ins) lack $merge
+                    print(f"Server-side copy unavailable, falling back to streaming copy: {e}")
+
+            await self._stream_copy(source_coll, target_coll)
             return True
         except Exception as e:
             print(f"Error copying collection data: {e}")
             return False
 
+    async def move_collection_data(self, source_collection: str, target_collection: str) -> bool:
+        """Move all data from source collection to target collection, removing the source.
+
+        Within one database this is a rename, which fails rather than replace an existing target.
+        """
+        try:
+            source_db = await self.get_org_database(source_collection)
+
+            # Same database: renameCollection is a metadata-only operation on the server
+            if await self.same_database(source_collection, target_collection):
+                await source_db[source_collection].rename(target_collection)
+                collection_cache.invalidate(source_collection)
+                collection_cache.set(target_collection, True)
+                return True
+        except Exception as e:
+            print(f"Error moving collection {source_collection}: {e}")
+            return False
+
+        if not await self.copy_collection_data(source_collection, target_collection):
+            return False
+        return await self.delete_org_collection(source_collection)
+
+    @staticmethod
+    async def _server_side_copy(source_coll: AsyncIOMotorCollection, target_db_name: str, target_collection: str):
+        """Copy documents with a $merge aggregation executed entirely on the server"""
+        pipeline = [
+            {"$merge": {
+                "into": {"db": target_db_name, "coll": target_collection},
+                "whenMatched": "keepExisting",
+                "whenNotMatched": "insert"
+            }}
+        ]
+        # $merge returns no documents; iterating the cursor runs the pipeline
+        async for _ in source_coll.aggregate(pipeline):
+            pass
+
+    @staticmethod
+    async def _stream_copy(source_coll: AsyncIOMotorCollection, target_coll: AsyncIOMotorCollection) -> int:
+        """Stream documents in batches, overlapping cursor reads with unordered bulk writes.
+
+        A bounded queue between the reader and the writers provides backpressure, so at
+        most ``migration_max_inflight_batches`` batches are held in memory at any time.
+        """
+        batch_size = settings.migration_batch_size
+        writers = settings.migration_writer_concurrency
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.migration_max_inflight_batches)
+        copied = 0
+        errors: List[Exception] = []
+
+        async def write_batches():
+            nonlocal copied
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+                if errors:
+                    # Keep draining so the reader never blocks on a full queue
+                    continue
+                try:
+                    await DatabaseManager._insert_batch(target_coll, batch)
+                    copied += len(batch)
+                except Exception as e:
+                    errors.append(e)
+
+        writer_tasks = [asyncio.create_task(write_batches()) for _ in range(writers)]
+        try:
+            batch = []
+            async for document in source_coll.find({}, batch_size=batch_size):
+                batch.append(document)
+                if len(batch) >= batch_size:
+                    if errors:
+                        break
+                    await queue.put(batch)
+                    batch = []
+            if batch and not errors:
+                await queue.put(batch)
+        finally:
+            for _ in writer_tasks:
+                await queue.put(None)
+            await asyncio.gather(*writer_tasks)
+
+        if errors:
+            raise errors[0]
+        return copied
+
+    async def copy_collection_resumable(
+        self,
+        source_collection: str,
+        target_collection: str,
+        start_after=None,
+        on_batch: Optional[Callable[[int, object], Awaitable[None]]] = None
+    ) -> int:
+        """Copy documents in ``_id`` order so an interrupted copy can resume.
+
+        ``on_batch(count, last_id)`` is awaited after every batch is written; callers
+        persist ``last_id`` and pass it back as ``start_after`` to continue.
+        """
+        source_coll = (await self.get_org_database(source_collection))[source_collection]
+        target_coll = await self.tenant_collection(target_collection, "migration")
+        query = {} if start_after is None else {"_id": {"$gt": start_after}}
+        batch_size = settings.migration_batch_size
+        copied = 0
+
+        batch = []
+        async for document in source_coll.find(query, batch_size=batch_size).sort("_id", 1):
+            batch.append(document)
+            if len(batch) >= batch_size:
+                await self._insert_batch(target_coll, batch)
+                copied += len(batch)
+                if on_batch:
+                    await on_batch(len(batch), batch[-1]["_id"])
+                batch = []
+        if batch:
+            await self._insert_batch(target_coll, batch)
+            copied += len(batch)
+            if on_batch:
+                await on_batch(len(batch), batch[-1]["_id"])
+        return copied
+
+    @staticmethod
+    async def _insert_batch(target_coll: AsyncIOMotorCollection, batch: List[dict]):
+        """Unordered bulk insert that tolerates documents already present in the target"""
+        try:
+            await target_coll.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys mean the document was copied by an earlier (retried) attempt
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+
 
 # Global database manager instance
 db_manager = DatabaseManager()
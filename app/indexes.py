@@ -0,0 +1,141 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from pymongo import ASCENDING, IndexModel
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """Declarative description of an index on a master database collection"""
+    collection: str
+    keys: Tuple[Tuple[str, int], ...]
+    name: str
+    unique: bool = False
+    options: Dict = field(default_factory=dict)
+
+    def to_index_model(self) -> IndexModel:
+        """Build the pymongo IndexModel for this spec"""
+        return IndexModel(list(self.keys), name=self.name, unique=self.unique, **self.options)
+
+
+# Indexes required by the hot lookups in OrganizationService
+INDEX_REGISTRY: List[IndexSpec] = [
+    IndexSpec(
+        collection="organizations",
+        keys=(("organization_name", ASCENDING),),
+        name="uniq_organization_name",
+        unique=True
+    ),
+    IndexSpec(
+        collection="organizations",
+        keys=(("org_collection_name", ASCENDING),),
+        name="uniq_org_collection_name",
+        unique=True
+    ),
+    IndexSpec(
+        collection="organizations",
+        # Keyset pagination order for /org/list; also serves anchored prefix searches
+        keys=(("organization_name", ASCENDING), ("_id", ASCENDING)),
+        name="organization_name_id"
+    ),
+    IndexSpec(
+        collection="admin_users",
+        keys=(("email", ASCENDING),),
+        name="uniq_email",
+        unique=True
+    ),
+    IndexSpec(
+        collection="admin_users",
+        keys=(("organization_name", ASCENDING),),
+        name="organization_name"
+    ),
+    IndexSpec(
+        collection="jobs",
+        keys=(("organization_name", ASCENDING), ("status", ASCENDING)),
+        name="organization_name_status"
+    ),
+    IndexSpec(
+        collection="jobs",
+        keys=(("status", ASCENDING),),
+        name="status"
+    ),
+    IndexSpec(
+        collection="snapshot_imports",
+        # Resume lookup for an import of a given snapshot into an organization
+        keys=(("organization_name", ASCENDING), ("snapshot_id", ASCENDING)),
+        name="uniq_organization_name_snapshot_id",
+        unique=True
+    ),
+    IndexSpec(
+        collection="organization_trash",
+        # Purger scan for tombstones past their retention window
+        keys=(("status", ASCENDING), ("purge_after", ASCENDING)),
+        name="status_purge_after"
+    ),
+    IndexSpec(
+        collection="organization_trash",
+        # Latest tombstone of a name, for restore
+        keys=(("organization_name", ASCENDING), ("deleted_at", ASCENDING)),
+        name="organization_name_deleted_at"
+    ),
+    IndexSpec(
+        collection="refresh_tokens",
+        keys=(("expires_at", ASCENDING),),
+        name="ttl_expires_at",
+        options={"expireAfterSeconds": 0}
+    ),
+    IndexSpec(
+        collection="refresh_tokens",
+        # Revoking all of an admin's sessions on credential changes and deletes
+        keys=(("admin_user_id", ASCENDING),),
+        name="admin_user_id"
+    ),
+    IndexSpec(
+        collection="revoked_tokens",
+        keys=(("expires_at", ASCENDING),),
+        name="ttl_expires_at",
+        options={"expireAfterSeconds": 0}
+    ),
+    IndexSpec(
+        collection="revoked_tokens",
+        keys=(("revoked_at", ASCENDING),),
+        name="revoked_at"
+    ),
+]
+
+
+def _specs_by_collection() -> Dict[str, List[IndexSpec]]:
+    """Group registered index specs by collection name"""
+    grouped: Dict[str, List[IndexSpec]] = {}
+    for spec in INDEX_REGISTRY:
+        grouped.setdefault(spec.collection, []).append(spec)
+    return grouped
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> List[str]:
+    """Create every registered index; existing identical indexes are left untouched"""
+    created: List[str] = []
+    for collection, specs in _specs_by_collection().items():
+        names = await db[collection].create_indexes([spec.to_index_model() for spec in specs])
+        created.extend(f"{collection}.{name}" for name in names)
+    return created
+
+
+async def index_report(db: AsyncIOMotorDatabase) -> Dict[str, dict]:
+    """Report index usage counters and missing registered indexes per collection"""
+    report: Dict[str, dict] = {}
+    for collection, specs in _specs_by_collection().items():
+        existing = await db[collection].index_information()
+        usage: Dict[str, int] = {}
+        try:
+            async for stat in db[collection].aggregate([{"$indexStats": {}}]):
+                usage[stat["name"]] = stat["accesses"]["ops"]
+        except Exception:
+            # $indexStats is unavailable on some deployments (e.g. restricted users)
+            pass
+
+        report[collection] = {
+            "indexes": {name: usage.get(name) for name in existing},
+            "missing": [spec.name for spec in specs if spec.name not in existing],
+        }
+    return report
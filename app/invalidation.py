@@ -0,0 +1,204 @@
+import asyncio
+import os
+import socket
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+from bson import ObjectId
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure
+from app.cache import TTLCache, collection_cache, org_cache
+from app.config import settings
+from app.database import db_manager
+
+# Invalidations remembered by id, so re-reading the overlap window after a restart applies each once
+SEEN_LIMIT = 10000
+
+
+class InvalidationBus:
+    """Broadcasts cache invalidations between workers through a capped master-DB collection.
+
+    Every worker publishes its local invalidations and tails the collection (or watches it
+    with a change stream when the deployment supports one), evicting the keys other
+    workers invalidated. Works against a standalone mongod in tailable mode.
+    """
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._caches: Dict[str, TTLCache] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        self.mode: Optional[str] = None
+        self.published = 0
+        self.applied = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self.total_lag_seconds = 0.0
+
+    @property
+    def collection(self):
+        return db_manager.get_master_db()[settings.invalidation_bus_collection]
+
+    def register(self, cache: TTLCache):
+        """Broadcast this cache's invalidations and apply remote ones to it"""
+        self._caches[cache.name] = cache
+        cache.add_listener(self._on_local_invalidate)
+
+    async def start(self):
+        """Create the capped collection if needed and start the subscriber task"""
+        if settings.invalidation_bus_mode == "off" or self._task is not None:
+            return
+        try:
+            await self._ensure_collection()
+        except Exception as e:
+            print(f"Warning: Cache invalidation bus disabled: {e}")
+            return
+        self._task = asyncio.create_task(self._subscribe())
+
+    async def stop(self):
+        """Stop the subscriber and wait for queued publishes"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def publish(self, cache_name: str, keys: list):
+        """Tell other workers to evict keys from the named cache"""
+        # ts is assigned by the server, so tailing subscribers can resume on one clock
+        await self.collection.update_one(
+            {"_id": ObjectId()},
+            {
+                "$setOnInsert": {"cache": cache_name, "keys": keys, "origin": self.worker_id},
+                "$currentDate": {"ts": True}
+            },
+            upsert=True
+        )
+        self.published += 1
+
+    def _on_local_invalidate(self, cache: TTLCache, keys: tuple):
+        if self._task is None:
+            return
+        task = asyncio.ensure_future(self._publish_safely(cache.name, list(keys)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _publish_safely(self, cache_name: str, keys: list):
+        try:
+            await self.publish(cache_name, keys)
+        except Exception as e:
+            print(f"Error publishing cache invalidation: {e}")
+
+    async def _ensure_collection(self):
+        master_db = db_manager.get_master_db()
+        try:
+            await master_db.create_collection(
+                settings.invalidation_bus_collection,
+                capped=True,
+                size=settings.invalidation_bus_size_bytes
+            )
+        except CollectionInvalid:
+            pass
+        # A tailable cursor on an empty capped collection dies immediately
+        if await self.collection.find_one({}, {"_id": 1}) is None:
+            await self.collection.insert_one({"cache": None, "keys": [], "origin": None, "ts": datetime.utcnow()})
+
+    async def _subscribe(self):
+        mode = settings.invalidation_bus_mode
+        if mode in ("auto", "change_stream"):
+            try:
+                self.mode = "change_stream"
+                await self._watch()
+                return
+            except OperationFailure as e:
+                if mode == "change_stream":
+                    print(f"Error watching cache invalidations: {e}")
+                    return
+                # Change streams need a replica set; standalone servers fall back to tailing
+        self.mode = "tailable"
+        await self._tail()
+
+    async def _watch(self):
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        resume_token = None
+        opened = False
+        while True:
+            try:
+                async with self.collection.watch(pipeline, resume_after=resume_token) as stream:
+                    opened = True
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self._apply(change["fullDocument"])
+            except OperationFailure:
+                if not opened:
+                    # Never opened (e.g. standalone server); let the caller fall back
+                    raise
+                print("Error watching cache invalidations, resuming")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error watching cache invalidations: {e}")
+            await asyncio.sleep(settings.invalidation_bus_retry_seconds)
+
+    async def _tail(self):
+        # ObjectIds from different workers are not ordered by insert, so resume on the
+        # server-assigned ts minus an overlap, skipping invalidations already applied
+        last = await self.collection.find_one({}, {"ts": 1}, sort=[("$natural", -1)])
+        resume_ts = last["ts"] if last else None
+        seen: OrderedDict = OrderedDict()
+        overlap = timedelta(seconds=settings.invalidation_bus_resume_overlap_seconds)
+        while True:
+            query = {"ts": {"$gte": resume_ts - overlap}} if resume_ts is not None else {}
+            try:
+                cursor = self.collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for doc in cursor:
+                        if doc["_id"] in seen:
+                            continue
+                        seen[doc["_id"]] = True
+                        if len(seen) > SEEN_LIMIT:
+                            seen.popitem(last=False)
+                        if resume_ts is None or doc["ts"] > resume_ts:
+                            resume_ts = doc["ts"]
+                        self._apply(doc)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error tailing cache invalidations: {e}")
+            # The cursor dies if the capped collection wraps past it; re-open from resume_ts
+            await asyncio.sleep(settings.invalidation_bus_retry_seconds)
+
+    def _apply(self, doc: dict):
+        if doc.get("origin") in (None, self.worker_id):
+            return
+        cache = self._caches.get(doc.get("cache"))
+        if cache is None:
+            return
+        cache.invalidate(*doc.get("keys", []), propagate=False)
+
+        # Lag from publish to eviction; across hosts this includes clock skew
+        lag = max(0.0, (datetime.utcnow() - doc["ts"]).total_seconds())
+        self.applied += 1
+        self.last_lag_seconds = lag
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+        self.total_lag_seconds += lag
+
+    def stats(self) -> dict:
+        """Snapshot of bus counters and propagation lag"""
+        return {
+            "mode": self.mode,
+            "published": self.published,
+            "applied": self.applied,
+            "last_lag_seconds": self.last_lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "avg_lag_seconds": self.total_lag_seconds / self.applied if self.applied else 0.0,
+        }
+
+
+# Global cache invalidation bus
+invalidation_bus = InvalidationBus()
+invalidation_bus.register(org_cache)
+invalidation_bus.register(collection_cache)
+invalidation_bus.register(db_manager.router.routes)
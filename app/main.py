@@ -1,7 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from app.config import settings
 from app.database import db_manager
-from app.routers import organization, auth
+from app.auth.password import hasher_pool
+from app.services.job_service import job_manager
+from app.services.trash_service import trash_purger
+from app.invalidation import invalidation_bus
+from app.auth.token_cache import revocation_list
+from app.admission import AdmissionMiddleware
+from app.audit import audit_log
+from app.metrics import MetricsMiddleware, loop_lag_monitor, registry
+from app.profiling import ProfilingMiddleware
+from app.routers import audit, organization, auth, profiling, snapshot, tenant_data
 import uvicorn
 
 app = FastAPI(
@@ -10,6 +21,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Admission control (innermost, so refusals still get CORS headers); disabled at runtime
+# through ADMISSION_ENABLED, so the benchmark harness can switch it off
+app.add_middleware(AdmissionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -19,21 +34,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sampling profiler: only installed when enabled, so it has no cost otherwise
+if settings.profiler_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+# Request latency histograms (added last so it also times the CORS middleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(organization.router)
 app.include_router(auth.router)
+app.include_router(tenant_data.router)
+app.include_router(snapshot.router)
+app.include_router(audit.router)
+if settings.profiler_enabled:
+    app.include_router(profiling.router)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database connection on startup"""
     await db_manager.connect()
+    if settings.metrics_enabled:
+        loop_lag_monitor.start()
+    await invalidation_bus.start()
+    await revocation_list.start()
+    await audit_log.start()
+    trash_purger.start()
+    await job_manager.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Close database connection on shutdown"""
+    await job_manager.shutdown()
+    await trash_purger.stop()
+    # After the job engine, so events from jobs that just stopped are flushed too
+    await audit_log.stop()
+    await invalidation_bus.stop()
+    await revocation_list.stop()
+    await loop_lag_monitor.stop()
     await db_manager.disconnect()
+    hasher_pool.shutdown()
 
 
 @app.get("/")
@@ -52,6 +95,14 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of in-process metrics"""
+    if not settings.metrics_enabled:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
 
@@ -0,0 +1,96 @@
+"""Management commands.
+
+Usage:
+    python -m app.manage indexes           # report index usage and missing indexes
+    python -m app.manage indexes --apply   # create missing indexes, then report
+    python -m app.manage profile-token     # signed X-Profile-Token header value
+    python -m app.manage db-config         # effective pool/read/write settings and topology
+"""
+import argparse
+import asyncio
+import json
+from pymongo import monitoring
+from app.database import client_options, db_manager
+from app.indexes import index_report
+from app.profiling import create_profile_token
+
+
+async def indexes_command(apply: bool) -> dict:
+    """Report (and optionally apply) the master database index registry"""
+    await db_manager.connect(bootstrap_indexes=apply)
+    try:
+        return await index_report(db_manager.get_master_db())
+    finally:
+        await db_manager.disconnect()
+
+
+class _ServerRecorder(monitoring.CommandListener):
+    """Remembers which server answered each command"""
+
+    def __init__(self):
+        self.servers = {}
+
+    def started(self, event):
+        self.servers[event.request_id] = "%s:%s" % event.connection_id
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def db_config_command() -> dict:
+    """Show effective client and per-operation options, the topology, and where each class reads from"""
+    recorder = _ServerRecorder()
+    monitoring.register(recorder)
+    await db_manager.connect(bootstrap_indexes=False)
+    try:
+        hello = await db_manager.client.admin.command("hello")
+        reads = {}
+        for operation in db_manager.operation_options:
+            recorder.servers.clear()
+            await db_manager.master_collection("organizations", operation).find_one({}, {"_id": 1})
+            reads[operation] = sorted(set(recorder.servers.values()))
+        return {
+            "client": {key: value for key, value in client_options().items() if key != "event_listeners"},
+            "operations": {
+                operation: {key: repr(value) for key, value in options.items()}
+                for operation, options in db_manager.operation_options.items()
+            },
+            "topology": {
+                "set_name": hello.get("setName"),
+                "primary": hello.get("primary"),
+                "hosts": hello.get("hosts", []),
+                "supports_transactions": db_manager.supports_transactions,
+            },
+            "reads_served_by": reads,
+        }
+    finally:
+        await db_manager.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    indexes_parser = subparsers.add_parser("indexes", help="Report index usage and missing indexes")
+    indexes_parser.add_argument("--apply", action="store_true", help="Create missing indexes first")
+
+    token_parser = subparsers.add_parser("profile-token", help="Print a signed X-Profile-Token header value")
+    token_parser.add_argument("--ttl", type=int, default=300, help="Seconds the token stays valid")
+
+    subparsers.add_parser("db-config", help="Show connection settings, topology and read routing")
+
+    args = parser.parse_args()
+    if args.command == "indexes":
+        report = asyncio.run(indexes_command(args.apply))
+        print(json.dumps(report, indent=2))
+    elif args.command == "profile-token":
+        print(create_profile_token(args.ttl))
+    elif args.command == "db-config":
+        print(json.dumps(asyncio.run(db_config_command()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+from pymongo import monitoring
+from app.config import settings
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow migrations
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _ValueMetric:
+    """Single value per label set, either recorded in-process or read from a callback at scrape time"""
+
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        callback: Optional[Callable[[], Dict[tuple, float]]] = None
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.callback = callback
+        self._values: Dict[tuple, float] = {}
+        # Updated from pymongo's monitoring threads as well as the event loop
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[str]:
+        if self.callback is not None:
+            values = self.callback()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+            for label_values, value in values.items()
+        ]
+
+
+class Counter(_ValueMetric):
+    """Monotonic counter per label set"""
+
+    type = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(_ValueMetric):
+    """Last-set value per label set"""
+
+    type = "gauge"
+
+    def set(self, value: float, *label_values: str):
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set.
+
+    observe() is a dict lookup, a bisect and three additions under an uncontended lock,
+    so it is cheap enough to call on every request and every database command. The lock
+    matters because command metrics are observed on pymongo's monitoring threads.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bucket] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> List[str]:
+        # Snapshot under the lock so a scrape never sees a series mid-update
+        with self._lock:
+            snapshot = [(label_values, list(counts), total, count) for label_values, (counts, total, count) in self._series.items()]
+        lines = []
+        for label_values, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """In-process metric registry rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        callback: Optional[Callable[[], Dict[tuple, float]]] = None
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labels, callback))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        callback: Optional[Callable[[], Dict[tuple, float]]] = None
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labels, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """Text exposition of every registered metric"""
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                print(f"Error collecting metric {metric.name}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status",
+    labels=("method", "route", "status")
+)
+mongo_command_duration = registry.histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by collection (\"tenant\" for all tenant collections) and operation",
+    labels=("collection", "operation")
+)
+mongo_command_failures = registry.counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error, by collection and operation",
+    labels=("collection", "operation")
+)
+password_hash_duration = registry.histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying passwords on the worker pool, including queueing",
+    labels=("operation",)
+)
+event_loop_lag = registry.gauge(
+    "event_loop_lag_seconds",
+    "How late the last event loop lag probe woke up"
+)
+
+# Caches reporting hit ratios, keyed by cache name; objects only need a stats() dict
+_tracked_caches: Dict[str, object] = {}
+
+
+def track_cache(cache):
+    """Expose a cache's hit/miss counters and hit ratio"""
+    _tracked_caches[cache.name] = cache
+
+
+def _cache_stat(stat: str) -> Callable[[], Dict[tuple, float]]:
+    return lambda: {(name,): cache.stats()[stat] for name, cache in _tracked_caches.items()}
+
+
+registry.counter("cache_hits_total", "Cache lookups served from the cache", ("cache",), _cache_stat("hits"))
+registry.counter("cache_misses_total", "Cache lookups that missed", ("cache",), _cache_stat("misses"))
+registry.gauge("cache_hit_ratio", "Hits over lookups since start", ("cache",), _cache_stat("hit_ratio"))
+registry.gauge("cache_entries", "Entries currently cached", ("cache",), _cache_stat("size"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template.
+
+    The route template (``/org/jobs/{job_id}``) is used instead of the raw path so
+    label cardinality stays bounded; unmatched paths share one series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code)
+            )
+
+
+# Tenant collections and their trashed copies are one label, so series do not grow with tenants
+TENANT_COLLECTION_PREFIXES = ("org_", "trash_")
+
+
+def collection_label(command_name: str, target) -> str:
+    """Metric label for a command's target: master collections by name, every tenant as ``tenant``"""
+    if not isinstance(target, str):
+        return ""
+    if command_name == "renameCollection":
+        # Admin command whose target is a "db.collection" namespace
+        target = target.partition(".")[2]
+    return "tenant" if target.startswith(TENANT_COLLECTION_PREFIXES) else target
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """pymongo listener recording command latency per collection and operation"""
+
+    def __init__(self):
+        # request_id -> collection; started and succeeded/failed events share a request_id
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        self._collections[event.request_id] = collection_label(event.command_name, target)
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name)
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name)
+        mongo_command_failures.inc(collection, event.command_name)
+
+
+# Passed to every MongoClient the service creates
+command_metrics = CommandMetricsListener()
+
+
+class EventLoopLagMonitor:
+    """Background probe measuring how late the event loop runs a scheduled wakeup"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        # Last measured lag in seconds, read by admission control
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._probe())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - expected)
+            event_loop_lag.set(self.lag)
+
+
+# Global event loop lag monitor
+loop_lag_monitor = EventLoopLagMonitor(settings.metrics_loop_lag_interval_seconds)
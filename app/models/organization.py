@@ -13,6 +13,8 @@ class Organization:
         admin_user_id: str,
         created_at: Optional[datetime] = None,
         updated_at: Optional[datetime] = None,
+        version: int = 1,
+        placement: Optional[dict] = None,
         _id: Optional[ObjectId] = None
     ):
         self._id = _id or ObjectId()
@@ -21,6 +23,10 @@ class Organization:
         self.admin_user_id = admin_user_id
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
+        # Incremented on every change to the organization or its admin; drives ETags
+        self.version = version
+        # Cluster and database chosen for the tenant collection at creation (see app.tenancy)
+        self.placement = placement
     
     def to_dict(self) -> dict:
         """Convert to dictionary for MongoDB storage"""
@@ -30,7 +36,9 @@ class Organization:
             "org_collection_name": self.org_collection_name,
             "admin_user_id": self.admin_user_id,
             "created_at": self.created_at,
-            "updated_at": self.updated_at
+            "updated_at": self.updated_at,
+            "version": self.version,
+            "placement": self.placement
         }
     
     @classmethod
@@ -42,7 +50,10 @@ class Organization:
             org_collection_name=data["org_collection_name"],
             admin_user_id=data["admin_user_id"],
             created_at=data.get("created_at"),
-            updated_at=data.get("updated_at")
+            updated_at=data.get("updated_at"),
+            # Documents written before versioning count as version 0
+            version=data.get("version", 0),
+            placement=data.get("placement")
         )
 
 
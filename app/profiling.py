@@ -0,0 +1,294 @@
+import asyncio
+import hashlib
+import heapq
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as FrameCounter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+
+PROFILE_HEADER = b"x-profile-token"
+
+# (function name, file, first line) identifies a frame; line numbers inside a function are merged
+FrameKey = Tuple[str, str, int]
+
+
+def _frame_key(frame) -> FrameKey:
+    code = frame.f_code
+    return (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+
+
+def _coroutine_frames(coro) -> list:
+    """Frames of an await chain, outermost first, whether it is running or suspended"""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+def _thread_frames(frame) -> list:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def capture_stack(task: asyncio.Task, thread_frame, max_depth: int) -> Tuple[FrameKey, ...]:
+    """Wall-clock stack of a request task, outermost first.
+
+    A suspended task contributes its await chain (where it is waiting); when the task is
+    on the CPU, the synchronous callees of its innermost coroutine come from the thread stack.
+    """
+    frames = _coroutine_frames(task.get_coro())
+    if frames and thread_frame is not None:
+        thread_frames = _thread_frames(thread_frame)
+        innermost = frames[-1]
+        for position, frame in enumerate(thread_frames):
+            if frame is innermost:
+                frames.extend(thread_frames[position + 1:])
+                break
+    return tuple(_frame_key(frame) for frame in frames[-max_depth:])
+
+
+class StackProfile:
+    """Sampled wall-clock stacks of one request"""
+
+    def __init__(self, method: str, path: str, interval: float):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.interval = interval
+        self.started_at = datetime.utcnow()
+        self.duration = 0.0
+        self.stacks: "FrameCounter[Tuple[FrameKey, ...]]" = FrameCounter()
+        self.sample_count = 0
+
+    def add_sample(self, stack: Tuple[FrameKey, ...]):
+        if stack and self.sample_count < settings.profiler_max_samples:
+            self.stacks[stack] += 1
+            self.sample_count += 1
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "samples": self.sample_count,
+        }
+
+    def to_collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format (one ``a;b;c count`` line per stack)"""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            names = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack)
+            lines.append(f"{names} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self) -> dict:
+        """speedscope's sampled-profile JSON format"""
+        frame_index: Dict[FrameKey, int] = {}
+        frames = []
+        samples = []
+        weights = []
+        interval_ms = self.interval * 1000
+        for stack, count in self.stacks.items():
+            indexes = []
+            for key in stack:
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                indexes.append(frame_index[key])
+            samples.append(indexes)
+            weights.append(count * interval_ms)
+        name = f"{self.method} {self.route or self.path} ({self.duration * 1000:.1f} ms)"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "organization-management-service",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+class StackSampler:
+    """Background thread sampling the stacks of the requests being profiled.
+
+    The thread sleeps on an event while nothing is profiled, so it costs nothing between
+    profiled requests.
+    """
+
+    def __init__(self, interval: float, max_depth: int):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._active: Dict[str, Tuple[asyncio.Task, StackProfile]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+
+    @property
+    def active_count(self) -> int:
+        return len(self._active)
+
+    def add(self, task: asyncio.Task, profile: StackProfile):
+        """Start sampling a task (call from the event loop thread)"""
+        self._loop_thread_id = threading.get_ident()
+        with self._lock:
+            self._active[profile.id] = (task, profile)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+        self._wakeup.set()
+
+    def remove(self, profile: StackProfile):
+        with self._lock:
+            self._active.pop(profile.id, None)
+
+    def _run(self):
+        while True:
+            if not self._active:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            time.sleep(self.interval)
+            thread_frame = sys._current_frames().get(self._loop_thread_id)
+            with self._lock:
+                active = list(self._active.values())
+            for task, profile in active:
+                try:
+                    profile.add_sample(capture_stack(task, thread_frame, self.max_depth))
+                except Exception as e:
+                    # Frames can be torn down while we walk them; drop the sample
+                    print(f"Error sampling request stack: {e}")
+
+
+class ProfileStore:
+    """Keeps the slowest K profiles"""
+
+    def __init__(self, keep: int):
+        self.keep = keep
+        self._heap: List[Tuple[float, int, StackProfile]] = []
+        self._sequence = itertools.count()
+
+    def add(self, profile: StackProfile):
+        entry = (profile.duration, next(self._sequence), profile)
+        if len(self._heap) < self.keep:
+            heapq.heappush(self._heap, entry)
+        elif self.keep > 0 and profile.duration > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def list(self) -> List[StackProfile]:
+        """Profiles, slowest first"""
+        return [profile for _, _, profile in sorted(self._heap, key=lambda entry: entry[0], reverse=True)]
+
+    def get(self, profile_id: str) -> Optional[StackProfile]:
+        for _, _, profile in self._heap:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def clear(self):
+        self._heap.clear()
+
+
+def _profiler_secret() -> bytes:
+    return (settings.profiler_secret or settings.jwt_secret_key).encode()
+
+
+def create_profile_token(ttl_seconds: int) -> str:
+    """Signed value for the X-Profile-Token header, valid for ttl_seconds"""
+    expires = str(int(time.time()) + ttl_seconds)
+    signature = hmac.new(_profiler_secret(), expires.encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_profile_token(token: str) -> bool:
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(_profiler_secret(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling 1 in ``PROFILER_SAMPLE_RATE`` requests, or any request with a valid
+    ``X-Profile-Token``. Profiled responses carry an ``X-Profile-Id`` header.
+
+    Only installed when ``PROFILER_ENABLED`` is set, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._requests = 0
+
+    def _wants_profile(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return verify_profile_token(value.decode("latin-1"))
+        self._requests += 1
+        rate = settings.profiler_sample_rate
+        return rate > 0 and self._requests % rate == 0
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not self._wants_profile(scope)
+            or stack_sampler.active_count >= settings.profiler_max_concurrent
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile = StackProfile(scope["method"], scope["path"], stack_sampler.interval)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.id.encode())
+                ]
+            await send(message)
+
+        stack_sampler.add(asyncio.current_task(), profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.duration = time.perf_counter() - start
+            stack_sampler.remove(profile)
+            route = scope.get("route")
+            profile.route = route.path if route is not None else None
+            profile_store.add(profile)
+
+
+# Global sampler and store of the slowest profiles
+stack_sampler = StackSampler(
+    interval=settings.profiler_interval_ms / 1000,
+    max_depth=settings.profiler_max_depth
+)
+profile_store = ProfileStore(keep=settings.profiler_keep_slowest)
@@ -0,0 +1,80 @@
+import json
+from functools import lru_cache
+from typing import Any, Optional
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered in one pass: pre-serialized bytes as-is, anything else with orjson"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if orjson is not None:
+            # default=str covers ObjectId; orjson handles datetimes natively
+            return orjson.dumps(content, default=str)
+        return json.dumps(content, default=str, separators=(",", ":")).encode()
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+    """Compiled validator/serializer for a response type, built once per type"""
+    return TypeAdapter(response_type)
+
+
+def serialize(response_type: Any, data: Any) -> bytes:
+    """Validate once and dump straight to JSON bytes in pydantic-core"""
+    adapter = _adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(data))
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = False) -> bool:
+    """Whether an ``If-Match`` / ``If-None-Match`` header value lists ``etag`` or is ``*``.
+
+    ``If-None-Match`` uses weak comparison (a ``W/`` prefix is ignored), ``If-Match`` strong.
+    """
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class JSONResponder:
+    """Builds route responses for one router.
+
+    In fast mode a route's result is validated once and serialized straight to bytes, and
+    the response bypasses FastAPI's response_model re-validation and jsonable_encoder.
+    Otherwise the model instance is returned and FastAPI serializes it as usual.
+    """
+
+    def __init__(self, router_name: str):
+        self.fast = router_name in settings.fast_json_routers
+
+    def model(self, response_type: Any, data: Any, status_code: Optional[int] = None):
+        if self.fast:
+            return FastJSONResponse(serialize(response_type, data), status_code=status_code or 200)
+        return response_type(**data)
+
+    def plain(self, data: dict, status_code: Optional[int] = None):
+        """Responses without a model (e.g. plain dicts)"""
+        if self.fast:
+            return FastJSONResponse(data, status_code=status_code or 200)
+        return data
@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from app.audit import audit_log
+from app.config import settings
+from app.responses import JSONResponder
+from app.schemas.audit import AuditLogResponse
+from app.auth.dependencies import verify_org_access
+
+router = APIRouter(prefix="/org/{organization_name}", tags=["audit"])
+json_responses = JSONResponder("audit")
+
+
+@router.get("/audit", response_model=AuditLogResponse)
+async def list_audit_events(
+    organization_name: str,
+    limit: int = Query(settings.audit_query_default_limit, ge=1, le=settings.audit_query_max_limit),
+    cursor: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Audit events of the organization, newest first, one keyset page at a time.
+
+    Events are written in batches, so the newest may take up to
+    ``AUDIT_FLUSH_INTERVAL_SECONDS`` to appear. Pass ``next_cursor`` as ``cursor`` for the next page.
+    """
+    after = audit_log.decode_cursor(cursor) if cursor else None
+    events = await audit_log.query(organization_name, limit, after=after, action=action, since=since, until=until)
+    next_cursor = audit_log.encode_cursor(events[limit - 1]) if len(events) > limit else None
+    return json_responses.model(AuditLogResponse, {
+        "items": [
+            {
+                "event_id": str(event["_id"]),
+                "ts": event["ts"],
+                "organization_name": event["organization_name"],
+                "action": event["action"],
+                "actor": event.get("actor"),
+                "details": event.get("details") or {},
+            }
+            for event in events[:limit]
+        ],
+        "next_cursor": next_cursor,
+    })
@@ -1,8 +1,22 @@
-from fastapi import APIRouter, HTTPException, status
-from app.schemas.organization import AdminLoginRequest, AdminLoginResponse
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+from typing import Optional
+from app.schemas.organization import (
+    AdminLoginRequest,
+    AdminLoginResponse,
+    AdminLogoutRequest,
+    RefreshTokenRequest
+)
 from app.services.organization_service import OrganizationService
+from app.auth.dependencies import get_current_admin, security
+from app.auth.jwt_handler import JWTHandler
+from app.auth.refresh_tokens import refresh_tokens
+from app.auth.token_cache import revocation_list
+from app.responses import JSONResponder
 
 router = APIRouter(prefix="/admin", tags=["authentication"])
+json_responses = JSONResponder("auth")
 
 
 @router.post("/login", response_model=AdminLoginResponse)
@@ -13,7 +27,7 @@ async def admin_login(request: AdminLoginRequest):
             email=request.email,
             password=request.password
         )
-        return AdminLoginResponse(**result)
+        return json_responses.model(AdminLoginResponse, result)
     except HTTPException:
         raise
     except Exception as e:
@@ -22,3 +36,40 @@ async def admin_login(request: AdminLoginRequest):
             detail=f"Login failed: {str(e)}"
         )
 
+
+@router.post("/refresh", response_model=AdminLoginResponse)
+async def refresh_access_token(request: RefreshTokenRequest):
+    """Exchange a refresh token for a new access token without re-entering the password"""
+    try:
+        result = await OrganizationService.refresh_admin_token(request.refresh_token)
+        return json_responses.model(AdminLoginResponse, result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Token refresh failed: {str(e)}"
+        )
+
+
+@router.post("/logout")
+async def admin_logout(
+    request: Optional[AdminLogoutRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Revoke the presented access token until it expires, and the refresh token if one is sent"""
+    payload = JWTHandler.decode_access_token(credentials.credentials)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    await revocation_list.revoke(
+        credentials.credentials,
+        datetime.utcfromtimestamp(payload["exp"])
+    )
+    if request is not None and request.refresh_token:
+        await refresh_tokens.revoke(request.refresh_token, current_admin["admin_id"])
+    return json_responses.plain({"message": "Logged out successfully"})
@@ -1,17 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from app.config import settings
+from app.responses import JSONResponder, etag_matches
 from app.schemas.organization import (
     OrganizationCreateRequest,
+    OrganizationBulkCreateResponse,
     OrganizationGetRequest,
     OrganizationUpdateRequest,
     OrganizationDeleteRequest,
+    OrganizationRestoreRequest,
     OrganizationResponse,
+    OrganizationListResponse,
     AdminLoginRequest,
-    AdminLoginResponse
+    AdminLoginResponse,
+    JobAcceptedResponse,
+    JobResponse
 )
 from app.services.organization_service import OrganizationService
-from app.auth.dependencies import get_current_admin, verify_org_access
+from app.services.job_service import job_manager
+from app.services.trash_service import TrashService
+from app.auth.dependencies import get_current_admin, get_operator, verify_org_access
 
 router = APIRouter(prefix="/org", tags=["organizations"])
+json_responses = JSONResponder("organization")
 
 
 @router.post("/create", response_model=OrganizationResponse, status_code=status.HTTP_201_CREATED)
@@ -23,7 +38,7 @@ async def create_organization(request: OrganizationCreateRequest):
             email=request.email,
             password=request.password
         )
-        return OrganizationResponse(**result)
+        return json_responses.model(OrganizationResponse, result, status_code=status.HTTP_201_CREATED)
     except HTTPException:
         raise
     except Exception as e:
@@ -33,12 +48,146 @@ async def create_organization(request: OrganizationCreateRequest):
         )
 
 
-@router.get("/get", response_model=OrganizationResponse)
-async def get_organization(request: OrganizationGetRequest):
-    """Get organization details by name"""
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'body'}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+async def _bulk_items(request: Request) -> AsyncIterator[Tuple[int, Union[OrganizationCreateRequest, str]]]:
+    """Yield (index, validated item or error detail) from a JSON or NDJSON request body"""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(("application/x-ndjson", "application/jsonl")):
+        # Stream line by line so large uploads are never held in memory as a whole
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    yield index, OrganizationCreateRequest.model_validate_json(line)
+                except ValidationError as e:
+                    yield index, _validation_detail(e)
+                index += 1
+        if buffer.strip():
+            try:
+                yield index, OrganizationCreateRequest.model_validate_json(buffer)
+            except ValidationError as e:
+                yield index, _validation_detail(e)
+        return
+
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be JSON or NDJSON"
+        )
+    if isinstance(body, dict):
+        body = body.get("organizations")
+    if not isinstance(body, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a list of organizations or {\"organizations\": [...]}"
+        )
+    # The whole list is in memory, so an oversized one is refused before anything is created
+    if len(body) > settings.bulk_create_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_create_max_items} organizations per request"
+        )
+    for index, raw in enumerate(body):
+        try:
+            yield index, OrganizationCreateRequest.model_validate(raw)
+        except ValidationError as e:
+            yield index, _validation_detail(e)
+
+
+@router.post("/bulk-create", response_model=OrganizationBulkCreateResponse)
+async def bulk_create_organizations(request: Request):
+    """Create many organizations from a JSON list or an NDJSON stream.
+
+    Items are provisioned in chunks of ``BULK_CREATE_CHUNK_SIZE``; each item gets its own
+    result, so one bad row does not fail the whole upload. A JSON list over
+    ``BULK_CREATE_MAX_ITEMS`` is refused with 413; an NDJSON stream stops at the limit and
+    the response is marked ``truncated``.
+    """
+    results = []
+    chunk = []
+    truncated = False
+
+    async def flush():
+        results.extend(await OrganizationService.bulk_create_organizations(chunk))
+        chunk.clear()
+
+    items = _bulk_items(request)
+    try:
+        async for index, item in items:
+            if index >= settings.bulk_create_max_items:
+                # Earlier chunks are already provisioned; report them instead of failing the request
+                truncated = True
+                break
+            if isinstance(item, str):
+                results.append({"index": index, "status": "error", "detail": item})
+                continue
+            chunk.append({
+                "index": index,
+                "organization_name": item.organization_name,
+                "email": item.email,
+                "password": item.password
+            })
+            if len(chunk) >= settings.bulk_create_chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create organizations: {str(e)}"
+        )
+    finally:
+        await items.aclose()
+
+    results.sort(key=lambda result: result["index"])
+    created = sum(1 for result in results if result["status"] == "created")
+    return json_responses.model(OrganizationBulkCreateResponse, {
+        "created": created,
+        "failed": len(results) - created,
+        "truncated": truncated,
+        "results": results
+    })
+
+
+def _with_etag(result, response: Response, etag: str):
+    """Attach an ETag whether the route returns a Response or a model FastAPI serializes"""
+    target = result if isinstance(result, Response) else response
+    target.headers["ETag"] = etag
+    return result
+
+
+@router.get("/get", response_model=OrganizationResponse, responses={304: {"description": "Not Modified"}})
+async def get_organization(
+    request: OrganizationGetRequest,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get organization details by name.
+
+    The response carries a strong ``ETag``. A matching ``If-None-Match`` gets an empty 304,
+    answered from the metadata cache without serializing the organization.
+    """
     try:
         result = await OrganizationService.get_organization(request.organization_name)
-        return OrganizationResponse(**result)
+        etag = OrganizationService.entity_tag(result)
+        if etag_matches(if_none_match, etag, weak=True):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return _with_etag(json_responses.model(OrganizationResponse, result), response, etag)
     except HTTPException:
         raise
     except Exception as e:
@@ -48,12 +197,77 @@ async def get_organization(request: OrganizationGetRequest):
         )
 
 
-@router.put("/update", response_model=OrganizationResponse)
+# Lists every tenant, so only operators (not organization admins) may call it
+@router.get("/list", response_model=OrganizationListResponse, dependencies=[Depends(get_operator)])
+async def list_organizations(
+    limit: int = Query(settings.org_list_default_limit, ge=1, le=settings.org_list_max_limit),
+    cursor: Optional[str] = None,
+    prefix: Optional[str] = Query(None, min_length=1, max_length=100),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+):
+    """List organizations by name, one keyset page at a time.
+
+    Pass the returned ``next_cursor`` as ``cursor`` to fetch the following page.
+    Items are streamed to the client as they are read from the database.
+    """
+    after = OrganizationService.decode_list_cursor(cursor) if cursor else None
+    organizations = OrganizationService.list_organizations(
+        limit=limit,
+        after=after,
+        prefix=prefix,
+        created_after=created_after,
+        created_before=created_before
+    )
+
+    async def body():
+        yield '{"items":['
+        count = 0
+        last = None
+        try:
+            async for org_data in organizations:
+                if count == limit:
+                    # The extra document only signals that another page exists
+                    break
+                yield ("," if count else "") + OrganizationResponse(**org_data).model_dump_json()
+                count += 1
+                last = org_data
+            else:
+                last = None
+        finally:
+            await organizations.aclose()
+        next_cursor = OrganizationService.encode_list_cursor(last) if last is not None else None
+        yield '],"next_cursor":' + json.dumps(next_cursor) + "}"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+def _accepted(result: dict) -> JSONResponse:
+    """202 response for operations handed to the background job engine"""
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=JobAcceptedResponse(**result).model_dump()
+    )
+
+
+@router.put(
+    "/update",
+    response_model=OrganizationResponse,
+    responses={202: {"model": JobAcceptedResponse}}
+)
 async def update_organization(
     request: OrganizationUpdateRequest,
+    response: Response,
+    run_async: bool = Query(False, alias="async"),
+    if_match: Optional[str] = Header(None),
     current_admin: dict = Depends(get_current_admin)
 ):
-    """Update organization (admin credentials and optionally rename organization)"""
+    """Update organization (admin credentials and optionally rename organization).
+
+    With ``?async=true`` a rename runs as a background job and 202 is returned with its id.
+    With ``If-Match`` the update only applies if the organization's ETag still matches,
+    otherwise 412 is returned.
+    """
     try:
         # Verify admin has access to this organization
         await verify_org_access(request.organization_name, current_admin)
@@ -63,9 +277,17 @@ async def update_organization(
             new_email=request.email,
             new_password=request.password,
             current_admin=current_admin,
-            new_organization_name=request.new_organization_name
+            new_organization_name=request.new_organization_name,
+            background=run_async,
+            if_match=if_match
+        )
+        if "job_id" in result:
+            return _accepted(result)
+        return _with_etag(
+            json_responses.model(OrganizationResponse, result),
+            response,
+            OrganizationService.entity_tag(result)
         )
-        return OrganizationResponse(**result)
     except HTTPException:
         raise
     except Exception as e:
@@ -75,21 +297,30 @@ async def update_organization(
         )
 
 
-@router.delete("/delete")
+@router.delete("/delete", responses={202: {"model": JobAcceptedResponse}})
 async def delete_organization(
     request: OrganizationDeleteRequest,
+    run_async: bool = Query(False, alias="async"),
     current_admin: dict = Depends(get_current_admin)
 ):
-    """Delete organization (authenticated admin only)"""
+    """Delete organization (authenticated admin only).
+
+    With soft delete enabled the organization goes to the trash and the response carries
+    ``restore_until``. Otherwise ``?async=true`` runs the collection drop as a background
+    job and returns 202.
+    """
     try:
         # Verify admin has access to this organization
         await verify_org_access(request.organization_name, current_admin)
         
         result = await OrganizationService.delete_organization(
             organization_name=request.organization_name,
-            current_admin=current_admin
+            current_admin=current_admin,
+            background=run_async
         )
-        return result
+        if "job_id" in result:
+            return _accepted(result)
+        return json_responses.plain(result)
     except HTTPException:
         raise
     except Exception as e:
@@ -98,3 +329,29 @@ async def delete_organization(
             detail=f"Failed to delete organization: {str(e)}"
         )
 
+
+@router.post("/restore", response_model=OrganizationResponse)
+async def restore_organization(request: OrganizationRestoreRequest):
+    """Restore a deleted organization within its retention window, using its admin's credentials"""
+    result = await TrashService.restore_organization(
+        organization_name=request.organization_name,
+        email=request.email,
+        password=request.password
+    )
+    return json_responses.model(OrganizationResponse, result)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Get progress of a background organization job"""
+    job = await job_manager.get(job_id)
+    allowed_orgs = {job["organization_name"], job.get("params", {}).get("new_organization_name")}
+    if current_admin["organization_name"] not in allowed_orgs:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this job"
+        )
+    return json_responses.model(JobResponse, job_manager.to_response(job))
@@ -0,0 +1,38 @@
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse, Response
+from app.auth.dependencies import get_operator
+from app.profiling import profile_store
+
+# Profiles span all tenants, so only operators (not organization admins) may read them
+router = APIRouter(prefix="/admin/profiles", tags=["profiling"], dependencies=[Depends(get_operator)])
+
+
+@router.get("")
+async def list_profiles():
+    """List the slowest captured request profiles"""
+    return {"profiles": [profile.summary() for profile in profile_store.list()]}
+
+
+@router.get("/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$")
+):
+    """Download a profile for speedscope.app or as collapsed stacks (flamegraph.pl, speedscope)"""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    if format == "collapsed":
+        return PlainTextResponse(
+            profile.to_collapsed(),
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.collapsed.txt"'}
+        )
+    return Response(
+        json.dumps(profile.to_speedscope()),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'}
+    )
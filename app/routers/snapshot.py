@@ -0,0 +1,64 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from app.responses import JSONResponder
+from app.schemas.snapshot import SnapshotImportResponse, SnapshotImportStatus
+from app.services.snapshot_service import SnapshotService
+from app.auth.dependencies import verify_org_access
+
+router = APIRouter(prefix="/org/{organization_name}", tags=["snapshots"])
+json_responses = JSONResponder("snapshot")
+
+
+@router.get("/export")
+async def export_snapshot(
+    organization_name: str,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Stream the organization's collection as a compressed, checksummed snapshot"""
+    manifest, frames = await SnapshotService.export_snapshot(organization_name)
+    filename = f"{manifest['collection']}-{manifest['snapshot_id']}.omsnap"
+    return StreamingResponse(
+        frames,
+        media_type="application/octet-stream",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Snapshot-Id": manifest["snapshot_id"],
+        }
+    )
+
+
+@router.post("/import", response_model=SnapshotImportResponse)
+async def import_snapshot(
+    organization_name: str,
+    request: Request,
+    offset: int = Query(0, ge=0),
+    snapshot_id: Optional[str] = None,
+    restart: bool = False,
+    indexes: bool = True,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Import a snapshot into the organization's collection.
+
+    An interrupted import resumes from its last written chunk: send the whole snapshot
+    again, or only the bytes from ``resume_offset`` with ``offset`` and ``snapshot_id``.
+    """
+    result = await SnapshotService.import_snapshot(
+        organization_name,
+        request.stream(),
+        offset=offset,
+        snapshot_id=snapshot_id,
+        restart=restart,
+        build_indexes=indexes
+    )
+    return json_responses.model(SnapshotImportResponse, result)
+
+
+@router.get("/import/{snapshot_id}", response_model=SnapshotImportStatus)
+async def get_import(
+    organization_name: str,
+    snapshot_id: str,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Progress of an import, including the offset to resume from"""
+    return json_responses.model(SnapshotImportStatus, await SnapshotService.get_import(organization_name, snapshot_id))
@@ -0,0 +1,309 @@
+import json
+from typing import AsyncIterator, List, Tuple, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response, StreamingResponse
+from app.config import settings
+from app.responses import JSONResponder
+from app.schemas.tenant_data import (
+    TenantQueryRequest,
+    TenantBulkWriteResponse,
+    TenantUpdateResponse,
+    TenantIndexRequest,
+    TenantIndexResponse
+)
+from app.services.tenant_data_service import (
+    TenantDataService,
+    WriteOperation,
+    from_extended_json,
+    parse_write_operation,
+    to_extended_json,
+    validate_document,
+    validate_filter,
+    validate_update
+)
+from app.auth.dependencies import verify_org_access
+
+router = APIRouter(prefix="/org/{organization_name}/data", tags=["tenant data"])
+json_responses = JSONResponder("tenant_data")
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+def _bad_request(error: ValueError) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+
+def _document_response(document: dict, status_code: int = status.HTTP_200_OK) -> Response:
+    return Response(to_extended_json(document), status_code=status_code, media_type="application/json")
+
+
+async def _json_body(request: Request):
+    try:
+        return from_extended_json(await request.json())
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Request body must be JSON")
+
+
+def _parse_operation(raw) -> Union[WriteOperation, str]:
+    try:
+        return parse_write_operation(raw)
+    except ValueError as e:
+        return str(e)
+
+
+async def _operations(request: Request) -> AsyncIterator[Tuple[int, Union[WriteOperation, str]]]:
+    """Yield (index, write operation or error detail) from a JSON or NDJSON request body"""
+    if request.headers.get("content-type", "").startswith(NDJSON_TYPES):
+        # Stream line by line; a single line is bounded by the maximum document size
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            oversized = len(buffer) > settings.tenant_data_max_line_bytes
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    yield index, _parse_operation(json.loads(line))
+                except json.JSONDecodeError as e:
+                    yield index, f"Invalid JSON: {e}"
+                index += 1
+            if oversized:
+                # Earlier operations may already be written, so this is reported per index, not as a 413
+                yield index, (
+                    f"NDJSON lines are limited to {settings.tenant_data_max_line_bytes} bytes; "
+                    "the rest of the stream was not read"
+                )
+                return
+        if buffer.strip():
+            try:
+                yield index, _parse_operation(json.loads(buffer))
+            except json.JSONDecodeError as e:
+                yield index, f"Invalid JSON: {e}"
+        return
+
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be JSON or NDJSON"
+        )
+    if isinstance(body, dict):
+        body = body.get("operations")
+    if not isinstance(body, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a list of operations or {\"operations\": [...]}"
+        )
+    # The whole list is in memory, so an oversized one is refused before anything is written
+    if len(body) > settings.tenant_data_bulk_max_operations:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.tenant_data_bulk_max_operations} operations per request"
+        )
+    for index, raw in enumerate(body):
+        yield index, _parse_operation(raw)
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def insert_document(
+    organization_name: str,
+    request: Request,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Insert one document; the response carries its ``_id``"""
+    try:
+        document = validate_document(await _json_body(request))
+    except ValueError as e:
+        raise _bad_request(e)
+    collection = await TenantDataService.resolve_collection(organization_name, for_write=True)
+    inserted_id = await TenantDataService.insert_document(collection, document)
+    return _document_response({"_id": inserted_id}, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/bulk", response_model=TenantBulkWriteResponse)
+async def bulk_write(
+    organization_name: str,
+    request: Request,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Apply insert/update/replace/delete operations from a JSON list or an NDJSON stream.
+
+    Operations are sent to MongoDB as unordered bulk writes of ``TENANT_DATA_BULK_CHUNK_SIZE``;
+    a failed operation is reported by its index and does not stop the others. A JSON list over
+    ``TENANT_DATA_BULK_MAX_OPERATIONS`` is refused with 413; an NDJSON stream stops at the limit
+    and the response is marked ``operations_truncated``.
+    """
+    collection = await TenantDataService.resolve_collection(organization_name, for_write=True)
+    totals = {"inserted": 0, "matched": 0, "modified": 0, "deleted": 0, "upserted": 0, "failed": 0}
+    errors: List[dict] = []
+    truncated = False
+    operations_truncated = False
+    chunk: List[Tuple[int, WriteOperation]] = []
+
+    def record_error(error: dict):
+        nonlocal truncated
+        totals["failed"] += 1
+        # Only the first errors are kept, so a bad upload cannot grow the response without bound
+        if len(errors) < settings.tenant_data_max_reported_errors:
+            errors.append(error)
+        else:
+            truncated = True
+
+    async def flush():
+        result = await TenantDataService.bulk_write(collection, chunk)
+        for key in ("inserted", "matched", "modified", "deleted", "upserted"):
+            totals[key] += result[key]
+        for error in result["errors"]:
+            record_error(error)
+        chunk.clear()
+
+    operations = _operations(request)
+    try:
+        async for index, operation in operations:
+            if index >= settings.tenant_data_bulk_max_operations:
+                # Earlier chunks are already written; report them instead of failing the request
+                operations_truncated = True
+                break
+            if isinstance(operation, str):
+                record_error({"index": index, "detail": operation})
+                continue
+            chunk.append((index, operation))
+            if len(chunk) >= settings.tenant_data_bulk_chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Bulk write failed: {str(e)}"
+        )
+    finally:
+        await operations.aclose()
+
+    errors.sort(key=lambda error: error["index"])
+    return json_responses.model(TenantBulkWriteResponse, {
+        **totals,
+        "errors": errors,
+        "errors_truncated": truncated,
+        "operations_truncated": operations_truncated
+    })
+
+
+@router.post("/query")
+async def query_documents(
+    organization_name: str,
+    query: TenantQueryRequest,
+    request: Request,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Find documents, streamed as they are read.
+
+    Returns ``{"items": [...]}`` by default, or one document per line when the request
+    sends ``Accept: application/x-ndjson``. Documents are MongoDB Extended JSON (relaxed).
+    ``limit`` and ``max_time_ms`` are capped by the server settings.
+    """
+    try:
+        query_filter = validate_filter(from_extended_json(query.filter))
+        projection = None
+        if query.projection is not None:
+            projection = validate_filter(from_extended_json(query.projection), "projection")
+    except ValueError as e:
+        raise _bad_request(e)
+
+    collection = await TenantDataService.resolve_collection(organization_name)
+    documents = await TenantDataService.query(
+        collection,
+        query_filter,
+        projection,
+        sort=query.sort,
+        limit=min(query.limit or settings.tenant_data_query_default_limit, settings.tenant_data_query_max_limit),
+        hint=query.hint,
+        max_time_ms=min(query.max_time_ms or settings.tenant_data_query_max_time_ms, settings.tenant_data_query_max_time_ms)
+    )
+
+    if request.headers.get("accept", "").startswith(NDJSON_TYPES):
+        async def ndjson():
+            async for document in documents:
+                yield to_extended_json(document) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    async def body():
+        yield '{"items":['
+        separator = ""
+        async for document in documents:
+            yield separator + to_extended_json(document)
+            separator = ","
+        yield "]}"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+@router.get("/indexes", response_model=List[TenantIndexResponse])
+async def list_indexes(
+    organization_name: str,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Indexes on the organization's collection (names can be passed as a query ``hint``)"""
+    collection = await TenantDataService.resolve_collection(organization_name)
+    return json_responses.model(List[TenantIndexResponse], await TenantDataService.list_indexes(collection))
+
+
+@router.post("/indexes", response_model=TenantIndexResponse, status_code=status.HTTP_201_CREATED)
+async def create_index(
+    organization_name: str,
+    index: TenantIndexRequest,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Create an index on the organization's collection"""
+    collection = await TenantDataService.resolve_collection(organization_name, for_write=True)
+    name = await TenantDataService.create_index(collection, index.keys, index.name, index.unique)
+    return json_responses.model(
+        TenantIndexResponse,
+        {"name": name, "keys": index.keys, "unique": index.unique},
+        status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.get("/{document_id}")
+async def get_document(
+    organization_name: str,
+    document_id: str,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Get one document by ``_id`` (an ObjectId when the value is 24 hex characters)"""
+    collection = await TenantDataService.resolve_collection(organization_name)
+    return _document_response(await TenantDataService.get_document(collection, document_id))
+
+
+@router.patch("/{document_id}", response_model=TenantUpdateResponse)
+async def update_document(
+    organization_name: str,
+    document_id: str,
+    request: Request,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Apply update operators (``$set``, ``$inc``, ...) to one document"""
+    try:
+        update = validate_update(await _json_body(request))
+    except ValueError as e:
+        raise _bad_request(e)
+    collection = await TenantDataService.resolve_collection(organization_name, for_write=True)
+    result = await TenantDataService.update_document(collection, document_id, update)
+    return json_responses.model(TenantUpdateResponse, result)
+
+
+@router.delete("/{document_id}")
+async def delete_document(
+    organization_name: str,
+    document_id: str,
+    current_admin: dict = Depends(verify_org_access)
+):
+    """Delete one document by ``_id``"""
+    collection = await TenantDataService.resolve_collection(organization_name, for_write=True)
+    return json_responses.plain(await TenantDataService.delete_document(collection, document_id))
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class AuditEventResponse(BaseModel):
+    event_id: str
+    ts: datetime
+    organization_name: str
+    action: str
+    actor: Optional[str] = None  # admin user id
+    details: Dict[str, Any] = {}
+
+
+class AuditLogResponse(BaseModel):
+    items: List[AuditEventResponse]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -9,6 +9,25 @@ class OrganizationCreateRequest(BaseModel):
     password: str = Field(..., min_length=8)
 
 
+class OrganizationBulkCreateItemResult(BaseModel):
+    index: int
+    organization_name: Optional[str] = None
+    status: str  # "created" or "error"
+    detail: Optional[str] = None
+    org_collection_name: Optional[str] = None
+    admin_user_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class OrganizationBulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    # True when an NDJSON stream went past BULK_CREATE_MAX_ITEMS; later lines were not read
+    truncated: bool = False
+    results: List[OrganizationBulkCreateItemResult]
+
+
 class OrganizationGetRequest(BaseModel):
     organization_name: str = Field(..., min_length=1)
 
@@ -24,17 +43,29 @@ class OrganizationDeleteRequest(BaseModel):
     organization_name: str = Field(..., min_length=1)
 
 
+class OrganizationRestoreRequest(BaseModel):
+    organization_name: str = Field(..., min_length=1)
+    email: EmailStr  # credentials of the deleted organization's admin
+    password: str
+
+
 class OrganizationResponse(BaseModel):
     organization_name: str
     org_collection_name: str
     admin_user_id: str
     created_at: datetime
     updated_at: datetime
+    version: int = 0
     
     class Config:
         from_attributes = True
 
 
+class OrganizationListResponse(BaseModel):
+    items: List[OrganizationResponse]
+    next_cursor: Optional[str] = None
+
+
 class AdminLoginRequest(BaseModel):
     email: EmailStr
     password: str
@@ -43,6 +74,37 @@ class AdminLoginRequest(BaseModel):
 class AdminLoginResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    expires_in: int  # access token lifetime in seconds
+    refresh_token: str
     organization_name: str
     admin_id: str
 
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str = Field(..., min_length=1)
+
+
+class AdminLogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+
+
+class JobAcceptedResponse(BaseModel):
+    job_id: str
+    status: str
+    organization_name: str
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    job_type: str
+    organization_name: str
+    status: str
+    documents_total: Optional[int] = None
+    documents_copied: int
+    throughput_docs_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
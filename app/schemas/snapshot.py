@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class SnapshotImportStatus(BaseModel):
+    snapshot_id: str
+    status: str  # "running", "incomplete", "failed" or "completed"
+    last_chunk: int
+    resume_offset: int
+    documents_inserted: int
+    documents_existing: int
+    error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+
+class SnapshotImportResponse(SnapshotImportStatus):
+    chunks_written: int
+    chunks_skipped: int
+    indexes_created: List[str] = []
@@ -0,0 +1,51 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+
+SortDirection = Literal[1, -1]
+IndexDirection = Union[Literal[1, -1], Literal["hashed", "text", "2dsphere"]]
+
+
+class TenantQueryRequest(BaseModel):
+    # filter and projection accept MongoDB Extended JSON, e.g. {"_id": {"$oid": "..."}}
+    filter: Dict[str, Any] = {}
+    projection: Optional[Dict[str, Any]] = None
+    sort: Optional[List[Tuple[str, SortDirection]]] = None
+    limit: Optional[int] = Field(None, ge=1)
+    hint: Optional[Union[str, List[Tuple[str, IndexDirection]]]] = None
+    max_time_ms: Optional[int] = Field(None, ge=1)
+
+
+class TenantWriteError(BaseModel):
+    index: int
+    code: Optional[int] = None
+    detail: str
+
+
+class TenantBulkWriteResponse(BaseModel):
+    inserted: int = 0
+    matched: int = 0
+    modified: int = 0
+    deleted: int = 0
+    upserted: int = 0
+    failed: int = 0
+    errors: List[TenantWriteError] = []
+    errors_truncated: bool = False
+    # True when an NDJSON stream went past TENANT_DATA_BULK_MAX_OPERATIONS; later lines were not read
+    operations_truncated: bool = False
+
+
+class TenantUpdateResponse(BaseModel):
+    matched: int
+    modified: int
+
+
+class TenantIndexRequest(BaseModel):
+    keys: List[Tuple[str, IndexDirection]] = Field(..., min_length=1)
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    unique: bool = False
+
+
+class TenantIndexResponse(BaseModel):
+    name: str
+    keys: List[Tuple[str, Any]]
+    unique: bool = False
@@ -0,0 +1,324 @@
+import asyncio
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+from app.config import settings
+from app.database import db_manager
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+ACTIVE_JOB_STATUSES = [JOB_PENDING, JOB_RUNNING]
+
+JobHandler = Callable[["JobContext"], Awaitable[None]]
+
+
+class JobContext:
+    """Handle passed to job handlers for reading params and persisting progress"""
+
+    def __init__(self, manager: "JobManager", job: dict):
+        self.manager = manager
+        self.job = job
+        self.job_id: ObjectId = job["_id"]
+        self.params: dict = job.get("params", {})
+        self.checkpoint: dict = job.get("checkpoint") or {}
+        self._started = time.monotonic()
+        self._copied_this_run = 0
+
+    async def set_total(self, documents_total: int):
+        """Record the number of documents the job expects to process"""
+        await self.manager.update(self.job_id, {"documents_total": documents_total})
+
+    async def report_progress(self, documents: int, checkpoint: Optional[dict] = None, throttle: bool = True):
+        """Persist progress and checkpoint, then throttle to the configured job rate"""
+        self._copied_this_run += documents
+        update = {"updated_at": datetime.utcnow()}
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+            update["checkpoint"] = checkpoint
+        await self.manager.update(self.job_id, update, inc={"documents_copied": documents})
+        if throttle:
+            await self._throttle()
+
+    async def save_checkpoint(self, checkpoint: dict):
+        """Persist a checkpoint without reporting document progress"""
+        self.checkpoint = checkpoint
+        await self.manager.update(self.job_id, {"checkpoint": checkpoint})
+
+    async def _throttle(self):
+        """Sleep just long enough to keep this job under job_max_documents_per_second"""
+        rate = settings.job_max_documents_per_second
+        if rate <= 0:
+            return
+        expected = self._copied_this_run / rate
+        elapsed = time.monotonic() - self._started
+        if expected > elapsed:
+            await asyncio.sleep(expected - elapsed)
+
+
+class JobManager:
+    """Runs long tenant operations in the background, persisted in the master database"""
+
+    def __init__(self):
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: Dict[ObjectId, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def register(self, job_type: str, handler: JobHandler):
+        """Register the coroutine that executes jobs of the given type"""
+        self._handlers[job_type] = handler
+
+    @property
+    def collection(self):
+        return db_manager.get_master_db()["jobs"]
+
+    async def submit(self, job_type: str, organization_name: str, params: dict) -> str:
+        """Persist a new job and start it in the background"""
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        now = datetime.utcnow()
+        job = {
+            "_id": ObjectId(),
+            "job_type": job_type,
+            "organization_name": organization_name,
+            "params": params,
+            "status": JOB_PENDING,
+            "documents_total": None,
+            "documents_copied": 0,
+            "checkpoint": {},
+            "error": None,
+            "owner": None,
+            "lease_until": None,
+            "created_at": now,
+            "started_at": None,
+            "updated_at": now,
+            "finished_at": None,
+        }
+        await self.collection.insert_one(job)
+        self._spawn(job["_id"])
+        return str(job["_id"])
+
+    async def get(self, job_id: str) -> dict:
+        """Get a job document by id"""
+        try:
+            oid = ObjectId(job_id)
+        except (InvalidId, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        job = await self.collection.find_one({"_id": oid})
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        return job
+
+    async def active_job_for(self, organization_name: str) -> Optional[dict]:
+        """Return an unfinished job for the organization, if any"""
+        return await self.collection.find_one({
+            "organization_name": organization_name,
+            "status": {"$in": ACTIVE_JOB_STATUSES}
+        })
+
+    async def update(self, job_id: ObjectId, fields: dict, inc: Optional[dict] = None):
+        """Update job fields and renew this worker's lease"""
+        fields = dict(fields)
+        fields["lease_until"] = self._lease_deadline()
+        update = {"$set": fields}
+        if inc:
+            update["$inc"] = inc
+        await self.collection.update_one({"_id": job_id}, update)
+
+    async def resume_pending(self) -> int:
+        """Resume jobs left unfinished by a crashed or restarted worker (live leases are skipped)"""
+        resumed = 0
+        cursor = self.collection.find(
+            {"status": {"$in": ACTIVE_JOB_STATUSES}, **self._lease_free()},
+            {"_id": 1}
+        )
+        async for job in cursor:
+            if job["_id"] not in self._tasks:
+                self._spawn(job["_id"])
+                resumed += 1
+        return resumed
+
+    async def start(self):
+        """Resume unfinished jobs, then sweep periodically for jobs whose lease expired"""
+        try:
+            resumed = await self.resume_pending()
+            if resumed:
+                print(f"Resumed {resumed} background job(s)")
+        except Exception as e:
+            print(f"Warning: Could not resume background jobs: {e}")
+        if self._sweeper is None and settings.job_sweep_interval_seconds > 0:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(settings.job_sweep_interval_seconds)
+            try:
+                await self.resume_pending()
+            except Exception as e:
+                print(f"Error sweeping background jobs: {e}")
+
+    async def shutdown(self):
+        """Cancel running jobs; their leases expire and another worker resumes them"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+        for task in list(self._tasks.values()):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def _lease_deadline(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=settings.job_lease_seconds)
+
+    @staticmethod
+    def _lease_free() -> dict:
+        """Filter for jobs no worker holds a live lease on"""
+        return {"$or": [{"lease_until": None}, {"lease_until": {"$lt": datetime.utcnow()}}]}
+
+    def _spawn(self, job_id: ObjectId):
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _claim(self, job_id: ObjectId) -> Optional[dict]:
+        """Atomically take ownership of a job whose lease is free or expired"""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"_id": job_id, "status": {"$in": ACTIVE_JOB_STATUSES}, **self._lease_free()},
+            {
+                "$set": {
+                    "status": JOB_RUNNING,
+                    "owner": self.worker_id,
+                    "lease_until": self._lease_deadline(),
+                    "updated_at": now
+                }
+            },
+            return_document=True
+        )
+
+    async def _heartbeat(self, job_id: ObjectId):
+        """Renew this worker's lease while a handler runs, so one long step cannot outlast it"""
+        while True:
+            await asyncio.sleep(settings.job_lease_seconds / 3)
+            try:
+                await self.collection.update_one(
+                    {"_id": job_id, "owner": self.worker_id},
+                    {"$set": {"lease_until": self._lease_deadline()}}
+                )
+            except Exception as e:
+                print(f"Error renewing lease of job {job_id}: {e}")
+
+    async def _run(self, job_id: ObjectId):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.job_max_concurrency)
+
+        # A job leased by another worker is left to a later sweep instead of waiting in a slot
+        if not await self.collection.find_one(
+            {"_id": job_id, "status": {"$in": ACTIVE_JOB_STATUSES}, **self._lease_free()},
+            {"_id": 1}
+        ):
+            return
+
+        async with self._semaphore:
+            job = await self._claim(job_id)
+            if job is None:
+                return
+
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                await self._execute(job)
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def _execute(self, job: dict):
+        """Run the handler of a claimed job and record how it ended"""
+        job_id = job["_id"]
+        if job.get("started_at") is None:
+            job["started_at"] = datetime.utcnow()
+            await self.update(job_id, {"started_at": job["started_at"]})
+
+        handler = self._handlers.get(job["job_type"])
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job type: {job['job_type']}")
+            await handler(JobContext(self, job))
+        except asyncio.CancelledError:
+            # Release the lease so a restarted worker can resume from the checkpoint
+            await self.collection.update_one({"_id": job_id}, {"$set": {"lease_until": None}})
+            raise
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            await self.collection.update_one(
+                {"_id": job_id},
+                {"$set": {
+                    "status": JOB_FAILED,
+                    "error": str(e),
+                    "lease_until": None,
+                    "updated_at": datetime.utcnow(),
+                    "finished_at": datetime.utcnow()
+                }}
+            )
+            return
+
+        await self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {
+                "status": JOB_COMPLETED,
+                "lease_until": None,
+                "updated_at": datetime.utcnow(),
+                "finished_at": datetime.utcnow()
+            }}
+        )
+
+    @staticmethod
+    def to_response(job: dict) -> dict:
+        """Build the progress view of a job document"""
+        documents_total = job.get("documents_total")
+        documents_copied = job.get("documents_copied", 0)
+        started_at = job.get("started_at")
+        end = job.get("finished_at") or datetime.utcnow()
+
+        throughput = None
+        eta_seconds = None
+        if started_at:
+            elapsed = (end - started_at).total_seconds()
+            if elapsed > 0:
+                throughput = documents_copied / elapsed
+            if job["status"] in ACTIVE_JOB_STATUSES and throughput and documents_total is not None:
+                eta_seconds = max(0, documents_total - documents_copied) / throughput
+
+        return {
+            "job_id": str(job["_id"]),
+            "job_type": job["job_type"],
+            "organization_name": job["organization_name"],
+            "status": job["status"],
+            "documents_total": documents_total,
+            "documents_copied": documents_copied,
+            "throughput_docs_per_second": throughput,
+            "eta_seconds": eta_seconds,
+            "error": job.get("error"),
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+            "finished_at": job.get("finished_at"),
+        }
+
+
+# Global job manager instance
+job_manager = JobManager()
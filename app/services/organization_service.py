@@ -1,16 +1,79 @@
-from typing import Optional
+import asyncio
+import base64
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Set
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.audit import audit_log
+from app.cache import org_cache
 from app.database import db_manager
 from app.models.organization import Organization, AdminUser
-from app.auth.password import hash_password, verify_password
+from app.auth.password import hash_password_async, hasher_pool, verify_password_async
+from app.config import settings
+from app.responses import etag_matches
 from app.auth.jwt_handler import JWTHandler
+from app.auth.refresh_tokens import refresh_tokens
+from app.services.job_service import JobContext, job_manager
+from app.services.trash_service import TrashService
+from app.tenancy import Placement
+from app.schemas.organization import OrganizationResponse
 from fastapi import HTTPException, status
 import re
 
 
+# Named projections for every master-database lookup, so a query never pulls more than its
+# use case needs. Existence checks return only the indexed field and exclude _id, which
+# lets the server answer them from the unique index without fetching the document.
+ORG_PUBLIC_PROJECTION = {"_id": 0, **{field: 1 for field in OrganizationResponse.model_fields}}
+PROJECTIONS = {
+    "organization_exists": {"_id": 0, "organization_name": 1},
+    "email_exists": {"_id": 0, "email": 1},
+    "organization_public": ORG_PUBLIC_PROJECTION,
+    "organization_ownership": {"_id": 0, "org_collection_name": 1, "admin_user_id": 1, "version": 1},
+    "admin_login": {"hashed_password": 1, "organization_name": 1},
+}
+# Excludes the placeholders that reserve the target name of a pending background rename
+NOT_RESERVED = {"pending_rename": {"$exists": False}}
+
+
 class OrganizationService:
     """Service class for organization management operations"""
     
+    @staticmethod
+    async def find_organization(
+        organization_name: str,
+        projection: str,
+        operation: str = "metadata",
+        include_reserved: bool = False
+    ) -> Optional[dict]:
+        """Look up an organization by name, returning only the fields of a named projection.
+
+        ``operation="metadata_read"`` allows the configured secondary reads for staleness-tolerant lookups.
+        Names reserved by a pending rename only match with ``include_reserved``.
+        """
+        orgs_collection = db_manager.master_collection("organizations", operation)
+        query = {"organization_name": organization_name}
+        if not include_reserved:
+            query.update(NOT_RESERVED)
+        return await orgs_collection.find_one(query, PROJECTIONS[projection])
+    
+    @staticmethod
+    async def organization_exists(organization_name: str) -> bool:
+        """Index-covered existence check on organization_name; a reserved name counts as taken"""
+        return await OrganizationService.find_organization(
+            organization_name,
+            "organization_exists",
+            include_reserved=True
+        ) is not None
+    
+    @staticmethod
+    async def email_registered(email: str) -> bool:
+        """Index-covered existence check on admin email"""
+        admins_collection = db_manager.get_master_db()["admin_users"]
+        return await admins_collection.find_one({"email": email}, PROJECTIONS["email_exists"]) is not None
+    
     @staticmethod
     def sanitize_org_name(organization_name: str) -> str:
         """Convert organization name to valid collection name"""
@@ -36,75 +99,372 @@ class OrganizationService:
         orgs_collection = master_db["organizations"]
         admins_collection = master_db["admin_users"]
         
+        # Cheap indexed existence checks first: a rejected duplicate must not cost a bcrypt hash
+        org_exists, email_exists = await asyncio.gather(
+            OrganizationService.organization_exists(organization_name),
+            OrganizationService.email_registered(email)
+        )
+        
         # Check if organization already exists
-        existing_org = await orgs_collection.find_one({
-            "organization_name": organization_name
-        })
-        if existing_org:
+        if org_exists:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Organization name already exists"
             )
         
         # Check if email already exists
-        existing_admin = await admins_collection.find_one({"email": email})
-        if existing_admin:
+        if email_exists:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
-        # Create organization collection name
-        org_collection_name = OrganizationService.sanitize_org_name(organization_name)
+        hashed_password = await hash_password_async(password)
         
-        # Hash password
-        hashed_password = hash_password(password)
+        # Create organization collection name and place it; the placement is stored with the record
+        org_collection_name = OrganizationService.sanitize_org_name(organization_name)
+        placement = db_manager.router.place(org_collection_name)
         
-        # Create admin user
         admin_user = AdminUser(
             email=email,
             hashed_password=hashed_password,
             organization_name=organization_name
         )
-        admin_result = await admins_collection.insert_one(admin_user.to_dict())
-        admin_user_id = str(admin_result.inserted_id)
-        
-        # Create organization
+        admin_user_id = str(admin_user._id)
         organization = Organization(
             organization_name=organization_name,
             org_collection_name=org_collection_name,
-            admin_user_id=admin_user_id
+            admin_user_id=admin_user_id,
+            placement=placement.to_dict()
         )
-        org_result = await orgs_collection.insert_one(organization.to_dict())
+        
+        async def insert_records(session):
+            try:
+                await admins_collection.insert_one(admin_user.to_dict(), session=session)
+            except DuplicateKeyError:
+                # Lost a race with a concurrent create; the unique index on email wins
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email already registered"
+                )
+            try:
+                await orgs_collection.insert_one(organization.to_dict(), session=session)
+            except DuplicateKeyError:
+                if session is None:
+                    # Rollback: delete admin if the organization name or collection is taken
+                    await admins_collection.delete_one({"_id": admin_user._id})
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Organization name already exists"
+                )
+        
+        # Admin and organization are written atomically where the deployment supports it
+        await db_manager.run_in_transaction(insert_records)
+        org_cache.invalidate(organization_name)
+        db_manager.router.remember(org_collection_name, placement)
         
         # Create organization's collection
         collection_created = await db_manager.create_org_collection(org_collection_name)
         if not collection_created:
             # Rollback: delete organization and admin if collection creation fails
-            await orgs_collection.delete_one({"_id": org_result.inserted_id})
-            await admins_collection.delete_one({"_id": admin_result.inserted_id})
+            async def delete_records(session):
+                await orgs_collection.delete_one({"_id": organization._id}, session=session)
+                await admins_collection.delete_one({"_id": admin_user._id}, session=session)
+            
+            await db_manager.run_in_transaction(delete_records)
+            org_cache.invalidate(organization_name)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create organization collection"
             )
         
+        await audit_log.record("organization.created", organization_name, actor=admin_user_id, email=email)
         return {
             "organization_name": organization.organization_name,
             "org_collection_name": organization.org_collection_name,
             "admin_user_id": admin_user_id,
             "created_at": organization.created_at,
-            "updated_at": organization.updated_at
+            "updated_at": organization.updated_at,
+            "version": organization.version
         }
     
     @staticmethod
-    async def get_organization(organization_name: str) -> dict:
-        """Get organization details by name"""
+    async def bulk_create_organizations(items: List[dict]) -> List[dict]:
+        """Create many organizations with batched round trips.
+
+        Each item has ``index``, ``organization_name``, ``email`` and ``password``.
+        Returns one result per item; failures are reported per item and rolled back.
+        """
         master_db = db_manager.get_master_db()
         orgs_collection = master_db["organizations"]
+        admins_collection = master_db["admin_users"]
+        results = {
+            item["index"]: {"index": item["index"], "organization_name": item["organization_name"]}
+            for item in items
+        }
         
-        org_data = await orgs_collection.find_one({
-            "organization_name": organization_name
-        })
+        def fail(item: dict, detail: str):
+            results[item["index"]].update({"status": "error", "detail": detail})
+        
+        # Reject duplicates within the batch itself
+        seen_names: Set[str] = set()
+        seen_emails: Set[str] = set()
+        seen_collections: Set[str] = set()
+        pending = []
+        for item in items:
+            item["org_collection_name"] = OrganizationService.sanitize_org_name(item["organization_name"])
+            if item["organization_name"] in seen_names:
+                fail(item, "Duplicate organization name in request")
+            elif item["email"] in seen_emails:
+                fail(item, "Duplicate email in request")
+            elif item["org_collection_name"] in seen_collections:
+                fail(item, "Duplicate organization collection name in request")
+            else:
+                seen_names.add(item["organization_name"])
+                seen_emails.add(item["email"])
+                seen_collections.add(item["org_collection_name"])
+                pending.append(item)
+        
+        # One $in query per unique field instead of two lookups per organization
+        existing_names, existing_collections, existing_emails = await asyncio.gather(
+            orgs_collection.distinct("organization_name", {"organization_name": {"$in": list(seen_names)}}),
+            orgs_collection.distinct("org_collection_name", {"org_collection_name": {"$in": list(seen_collections)}}),
+            admins_collection.distinct("email", {"email": {"$in": list(seen_emails)}})
+        )
+        existing_names, existing_collections, existing_emails = (
+            set(existing_names), set(existing_collections), set(existing_emails)
+        )
+        candidates = []
+        for item in pending:
+            if item["organization_name"] in existing_names:
+                fail(item, "Organization name already exists")
+            elif item["org_collection_name"] in existing_collections:
+                fail(item, "Organization collection name already exists")
+            elif item["email"] in existing_emails:
+                fail(item, "Email already registered")
+            else:
+                candidates.append(item)
+        
+        # Hash in parallel, but never submit more than the pool has workers so we don't trip its 503
+        hash_slots = asyncio.Semaphore(hasher_pool.max_workers)
+        
+        async def hash_item(item: dict) -> Optional[str]:
+            async with hash_slots:
+                try:
+                    return await hash_password_async(item["password"])
+                except HTTPException as e:
+                    fail(item, e.detail)
+                    return None
+        
+        hashes = await asyncio.gather(*(hash_item(item) for item in candidates))
+        
+        admins = []
+        organizations = []
+        to_insert = []
+        for item, hashed_password in zip(candidates, hashes):
+            if hashed_password is None:
+                continue
+            admin_user = AdminUser(
+                email=item["email"],
+                hashed_password=hashed_password,
+                organization_name=item["organization_name"]
+            )
+            organization = Organization(
+                organization_name=item["organization_name"],
+                org_collection_name=item["org_collection_name"],
+                admin_user_id=str(admin_user._id),
+                placement=db_manager.router.place(item["org_collection_name"]).to_dict()
+            )
+            admins.append(admin_user.to_dict())
+            organizations.append(organization.to_dict())
+            to_insert.append(item)
+        
+        # Unordered bulk inserts; rows that lose a race on a unique index fail individually
+        failed_admins = await OrganizationService._insert_many_unordered(admins_collection, admins)
+        for position in failed_admins:
+            fail(to_insert[position], "Email already registered")
+        
+        org_positions = [i for i in range(len(to_insert)) if i not in failed_admins]
+        failed_orgs = await OrganizationService._insert_many_unordered(
+            orgs_collection,
+            [organizations[i] for i in org_positions]
+        )
+        rollback_admin_ids = []
+        for offset in failed_orgs:
+            position = org_positions[offset]
+            fail(to_insert[position], "Organization name already exists")
+            rollback_admin_ids.append(admins[position]["_id"])
+        
+        # Create tenant collections with bounded concurrency
+        created_positions = [p for i, p in enumerate(org_positions) if i not in failed_orgs]
+        collection_slots = asyncio.Semaphore(settings.bulk_create_collection_concurrency)
+        
+        async def create_collection(position: int) -> bool:
+            org_collection_name = to_insert[position]["org_collection_name"]
+            db_manager.router.remember(org_collection_name, Placement.from_dict(organizations[position]["placement"]))
+            async with collection_slots:
+                return await db_manager.create_org_collection(org_collection_name)
+        
+        collections_created = await asyncio.gather(*(create_collection(p) for p in created_positions))
+        rollback_org_ids = []
+        for position, created in zip(created_positions, collections_created):
+            item = to_insert[position]
+            if not created:
+                fail(item, "Failed to create organization collection")
+                rollback_org_ids.append(organizations[position]["_id"])
+                rollback_admin_ids.append(admins[position]["_id"])
+                continue
+            organization = organizations[position]
+            results[item["index"]].update({
+                "status": "created",
+                "org_collection_name": organization["org_collection_name"],
+                "admin_user_id": organization["admin_user_id"],
+                "created_at": organization["created_at"],
+                "updated_at": organization["updated_at"]
+            })
+            await audit_log.record(
+                "organization.created",
+                item["organization_name"],
+                actor=organization["admin_user_id"],
+                email=item["email"],
+                bulk=True
+            )
+        
+        if rollback_org_ids:
+            await orgs_collection.delete_many({"_id": {"$in": rollback_org_ids}})
+        if rollback_admin_ids:
+            await admins_collection.delete_many({"_id": {"$in": rollback_admin_ids}})
+        org_cache.invalidate(*(organization["organization_name"] for organization in organizations))
+        
+        return [results[item["index"]] for item in items]
+    
+    @staticmethod
+    async def _insert_many_unordered(collection, documents: List[dict]) -> Set[int]:
+        """insert_many(ordered=False), returning the positions of documents that hit a duplicate key"""
+        if not documents:
+            return set()
+        try:
+            await collection.insert_many(documents, ordered=False)
+            return set()
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != 11000 for err in write_errors):
+                raise
+            return {err["index"] for err in write_errors}
+    
+    @staticmethod
+    def encode_list_cursor(org_data: dict) -> str:
+        """Opaque keyset cursor pointing just past an organization"""
+        raw = json.dumps([org_data["organization_name"], str(org_data["_id"])])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def decode_list_cursor(cursor: str) -> tuple:
+        """Return (organization_name, _id) from a cursor produced by encode_list_cursor"""
+        try:
+            organization_name, org_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return organization_name, ObjectId(org_id)
+        except (ValueError, TypeError, InvalidId):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    
+    @staticmethod
+    async def list_organizations(
+        limit: int,
+        after: Optional[tuple] = None,
+        prefix: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> AsyncIterator[dict]:
+        """Yield up to ``limit + 1`` organizations in (organization_name, _id) order.
+
+        Pages are keyset-based, so the cost of a page does not grow with its depth.
+        The extra document tells the caller whether there is a next page.
+        """
+        orgs_collection = db_manager.master_collection("organizations", "metadata_read")
+        
+        conditions = [NOT_RESERVED]
+        if prefix:
+            # An anchored, case-sensitive regex becomes an index range scan
+            conditions.append({"organization_name": {"$regex": f"^{re.escape(prefix)}"}})
+        if after is not None:
+            organization_name, org_id = after
+            conditions.append({"$or": [
+                {"organization_name": {"$gt": organization_name}},
+                {"organization_name": organization_name, "_id": {"$gt": org_id}}
+            ]})
+        created_range = {}
+        if created_after is not None:
+            created_range["$gte"] = created_after
+        if created_before is not None:
+            created_range["$lt"] = created_before
+        if created_range:
+            conditions.append({"created_at": created_range})
+        
+        query = {"$and": conditions}
+        # _id is kept for the keyset cursor
+        projection = {**ORG_PUBLIC_PROJECTION, "_id": 1}
+        cursor = orgs_collection.find(
+            query,
+            projection,
+            sort=[("organization_name", 1), ("_id", 1)],
+            limit=limit + 1,
+            batch_size=limit + 1
+        )
+        async for org_data in cursor:
+            yield org_data
+    
+    @staticmethod
+    def entity_tag(org_data: dict) -> str:
+        """Strong ETag of an organization.
+
+        The admin id is unique to each creation of a name, so a deleted and recreated
+        organization never reuses an old tag.
+        """
+        return f'"{org_data["admin_user_id"]}-{org_data.get("version", 0)}"'
+    
+    @staticmethod
+    async def _touch_organization(organization_name: str, expected_version: Optional[int] = None) -> Optional[dict]:
+        """Bump version and updated_at; with ``expected_version`` only if nobody changed it meanwhile.
+
+        Returns the previous version and updated_at for _untouch_organization.
+        """
+        query = {"organization_name": organization_name, **NOT_RESERVED}
+        if expected_version is not None:
+            # Documents written before versioning have no field; $inc starts them at 1
+            query["version"] = expected_version if expected_version else {"$in": [0, None]}
+        previous = await db_manager.get_master_db()["organizations"].find_one_and_update(
+            query,
+            {"$set": {"updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+            projection={"_id": 0, "version": 1, "updated_at": 1}
+        )
+        org_cache.invalidate(organization_name)
+        if expected_version is not None and previous is None:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Organization was modified by another request"
+            )
+        return previous
+    
+    @staticmethod
+    async def _untouch_organization(organization_name: str, previous: dict):
+        """Undo _touch_organization after a failed update, unless another update has bumped it since"""
+        version = previous.get("version", 0)
+        await db_manager.get_master_db()["organizations"].update_one(
+            {"organization_name": organization_name, "version": version + 1},
+            {"$set": {"version": version, "updated_at": previous["updated_at"]}}
+        )
+        org_cache.invalidate(organization_name)
+    
+    @staticmethod
+    async def get_organization(organization_name: str) -> dict:
+        """Get organization details by name (served from the metadata cache when possible)"""
+        org_data = await org_cache.get_or_load(
+            organization_name,
+            lambda: OrganizationService._load_organization(organization_name)
+        )
         
         if not org_data:
             raise HTTPException(
@@ -112,9 +472,23 @@ class OrganizationService:
                 detail="Organization not found"
             )
         
+        # Callers may mutate the result; never hand out the cached dict itself
+        return dict(org_data)
+    
+    @staticmethod
+    async def _load_organization(organization_name: str) -> Optional[dict]:
+        """Load organization metadata from the master database"""
+        org_data = await OrganizationService.find_organization(
+            organization_name,
+            "organization_public",
+            operation="metadata_read"
+        )
+        
+        if not org_data:
+            return None
+        
         # Convert ObjectId to string
         org_data["admin_user_id"] = str(org_data["admin_user_id"])
-        org_data["_id"] = str(org_data["_id"])
         
         return org_data
     
@@ -124,17 +498,22 @@ class OrganizationService:
         new_email: str,
         new_password: str,
         current_admin: dict,
-        new_organization_name: Optional[str] = None
+        new_organization_name: Optional[str] = None,
+        background: bool = False,
+        if_match: Optional[str] = None
     ) -> dict:
-        """Update organization (rename and migrate data if new name provided)"""
+        """Update organization (rename and migrate data if new name provided).
+
+        With ``background=True`` a rename is handed to the job engine and the result
+        carries a ``job_id`` instead of the updated organization. ``if_match`` is the
+        request's ``If-Match`` header: the update fails with 412 unless it lists the
+        organization's current ETag.
+        """
         master_db = db_manager.get_master_db()
-        orgs_collection = master_db["organizations"]
         admins_collection = master_db["admin_users"]
         
         # Get existing organization
-        existing_org = await orgs_collection.find_one({
-            "organization_name": organization_name
-        })
+        existing_org = await OrganizationService.find_organization(organization_name, "organization_ownership")
         
         if not existing_org:
             raise HTTPException(
@@ -149,18 +528,24 @@ class OrganizationService:
                 detail="You don't have permission to update this organization"
             )
         
-        from datetime import datetime
+        expected_version = None
+        if if_match is not None:
+            if not etag_matches(if_match, OrganizationService.entity_tag(existing_org)):
+                raise HTTPException(
+                    status_code=status.HTTP_412_PRECONDITION_FAILED,
+                    detail="Organization was modified by another request"
+                )
+            expected_version = existing_org.get("version", 0)
         
         # Handle organization name change if provided
         final_org_name = organization_name
         old_collection_name = existing_org["org_collection_name"]
+        rename_job_params = None
+        rename_now = False
         
         if new_organization_name and new_organization_name != organization_name:
             # Validate that new organization name does not already exist
-            existing_new_org = await orgs_collection.find_one({
-                "organization_name": new_organization_name
-            })
-            if existing_new_org:
+            if await OrganizationService.organization_exists(new_organization_name):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="New organization name already exists"
@@ -176,104 +561,300 @@ class OrganizationService:
                     detail="Collection for new organization name already exists"
                 )
             
-            # Create new collection
-            collection_created = await db_manager.create_org_collection(new_collection_name)
-            if not collection_created:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to create new organization collection"
-                )
-            
-            # Copy data from old collection to new collection
-            if await db_manager.collection_exists(old_collection_name):
-                data_copied = await db_manager.copy_collection_data(
-                    old_collection_name,
-                    new_collection_name
-                )
-                if not data_copied:
-                    # Rollback: delete new collection
-                    await db_manager.delete_org_collection(new_collection_name)
+            if background:
+                if await job_manager.active_job_for(organization_name):
                     raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Failed to migrate data to new collection"
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="A background job is already running for this organization"
                     )
-            
-            # Update organization metadata with new name and collection
-            final_org_name = new_organization_name
-            await orgs_collection.update_one(
-                {"organization_name": organization_name},
-                {
-                    "$set": {
-                        "organization_name": new_organization_name,
-                        "org_collection_name": new_collection_name,
-                        "updated_at": datetime.utcnow()
-                    }
+                rename_job_params = {
+                    "new_organization_name": new_organization_name,
+                    "old_collection_name": old_collection_name,
+                    "new_collection_name": new_collection_name,
+                    "admin_user_id": str(existing_org["admin_user_id"]),
+                    # The old collection is dropped after the switch, when its name no longer routes to it
+                    "old_placement": (await db_manager.router.resolve(old_collection_name)).to_dict()
                 }
-            )
+            else:
+                rename_now = True
+        
+        if rename_job_params is not None:
+            # Hold the new name until the job switches the organization over to it
+            await OrganizationService._reserve_name(new_organization_name, new_collection_name, organization_name)
+        touched = None
+        try:
+            hashed_password = await hash_password_async(new_password)
+            # Claim the version before writing anything, so a concurrent If-Match update fails cleanly
+            touched = await OrganizationService._touch_organization(organization_name, expected_version)
             
-            # Update admin user with new organization name
+            if rename_now:
+                await OrganizationService._migrate_and_rename(
+                    organization_name,
+                    new_organization_name,
+                    old_collection_name,
+                    new_collection_name,
+                    existing_org["admin_user_id"],
+                    # One update, one version: _touch_organization above already bumped it
+                    bump_version=False
+                )
+                final_org_name = new_organization_name
+            
+            # Update admin user credentials
             admin_id = ObjectId(existing_org["admin_user_id"])
             await admins_collection.update_one(
                 {"_id": admin_id},
                 {
                     "$set": {
-                        "organization_name": new_organization_name
+                        "email": new_email,
+                        "hashed_password": hashed_password
                     }
                 }
             )
+            # New credentials end every session started with the old ones
+            await refresh_tokens.revoke_admin(str(admin_id))
             
-            # Delete old collection after successful migration
-            await db_manager.delete_org_collection(old_collection_name)
+            if rename_job_params is not None:
+                job_id = await job_manager.submit("rename_organization", organization_name, rename_job_params)
+        except BaseException:
+            # A failed update must not leave a new version (and ETag) behind
+            if touched is not None:
+                await OrganizationService._untouch_organization(organization_name, touched)
+            if rename_job_params is not None:
+                await OrganizationService._release_name(new_organization_name, organization_name)
+            raise
         
-        # Update admin user credentials
-        admin_id = ObjectId(existing_org["admin_user_id"])
-        hashed_password = hash_password(new_password)
+        if rename_job_params is not None:
+            await audit_log.record(
+                "organization.updated",
+                organization_name,
+                actor=current_admin["admin_id"],
+                email=new_email,
+                new_organization_name=new_organization_name,
+                job_id=job_id
+            )
+            return {
+                "job_id": job_id,
+                "status": "pending",
+                "organization_name": organization_name
+            }
+        
+        await audit_log.record("organization.updated", final_org_name, actor=current_admin["admin_id"], email=new_email)
         
+        # Get updated organization
+        updated_org = await OrganizationService.find_organization(final_org_name, "organization_public")
+        
+        updated_org["admin_user_id"] = str(updated_org["admin_user_id"])
+        
+        return updated_org
+    
+    @staticmethod
+    async def _reserve_name(new_organization_name: str, new_collection_name: str, organization_name: str):
+        """Insert a placeholder holding a name and collection name under the organizations unique indexes"""
+        placement = await db_manager.router.resolve(new_collection_name)
+        try:
+            await db_manager.get_master_db()["organizations"].insert_one({
+                "organization_name": new_organization_name,
+                "org_collection_name": new_collection_name,
+                "placement": placement.to_dict(),
+                "pending_rename": organization_name,
+                "created_at": datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="New organization name already exists"
+            )
+    
+    @staticmethod
+    async def _release_name(new_organization_name: str, organization_name: str, session=None):
+        """Remove the placeholder left by _reserve_name"""
+        await db_manager.get_master_db()["organizations"].delete_one(
+            {"organization_name": new_organization_name, "pending_rename": organization_name},
+            session=session
+        )
+    
+    @staticmethod
+    async def _migrate_and_rename(
+        organization_name: str,
+        new_organization_name: str,
+        old_collection_name: str,
+        new_collection_name: str,
+        admin_user_id: str,
+        bump_version: bool = True
+    ):
+        """Move the tenant collection and switch metadata to the new name.
+
+        An existing collection under the new name is never replaced, and the move is undone
+        if the organization record cannot be switched to the new collection.
+        """
+        old_placement = await db_manager.router.resolve(old_collection_name)
+        same_database = old_placement == await db_manager.router.resolve(new_collection_name)
+        old_exists = await db_manager.collection_exists(old_collection_name, use_registry=False)
+        
+        if old_exists and same_database:
+            # Server-side rename; fails if the new collection already exists
+            data_moved = await db_manager.move_collection_data(old_collection_name, new_collection_name)
+        else:
+            if await db_manager.collection_exists(new_collection_name, use_registry=False):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Collection for new organization name already exists"
+                )
+            data_moved = await db_manager.create_org_collection(new_collection_name)
+            if data_moved and old_exists:
+                # Across databases the source is kept until the metadata points at the copy
+                data_moved = await db_manager.copy_collection_data(old_collection_name, new_collection_name)
+                if not data_moved:
+                    await db_manager.delete_org_collection(new_collection_name)
+        if not data_moved:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to migrate data to new collection"
+            )
+        
+        try:
+            await OrganizationService._apply_rename_metadata(
+                organization_name,
+                new_organization_name,
+                new_collection_name,
+                admin_user_id,
+                bump_version=bump_version
+            )
+        except Exception:
+            await OrganizationService._undo_collection_move(
+                old_collection_name,
+                new_collection_name,
+                admin_user_id,
+                renamed=old_exists and same_database
+            )
+            raise
+        
+        if old_exists and not same_database:
+            await db_manager.delete_org_collection(old_collection_name, old_placement)
+    
+    @staticmethod
+    async def _undo_collection_move(
+        old_collection_name: str,
+        new_collection_name: str,
+        admin_user_id: str,
+        renamed: bool
+    ):
+        """Put a moved tenant collection back, unless the organization already points at it"""
+        if await OrganizationService._rename_applied(admin_user_id, new_collection_name):
+            return
+        if renamed:
+            await db_manager.move_collection_data(new_collection_name, old_collection_name)
+        else:
+            await db_manager.delete_org_collection(new_collection_name)
+    
+    @staticmethod
+    async def _rename_applied(admin_user_id: str, new_collection_name: str) -> bool:
+        """Whether this admin's organization already points at the new collection"""
+        switched = await db_manager.get_master_db()["organizations"].find_one(
+            {"admin_user_id": str(admin_user_id), "org_collection_name": new_collection_name, **NOT_RESERVED},
+            {"_id": 1}
+        )
+        return switched is not None
+    
+    @staticmethod
+    async def _apply_rename_metadata(
+        organization_name: str,
+        new_organization_name: str,
+        new_collection_name: str,
+        admin_user_id: str,
+        bump_version: bool = True
+    ):
+        """Point organization and admin records at the new name and collection.
+
+        ``bump_version=False`` is for callers that already bumped the version in the same update.
+        """
+        master_db = db_manager.get_master_db()
+        orgs_collection = master_db["organizations"]
+        admins_collection = master_db["admin_users"]
+        placement = await db_manager.router.resolve(new_collection_name)
+        
+        async def switch_records(session):
+            # A background rename's placeholder gives way to the organization itself
+            await OrganizationService._release_name(new_organization_name, organization_name, session=session)
+            update = {
+                "$set": {
+                    "organization_name": new_organization_name,
+                    "org_collection_name": new_collection_name,
+                    "placement": placement.to_dict(),
+                    "updated_at": datetime.utcnow()
+                }
+            }
+            if bump_version:
+                update["$inc"] = {"version": 1}
+            result = await orgs_collection.update_one(
+                {"organization_name": organization_name, **NOT_RESERVED},
+                update,
+                session=session
+            )
+            if result.matched_count == 0:
+                # Renamed or deleted since the rename was validated (e.g. by a job that finished meanwhile)
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Organization was renamed or deleted by another request"
+                )
+        
+        # Update organization metadata with new name and collection
+        try:
+            await db_manager.run_in_transaction(switch_records)
+        except DuplicateKeyError:
+            # Taken by a create that ran after the rename was validated
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="New organization name already exists"
+            )
+        org_cache.invalidate(organization_name, new_organization_name)
+        db_manager.router.remember(new_collection_name, placement)
+        
+        # Update admin user with new organization name
+        admin_id = ObjectId(admin_user_id)
         await admins_collection.update_one(
             {"_id": admin_id},
             {
                 "$set": {
-                    "email": new_email,
-                    "hashed_password": hashed_password
+                    "organization_name": new_organization_name
                 }
             }
         )
+        await refresh_tokens.rename_organization(str(admin_user_id), new_organization_name)
         
-        # Update organization updated_at if name wasn't changed
-        if not new_organization_name or new_organization_name == organization_name:
-            await orgs_collection.update_one(
-                {"organization_name": final_org_name},
-                {
-                    "$set": {
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
-        
-        # Get updated organization
-        updated_org = await orgs_collection.find_one({
-            "organization_name": final_org_name
-        })
-        
-        updated_org["admin_user_id"] = str(updated_org["admin_user_id"])
-        updated_org["_id"] = str(updated_org["_id"])
-        
-        return updated_org
+        # Events stay under the name they were recorded with, so the rename is logged under both
+        await audit_log.record(
+            "organization.renamed",
+            organization_name,
+            actor=str(admin_user_id),
+            new_organization_name=new_organization_name
+        )
+        await audit_log.record(
+            "organization.renamed",
+            new_organization_name,
+            actor=str(admin_user_id),
+            previous_organization_name=organization_name
+        )
     
     @staticmethod
     async def delete_organization(
         organization_name: str,
-        current_admin: dict
+        current_admin: dict,
+        background: bool = False
     ) -> dict:
-        """Delete organization and its collection"""
+        """Delete organization and its collection.
+
+        With soft delete (``TRASH_RETENTION_HOURS`` > 0) the organization is moved to the trash
+        in O(1) and can be restored until it is purged; ``background`` then has no effect.
+        Otherwise, with ``background=True`` the metadata is removed immediately and the
+        collection drop runs as a background job.
+        """
         master_db = db_manager.get_master_db()
         orgs_collection = master_db["organizations"]
         admins_collection = master_db["admin_users"]
         
         # Get organization
-        org_data = await orgs_collection.find_one({
-            "organization_name": organization_name
-        })
+        org_data = await OrganizationService.find_organization(organization_name, "organization_ownership")
         
         if not org_data:
             raise HTTPException(
@@ -288,17 +869,70 @@ class OrganizationService:
                 detail="You don't have permission to delete this organization"
             )
         
+        if settings.trash_retention_hours > 0:
+            # A rename job would otherwise keep moving a collection that has just been trashed
+            if await job_manager.active_job_for(organization_name):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A background job is already running for this organization"
+                )
+            result = await TrashService.trash_organization(organization_name, current_admin["admin_id"])
+            await audit_log.record(
+                "organization.deleted",
+                organization_name,
+                actor=current_admin["admin_id"],
+                org_collection_name=org_data["org_collection_name"],
+                restore_until=result["restore_until"]
+            )
+            return result
+        
+        if background and await job_manager.active_job_for(organization_name):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A background job is already running for this organization"
+            )
+        
         # Delete organization collection
         org_collection_name = org_data["org_collection_name"]
-        await db_manager.delete_org_collection(org_collection_name)
+        placement = await db_manager.router.resolve(org_collection_name)
+        if not background:
+            await db_manager.delete_org_collection(org_collection_name, placement)
         
-        # Delete admin user
+        # Delete admin user and end their sessions
         admin_id = ObjectId(org_data["admin_user_id"])
         await admins_collection.delete_one({"_id": admin_id})
+        await refresh_tokens.revoke_admin(str(admin_id))
         
         # Delete organization
         await orgs_collection.delete_one({"organization_name": organization_name})
+        org_cache.invalidate(organization_name)
         
+        if background:
+            job_id = await job_manager.submit(
+                "delete_organization",
+                organization_name,
+                # The record is gone before the job runs, so the job carries the placement
+                {"org_collection_name": org_collection_name, "placement": placement.to_dict()}
+            )
+            await audit_log.record(
+                "organization.deleted",
+                organization_name,
+                actor=current_admin["admin_id"],
+                org_collection_name=org_collection_name,
+                job_id=job_id
+            )
+            return {
+                "job_id": job_id,
+                "status": "pending",
+                "organization_name": organization_name
+            }
+        
+        await audit_log.record(
+            "organization.deleted",
+            organization_name,
+            actor=current_admin["admin_id"],
+            org_collection_name=org_collection_name
+        )
         return {
             "message": "Organization deleted successfully",
             "organization_name": organization_name
@@ -311,7 +945,7 @@ class OrganizationService:
         admins_collection = master_db["admin_users"]
         
         # Find admin by email
-        admin_data = await admins_collection.find_one({"email": email})
+        admin_data = await admins_collection.find_one({"email": email}, PROJECTIONS["admin_login"])
         
         if not admin_data:
             raise HTTPException(
@@ -320,21 +954,148 @@ class OrganizationService:
             )
         
         # Verify password
-        if not verify_password(password, admin_data["hashed_password"]):
+        if not await verify_password_async(password, admin_data["hashed_password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
-        # Create JWT token
         admin_id = str(admin_data["_id"])
-        organization_name = admin_data["organization_name"]
-        token = JWTHandler.create_admin_token(admin_id, organization_name)
+        refresh_token = await refresh_tokens.issue(admin_id, admin_data["organization_name"])
         
+        # Renames and deletes update the admin record before its refresh tokens, so reading it
+        # again once the token exists catches one that completed during the password check
+        current = await admins_collection.find_one({"_id": admin_data["_id"]}, {"organization_name": 1})
+        if not current:
+            await refresh_tokens.revoke_admin(admin_id)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid email or password"
+            )
+        organization_name = current["organization_name"]
+        if organization_name != admin_data["organization_name"]:
+            await refresh_tokens.rename_organization(admin_id, organization_name)
+        return OrganizationService._token_response(admin_id, organization_name, refresh_token)
+    
+    @staticmethod
+    async def refresh_admin_token(refresh_token: str) -> dict:
+        """Issue a new access token for a refresh token (one indexed lookup, no password hashing)"""
+        claims = await refresh_tokens.redeem(refresh_token)
+        if not claims:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired refresh token"
+            )
+        return OrganizationService._token_response(
+            claims["admin_user_id"],
+            claims["organization_name"],
+            refresh_token
+        )
+    
+    @staticmethod
+    def _token_response(admin_id: str, organization_name: str, refresh_token: str) -> dict:
         return {
-            "access_token": token,
+            "access_token": JWTHandler.create_admin_token(admin_id, organization_name),
             "token_type": "bearer",
+            "expires_in": int(JWTHandler.access_token_lifetime().total_seconds()),
+            "refresh_token": refresh_token,
             "organization_name": organization_name,
             "admin_id": admin_id
         }
+    
+    @staticmethod
+    async def run_rename_job(job: JobContext):
+        """Background job: migrate the tenant collection, then switch metadata to the new name.
+
+        Each step is idempotent and checkpointed, so a resumed job picks up where it stopped.
+        The new name stays reserved until the metadata switch; a failed job moves the data
+        back and releases it.
+        """
+        params = job.params
+        old_collection_name = params["old_collection_name"]
+        new_collection_name = params["new_collection_name"]
+        old_placement = Placement.from_dict(params.get("old_placement")) or await db_manager.router.resolve(old_collection_name)
+        same_database = old_placement == await db_manager.router.resolve(new_collection_name)
+        try:
+            await OrganizationService._run_rename_steps(job, same_database)
+        except Exception:
+            if job.checkpoint.get("data_moved") or job.checkpoint.get("target_created"):
+                await OrganizationService._undo_collection_move(
+                    old_collection_name,
+                    new_collection_name,
+                    params["admin_user_id"],
+                    renamed=same_database
+                )
+            await OrganizationService._release_name(params["new_organization_name"], job.job["organization_name"])
+            raise
+        
+        if not same_database:
+            await db_manager.delete_org_collection(old_collection_name, old_placement)
+    
+    @staticmethod
+    async def _run_rename_steps(job: JobContext, same_database: bool):
+        params = job.params
+        old_collection_name = params["old_collection_name"]
+        new_collection_name = params["new_collection_name"]
+        
+        if not job.checkpoint.get("data_moved"):
+            # Ask the server: a crash after renameCollection leaves the registry stale
+            old_exists = await db_manager.collection_exists(old_collection_name, use_registry=False)
+            documents_total = 0
+            if old_exists:
+                source_db = await db_manager.get_org_database(old_collection_name)
+                documents_total = await source_db[old_collection_name].estimated_document_count()
+                await job.set_total(documents_total)
+            
+            # Never move data into (or rename over) a collection this job did not create. A same-database
+            # job that finds only the target has already renamed it before a crash.
+            if (
+                not job.checkpoint.get("target_created")
+                and (old_exists or not same_database)
+                and await db_manager.collection_exists(new_collection_name, use_registry=False)
+            ):
+                raise RuntimeError("Collection for new organization name already exists")
+            
+            if same_database:
+                # renameCollection is O(1); a crash after it leaves the source gone, which we detect above
+                if old_exists and not await db_manager.move_collection_data(old_collection_name, new_collection_name):
+                    raise RuntimeError("Failed to migrate data to new collection")
+                await job.report_progress(documents_total, {"data_moved": True}, throttle=False)
+            else:
+                if not job.checkpoint.get("target_created"):
+                    if not await db_manager.create_org_collection(new_collection_name):
+                        raise RuntimeError("Failed to create new organization collection")
+                    await job.save_checkpoint({"target_created": True})
+                
+                async def on_batch(count: int, last_id):
+                    await job.report_progress(count, {"target_created": True, "last_id": last_id})
+                
+                if old_exists:
+                    await db_manager.copy_collection_resumable(
+                        old_collection_name,
+                        new_collection_name,
+                        start_after=job.checkpoint.get("last_id"),
+                        on_batch=on_batch
+                    )
+                await job.save_checkpoint({"data_moved": True})
+        
+        # A job resumed after a crash may find the switch already done
+        if await OrganizationService._rename_applied(params["admin_user_id"], new_collection_name):
+            return
+        await OrganizationService._apply_rename_metadata(
+            job.job["organization_name"],
+            params["new_organization_name"],
+            new_collection_name,
+            params["admin_user_id"]
+        )
+    
+    @staticmethod
+    async def run_delete_job(job: JobContext):
+        """Background job: drop a deleted organization's collection"""
+        placement = Placement.from_dict(job.params.get("placement"))
+        if not await db_manager.delete_org_collection(job.params["org_collection_name"], placement):
+            raise RuntimeError("Failed to delete organization collection")
+
 
+job_manager.register("rename_organization", OrganizationService.run_rename_job)
+job_manager.register("delete_organization", OrganizationService.run_delete_job)
@@ -0,0 +1,415 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Tuple
+import bson
+from bson import CodecOptions, json_util
+from bson.raw_bson import RawBSONDocument
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError, OperationFailure
+from app.config import settings
+from app.database import db_manager
+from app.services.organization_service import OrganizationService
+from app.services.tenant_data_service import TenantDataService
+from app.snapshot import (
+    COMPRESSIONS,
+    FORMAT_VERSION,
+    FRAME_CHUNK,
+    FRAME_END,
+    FRAME_MANIFEST,
+    MAGIC,
+    FrameReader,
+    SnapshotError,
+    chain_digest,
+    chunk_digest,
+    chunk_header,
+    decode_chunk,
+    encode_chunk,
+    encode_frame,
+    encode_json_frame,
+    frame_header
+)
+from fastapi import HTTPException, status
+
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+IMPORT_RUNNING = "running"
+IMPORT_INCOMPLETE = "incomplete"
+IMPORT_FAILED = "failed"
+IMPORT_COMPLETED = "completed"
+
+
+def _raw_collection(collection: AsyncIOMotorCollection) -> Optional[AsyncIOMotorCollection]:
+    """The collection returning undecoded BSON, or None where unsupported (in-memory stand-ins)"""
+    try:
+        return collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+    except NotImplementedError:
+        return None
+
+
+def _encode(sequence: int, documents: int, raw: bytes, compression: str, level: int) -> Tuple[bytes, bytes]:
+    payload = encode_chunk(sequence, documents, raw, compression, level)
+    return payload, chunk_digest(payload)
+
+
+def _decode(payload: bytes, compression: str, raw_documents: bool) -> list:
+    raw = decode_chunk(payload, compression)
+    return bson.decode_all(raw, RAW_CODEC_OPTIONS) if raw_documents else bson.decode_all(raw)
+
+
+class SnapshotService:
+    """Streaming export and resumable import of an organization's collection"""
+
+    @staticmethod
+    async def export_snapshot(organization_name: str) -> Tuple[dict, AsyncIterator[bytes]]:
+        """Return the manifest and the snapshot byte stream.
+
+        The organization and its indexes are looked up before the stream starts, so errors
+        surface as HTTP errors rather than a truncated download.
+        """
+        org_data = await OrganizationService.get_organization(organization_name)
+        collection = await db_manager.tenant_collection(org_data["org_collection_name"], "migration")
+        indexes = []
+        async for index in collection.list_indexes():
+            index = dict(index)
+            if index["name"] == "_id_":
+                continue
+            index.pop("v", None)
+            index.pop("ns", None)
+            index["key"] = list(index["key"].items())
+            indexes.append(index)
+        manifest = {
+            "format": FORMAT_VERSION,
+            "snapshot_id": uuid.uuid4().hex,
+            "organization_name": organization_name,
+            "collection": org_data["org_collection_name"],
+            "created_at": datetime.utcnow().isoformat(),
+            "compression": settings.snapshot_compression,
+            "chunk_bytes": settings.snapshot_chunk_bytes,
+            "documents_estimate": await collection.estimated_document_count(),
+            "indexes": indexes,
+        }
+        return manifest, SnapshotService._export_frames(collection, manifest)
+
+    @staticmethod
+    async def _export_frames(collection: AsyncIOMotorCollection, manifest: dict) -> AsyncIterator[bytes]:
+        """Read, compress and send in a pipeline.
+
+        The reader keeps filling the next chunk while earlier chunks are compressed on worker
+        threads and sent; at most ``snapshot_max_inflight_chunks`` chunks are buffered.
+        """
+        compression = manifest["compression"]
+        level = settings.snapshot_compression_level
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.snapshot_max_inflight_chunks)
+
+        async def read_chunks():
+            try:
+                raw_collection = _raw_collection(collection)
+                source = raw_collection if raw_collection is not None else collection
+                parts: List[bytes] = []
+                size = 0
+                sequence = 0
+                async for document in source.find({}, sort=[("_id", 1)], batch_size=settings.migration_batch_size):
+                    data = document.raw if raw_collection is not None else bson.encode(document)
+                    parts.append(data)
+                    size += len(data)
+                    if size >= settings.snapshot_chunk_bytes:
+                        await queue.put(asyncio.ensure_future(asyncio.to_thread(
+                            _encode, sequence, len(parts), b"".join(parts), compression, level
+                        )))
+                        sequence += 1
+                        parts = []
+                        size = 0
+                if parts:
+                    await queue.put(asyncio.ensure_future(asyncio.to_thread(
+                        _encode, sequence, len(parts), b"".join(parts), compression, level
+                    )))
+            except Exception as e:
+                await queue.put(e)
+            else:
+                await queue.put(None)
+
+        reader = asyncio.create_task(read_chunks())
+        try:
+            # Extended JSON keeps index options such as partialFilterExpression intact
+            manifest_payload = json_util.dumps(manifest, json_options=json_util.RELAXED_JSON_OPTIONS).encode()
+            digest = hashlib.sha256(manifest_payload).digest()
+            yield MAGIC + encode_frame(FRAME_MANIFEST, manifest_payload)
+            chunks = 0
+            documents = 0
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    # No trailer is written, so an importer sees the snapshot as incomplete
+                    raise item
+                payload, payload_digest = await item
+                digest = chain_digest(digest, payload_digest)
+                chunks += 1
+                documents += chunk_header(payload)[1]
+                yield frame_header(FRAME_CHUNK, len(payload))
+                yield payload
+            yield encode_json_frame(FRAME_END, {"chunks": chunks, "documents": documents, "digest": digest.hex()})
+        finally:
+            reader.cancel()
+
+    @staticmethod
+    async def _insert_documents(collection: AsyncIOMotorCollection, documents: list) -> Tuple[int, int]:
+        """Unordered insert; returns (inserted, already present). Duplicates make replays idempotent."""
+        if not documents:
+            return 0, 0
+        try:
+            result = await collection.insert_many(documents, ordered=False)
+            return len(result.inserted_ids), 0
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in write_errors):
+                raise
+            return e.details.get("nInserted", 0), len(write_errors)
+
+    @staticmethod
+    async def _build_indexes(collection: AsyncIOMotorCollection, indexes: List[dict]) -> List[str]:
+        models = []
+        for index in indexes:
+            options = {key: value for key, value in index.items() if key != "key"}
+            models.append(IndexModel([tuple(pair) for pair in index["key"]], **options))
+        if not models:
+            return []
+        return await collection.create_indexes(models)
+
+    @staticmethod
+    def _public_record(record: dict) -> dict:
+        return {
+            "snapshot_id": record["snapshot_id"],
+            "status": record["status"],
+            "last_chunk": record.get("last_chunk", -1),
+            "resume_offset": record.get("resume_offset", 0),
+            "documents_inserted": record.get("documents_inserted", 0),
+            "documents_existing": record.get("documents_existing", 0),
+            "error": record.get("error"),
+            "updated_at": record.get("updated_at"),
+        }
+
+    @staticmethod
+    async def get_import(organization_name: str, snapshot_id: str) -> dict:
+        imports = db_manager.master_collection("snapshot_imports")
+        record = await imports.find_one({"organization_name": organization_name, "snapshot_id": snapshot_id})
+        if not record:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Import not found"
+            )
+        return SnapshotService._public_record(record)
+
+    @staticmethod
+    async def _claim_import(organization_name: str, manifest: dict, restart: bool) -> dict:
+        """Create or take over the import record of a snapshot, refusing concurrent imports"""
+        imports = db_manager.master_collection("snapshot_imports")
+        key = {"organization_name": organization_name, "snapshot_id": manifest["snapshot_id"]}
+        record = await imports.find_one(key)
+        now = datetime.utcnow()
+        if record is not None:
+            lease_cutoff = now - timedelta(seconds=settings.job_lease_seconds)
+            if record["status"] == IMPORT_RUNNING and record["updated_at"] > lease_cutoff:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="This snapshot is already being imported"
+                )
+            if record["status"] == IMPORT_COMPLETED and not restart:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="This snapshot was already imported; pass restart=true to import it again"
+                )
+        if record is None or restart:
+            record = {
+                **key,
+                "manifest": manifest,
+                "last_chunk": -1,
+                "resume_offset": 0,
+                "digest": None,
+                "documents_inserted": 0,
+                "documents_existing": 0,
+                "created_at": now,
+            }
+        record.update({"status": IMPORT_RUNNING, "error": None, "updated_at": now})
+        await imports.replace_one(key, record, upsert=True)
+        return record
+
+    @staticmethod
+    async def import_snapshot(
+        organization_name: str,
+        stream: AsyncIterator[bytes],
+        offset: int = 0,
+        snapshot_id: Optional[str] = None,
+        restart: bool = False,
+        build_indexes: bool = True
+    ) -> dict:
+        """Import a snapshot stream into the organization's collection.
+
+        Chunks are verified (CRC32 and the chained digest) and written in order by a writer
+        task while the next chunks are received; after each chunk the import record stores
+        the last written chunk and the byte offset just past it. A failed import resumes
+        either by sending the whole snapshot again (written chunks are skipped) or by
+        sending only the bytes from ``resume_offset`` with ``offset`` and ``snapshot_id``.
+        """
+        collection = await TenantDataService.resolve_collection(organization_name, for_write=True, operation="migration")
+        imports = db_manager.master_collection("snapshot_imports")
+        raw_documents = _raw_collection(collection) is not None
+
+        record: Optional[dict] = None
+        digest = b""
+        if offset:
+            if not snapshot_id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="snapshot_id is required to resume at an offset"
+                )
+            stored = await imports.find_one({"organization_name": organization_name, "snapshot_id": snapshot_id})
+            if stored is None or stored.get("resume_offset") != offset or stored.get("digest") is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Cannot resume at offset {offset}; expected {stored.get('resume_offset') if stored else 0}"
+                )
+            record = await SnapshotService._claim_import(organization_name, stored["manifest"], restart=False)
+            digest = bytes.fromhex(record["digest"])
+
+        frames = FrameReader(settings.snapshot_max_frame_bytes, start_offset=offset)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.snapshot_max_inflight_chunks)
+        errors: List[Exception] = []
+        progress = {"chunks": 0, "skipped": 0}
+
+        async def write_chunks():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                if errors:
+                    # Keep draining so the receiver never blocks on a full queue
+                    continue
+                sequence, payload, end_offset, chunk_chain = item
+                try:
+                    documents = await asyncio.to_thread(_decode, payload, record["manifest"]["compression"], raw_documents)
+                    inserted, existing = await SnapshotService._insert_documents(collection, documents)
+                    record["last_chunk"] = sequence
+                    record["resume_offset"] = end_offset
+                    record["digest"] = chunk_chain.hex()
+                    record["documents_inserted"] += inserted
+                    record["documents_existing"] += existing
+                    await imports.update_one({
+                        "organization_name": organization_name,
+                        "snapshot_id": record["snapshot_id"]
+                    }, {"$set": {
+                        "last_chunk": sequence,
+                        "resume_offset": end_offset,
+                        "digest": record["digest"],
+                        "documents_inserted": record["documents_inserted"],
+                        "documents_existing": record["documents_existing"],
+                        "updated_at": datetime.utcnow(),
+                    }})
+                    progress["chunks"] += 1
+                except Exception as e:
+                    errors.append(e)
+
+        writer = asyncio.create_task(write_chunks())
+        trailer: Optional[dict] = None
+        expected_sequence = record["last_chunk"] + 1 if record else 0
+        skip_through = -1
+        try:
+            async for data in stream:
+                for kind, payload, end_offset in frames.feed(data):
+                    if errors:
+                        break
+                    if kind == FRAME_MANIFEST:
+                        if record is not None:
+                            raise SnapshotError("Unexpected manifest frame")
+                        manifest = json_util.loads(payload)
+                        if manifest.get("format") != FORMAT_VERSION or manifest.get("compression") not in COMPRESSIONS:
+                            raise SnapshotError("Unsupported snapshot format or compression")
+                        if snapshot_id and manifest["snapshot_id"] != snapshot_id:
+                            raise SnapshotError("Snapshot id does not match snapshot_id")
+                        record = await SnapshotService._claim_import(organization_name, manifest, restart)
+                        # Chunks written by an earlier attempt are verified but not written again
+                        skip_through = record["last_chunk"]
+                        digest = hashlib.sha256(payload).digest()
+                    elif record is None:
+                        raise SnapshotError("Snapshot does not start with a manifest")
+                    elif trailer is not None:
+                        raise SnapshotError("Data after the end of the snapshot")
+                    elif kind == FRAME_CHUNK:
+                        sequence, _ = chunk_header(payload)
+                        if sequence != expected_sequence:
+                            raise SnapshotError(f"Expected chunk {expected_sequence}, got {sequence}")
+                        expected_sequence += 1
+                        digest = chain_digest(digest, await asyncio.to_thread(chunk_digest, payload))
+                        if sequence <= skip_through:
+                            progress["skipped"] += 1
+                            continue
+                        await queue.put((sequence, payload, end_offset, digest))
+                    else:
+                        trailer = json.loads(payload)
+                        if trailer.get("chunks") != expected_sequence or trailer.get("digest") != digest.hex():
+                            raise SnapshotError("Snapshot checksum mismatch")
+                if errors:
+                    break
+            if record is None:
+                raise SnapshotError("Empty snapshot")
+        except HTTPException:
+            raise
+        except (SnapshotError, ValueError) as e:
+            errors.insert(0, SnapshotError(str(e)))
+        except Exception as e:
+            # Client disconnects and read errors leave the import resumable
+            errors.insert(0, e)
+        finally:
+            await queue.put(None)
+            await writer
+
+        if record is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid snapshot: {errors[0]}"
+            )
+
+        key = {"organization_name": organization_name, "snapshot_id": record["snapshot_id"]}
+        if not errors and trailer is None:
+            errors.append(SnapshotError("Snapshot ended before its trailer"))
+        if errors:
+            error = errors[0]
+            record["status"] = IMPORT_FAILED if isinstance(error, SnapshotError) else IMPORT_INCOMPLETE
+            record["error"] = str(error)
+            await imports.update_one(key, {"$set": {
+                "status": record["status"],
+                "error": record["error"],
+                "updated_at": datetime.utcnow(),
+            }})
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST if isinstance(error, SnapshotError) else status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=(
+                    f"Import stopped: {error}. Chunks through {record['last_chunk']} are written; "
+                    f"resume with snapshot_id={record['snapshot_id']}&offset={record['resume_offset']}"
+                )
+            )
+
+        indexes_created: List[str] = []
+        if build_indexes:
+            try:
+                # Built after the data is loaded, which is much faster than maintaining them per insert
+                indexes_created = await SnapshotService._build_indexes(collection, record["manifest"].get("indexes", []))
+            except OperationFailure as e:
+                record["error"] = f"Index build failed: {e}"
+        record["status"] = IMPORT_COMPLETED
+        await imports.update_one(key, {"$set": {
+            "status": IMPORT_COMPLETED,
+            "error": record.get("error"),
+            "updated_at": datetime.utcnow(),
+        }})
+        return {
+            **SnapshotService._public_record({**record, "updated_at": datetime.utcnow()}),
+            "chunks_written": progress["chunks"],
+            "chunks_skipped": progress["skipped"],
+            "indexes_created": indexes_created,
+        }
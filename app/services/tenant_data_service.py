@@ -0,0 +1,291 @@
+from typing import Any, AsyncIterator, List, Optional, Tuple, Union
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from app.config import settings
+from app.database import db_manager
+from app.services.job_service import job_manager
+from app.services.organization_service import OrganizationService
+from fastapi import HTTPException, status
+
+# Operators that run server-side JavaScript are never accepted from clients
+FORBIDDEN_OPERATORS = {"$where", "$function", "$accumulator"}
+UPDATE_OPERATORS = {
+    "$set", "$unset", "$inc", "$mul", "$min", "$max", "$rename", "$currentDate",
+    "$setOnInsert", "$push", "$pull", "$pullAll", "$addToSet", "$pop"
+}
+
+WriteOperation = Union[InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany]
+
+
+def from_extended_json(value: Any) -> Any:
+    """Convert parsed MongoDB Extended JSON (``{"$oid": ...}``, ``{"$date": ...}``) to BSON values"""
+    if isinstance(value, dict):
+        return json_util.object_hook({key: from_extended_json(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [from_extended_json(item) for item in value]
+    return value
+
+
+def to_extended_json(document: dict) -> str:
+    """Relaxed Extended JSON, so ObjectIds and dates survive a round trip"""
+    return json_util.dumps(document, json_options=json_util.RELAXED_JSON_OPTIONS)
+
+
+def document_id(value: str):
+    """Path ids are ObjectIds when they look like one, plain strings otherwise"""
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return value
+
+
+def _check_operators(value: Any, where: str):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in FORBIDDEN_OPERATORS:
+                raise ValueError(f"{where}: operator {key} is not allowed")
+            _check_operators(item, where)
+    elif isinstance(value, list):
+        for item in value:
+            _check_operators(item, where)
+
+
+def validate_filter(query: Any, where: str = "filter") -> dict:
+    if not isinstance(query, dict):
+        raise ValueError(f"{where} must be an object")
+    _check_operators(query, where)
+    return query
+
+
+def validate_update(update: Any) -> dict:
+    """Updates are operator documents only (no replacement, no pipeline)"""
+    if not isinstance(update, dict) or not update:
+        raise ValueError("update must be a non-empty object of update operators")
+    unknown = [key for key in update if key not in UPDATE_OPERATORS]
+    if unknown:
+        raise ValueError(f"update: unsupported operator(s) {', '.join(unknown)}")
+    _check_operators(update, "update")
+    return update
+
+
+def validate_document(document: Any, where: str = "document") -> dict:
+    if not isinstance(document, dict):
+        raise ValueError(f"{where} must be an object")
+    if any(key.startswith("$") for key in document):
+        raise ValueError(f"{where}: field names must not start with '$'")
+    return document
+
+
+def parse_write_operation(raw: Any) -> WriteOperation:
+    """Build a pymongo write model from one bulk item.
+
+    Items are ``{"insert": doc}``, ``{"update": {"filter", "update", "upsert", "multi"}}``,
+    ``{"replace": {"filter", "replacement", "upsert"}}`` or ``{"delete": {"filter", "multi"}}``.
+    Raises ValueError with a client-facing message.
+    """
+    if not isinstance(raw, dict) or len(raw) != 1:
+        raise ValueError("Each operation must be an object with exactly one of insert, update, replace, delete")
+    kind, spec = next(iter(raw.items()))
+    spec = from_extended_json(spec)
+    if kind == "insert":
+        return InsertOne(validate_document(spec))
+    if not isinstance(spec, dict):
+        raise ValueError(f"{kind} must be an object")
+    query = validate_filter(spec.get("filter", {}))
+    multi = bool(spec.get("multi", False))
+    if multi and not query:
+        # Whole-collection writes go through the organization endpoints, not the data API
+        raise ValueError(f"{kind} with multi=true requires a non-empty filter")
+    if kind == "update":
+        update = validate_update(spec.get("update"))
+        upsert = bool(spec.get("upsert", False))
+        return UpdateMany(query, update, upsert=upsert) if multi else UpdateOne(query, update, upsert=upsert)
+    if kind == "replace":
+        replacement = validate_document(spec.get("replacement"), "replacement")
+        return ReplaceOne(query, replacement, upsert=bool(spec.get("upsert", False)))
+    if kind == "delete":
+        return DeleteMany(query) if multi else DeleteOne(query)
+    raise ValueError(f"Unknown operation: {kind}")
+
+
+class TenantDataService:
+    """Reads and writes against an organization's own collection"""
+
+    @staticmethod
+    async def resolve_collection(
+        organization_name: str,
+        for_write: bool = False,
+        operation: str = "metadata"
+    ) -> AsyncIOMotorCollection:
+        """Tenant collection of an organization, resolved through the cached organization record.
+
+        Writes are refused while a background job is moving or dropping the collection, since
+        they could land in a collection that is about to be replaced.
+        """
+        org_data = await OrganizationService.get_organization(organization_name)
+        if for_write and await job_manager.active_job_for(organization_name):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A background job is running for this organization; retry when it finishes"
+            )
+        return await db_manager.tenant_collection(org_data["org_collection_name"], operation)
+
+    @staticmethod
+    async def bulk_write(collection: AsyncIOMotorCollection, operations: List[Tuple[int, WriteOperation]]) -> dict:
+        """Unordered bulk write of one chunk of (request index, operation).
+
+        Failed operations do not stop the rest; their errors carry the request index.
+        """
+        requests = [operation for _, operation in operations]
+        try:
+            result = await collection.bulk_write(requests, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+        return {
+            "inserted": details.get("nInserted", 0),
+            "matched": details.get("nMatched", 0),
+            "modified": details.get("nModified", 0),
+            "deleted": details.get("nRemoved", 0),
+            "upserted": details.get("nUpserted", 0),
+            "errors": [
+                {
+                    "index": operations[error["index"]][0],
+                    "code": error.get("code"),
+                    "detail": error.get("errmsg", "Write failed")
+                }
+                for error in details.get("writeErrors", [])
+            ],
+        }
+
+    @staticmethod
+    async def insert_document(collection: AsyncIOMotorCollection, document: dict):
+        try:
+            result = await collection.insert_one(document)
+        except DuplicateKeyError as e:
+            # _id or a unique tenant index
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Duplicate key: {e.details.get('keyValue') if e.details else e}"
+            )
+        return result.inserted_id
+
+    @staticmethod
+    async def get_document(collection: AsyncIOMotorCollection, raw_id: str, projection: Optional[dict] = None) -> dict:
+        document = await collection.find_one({"_id": document_id(raw_id)}, projection)
+        if document is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document not found"
+            )
+        return document
+
+    @staticmethod
+    async def update_document(collection: AsyncIOMotorCollection, raw_id: str, update: dict) -> dict:
+        result = await collection.update_one({"_id": document_id(raw_id)}, update)
+        if result.matched_count == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document not found"
+            )
+        return {"matched": result.matched_count, "modified": result.modified_count}
+
+    @staticmethod
+    async def delete_document(collection: AsyncIOMotorCollection, raw_id: str) -> dict:
+        result = await collection.delete_one({"_id": document_id(raw_id)})
+        if result.deleted_count == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document not found"
+            )
+        return {"deleted": result.deleted_count}
+
+    @staticmethod
+    async def query(
+        collection: AsyncIOMotorCollection,
+        query: dict,
+        projection: Optional[dict],
+        sort: Optional[List[Tuple[str, int]]],
+        limit: int,
+        hint: Optional[Union[str, List[Tuple[str, int]]]],
+        max_time_ms: int
+    ) -> AsyncIterator[dict]:
+        """Stream matching documents one batch at a time.
+
+        ``limit`` and ``max_time_ms`` are enforced by the server, and at most one cursor
+        batch is held in memory. The first batch is fetched before returning, so a bad
+        filter or hint fails with 400 instead of in the middle of a streamed response.
+        """
+        options = {"hint": hint} if hint is not None else {}
+        cursor = None
+        try:
+            cursor = collection.find(
+                query,
+                projection,
+                sort=sort,
+                limit=limit,
+                batch_size=min(limit, settings.tenant_data_query_batch_size),
+                max_time_ms=max_time_ms,
+                **options
+            )
+            first = await cursor.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except OperationFailure as e:
+            if cursor is not None:
+                await cursor.close()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Query failed: {e.details.get('errmsg', str(e)) if e.details else str(e)}"
+            )
+        except BaseException:
+            # Network errors and cancellation must not leave the server cursor open until it times out
+            if cursor is not None:
+                await cursor.close()
+            raise
+
+        async def documents():
+            try:
+                if first is None:
+                    return
+                yield first
+                async for document in cursor:
+                    yield document
+            finally:
+                await cursor.close()
+
+        return documents()
+
+    @staticmethod
+    async def list_indexes(collection: AsyncIOMotorCollection) -> List[dict]:
+        indexes = []
+        async for index in collection.list_indexes():
+            indexes.append({
+                "name": index["name"],
+                "keys": list(index["key"].items()),
+                "unique": bool(index.get("unique", False))
+            })
+        return indexes
+
+    @staticmethod
+    async def create_index(collection: AsyncIOMotorCollection, keys: List[Tuple[str, int]], name: Optional[str], unique: bool) -> str:
+        """Create a tenant index, bounded by ``tenant_data_max_indexes`` per collection"""
+        existing = await TenantDataService.list_indexes(collection)
+        if len(existing) >= settings.tenant_data_max_indexes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.tenant_data_max_indexes} indexes per organization"
+            )
+        options = {"unique": unique}
+        if name:
+            options["name"] = name
+        try:
+            return await collection.create_index(keys, **options)
+        except OperationFailure as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not create index: {e.details.get('errmsg', str(e)) if e.details else str(e)}"
+            )
@@ -0,0 +1,416 @@
+import asyncio
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.audit import audit_log
+from app.auth.password import verify_password_async
+from app.auth.refresh_tokens import refresh_tokens
+from app.cache import org_cache
+from app.config import settings
+from app.database import db_manager
+from app.metrics import loop_lag_monitor, registry
+from app.tenancy import Placement
+from fastapi import HTTPException, status
+
+TRASH_PREFIX = "trash_"
+
+# Tombstone states: restorable, being restored, being purged
+TRASHED = "trashed"
+RESTORING = "restoring"
+PURGING = "purging"
+
+
+def _trash_collection():
+    return db_manager.master_collection("organization_trash")
+
+
+def _lease_deadline() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=settings.job_lease_seconds)
+
+
+class TrashService:
+    """Soft delete and restore of organizations.
+
+    Deleting moves the organization and admin records into a tombstone in ``organization_trash``
+    and renames the tenant collection to a trash name in the same database, which the server
+    does without touching the documents. The name and email are free again right away; the
+    data stays restorable until ``purge_after``, when ``TrashPurger`` removes it.
+    """
+
+    @staticmethod
+    async def trash_organization(organization_name: str, deleted_by: str) -> dict:
+        master_db = db_manager.get_master_db()
+        orgs_collection = master_db["organizations"]
+        admins_collection = master_db["admin_users"]
+
+        org_data = await orgs_collection.find_one({"organization_name": organization_name})
+        if not org_data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Organization not found"
+            )
+        admin_data = await admins_collection.find_one({"_id": ObjectId(org_data["admin_user_id"])})
+
+        now = datetime.utcnow()
+        tombstone_id = ObjectId()
+        org_collection_name = org_data["org_collection_name"]
+        # The trash collection stays where the tenant was placed, which the name alone no longer tells
+        placement = await db_manager.router.resolve(org_collection_name)
+        trash_name = f"{TRASH_PREFIX}{tombstone_id}"
+        trashed = await db_manager.trash_org_collection(org_collection_name, trash_name, placement)
+        tombstone = {
+            "_id": tombstone_id,
+            "organization_name": organization_name,
+            "org_collection_name": org_collection_name,
+            "placement": placement.to_dict(),
+            "trash_collection": trash_name if trashed else None,
+            "organization": org_data,
+            "admin": admin_data,
+            "deleted_by": deleted_by,
+            "deleted_at": now,
+            "purge_after": now + timedelta(hours=settings.trash_retention_hours),
+            "status": TRASHED,
+            "owner": None,
+            "lease_until": None,
+            "documents_purged": 0,
+        }
+
+        async def move_records(session):
+            await _trash_collection().insert_one(tombstone, session=session)
+            if admin_data:
+                await admins_collection.delete_one({"_id": admin_data["_id"]}, session=session)
+            await orgs_collection.delete_one({"_id": org_data["_id"]}, session=session)
+
+        try:
+            await db_manager.run_in_transaction(move_records)
+        except Exception:
+            if not db_manager.supports_transactions:
+                # Without a transaction, put back whatever was already moved
+                await _trash_collection().delete_one({"_id": tombstone_id})
+                for collection, document in ((admins_collection, admin_data), (orgs_collection, org_data)):
+                    if document:
+                        try:
+                            await collection.insert_one(document)
+                        except DuplicateKeyError:
+                            pass
+            if trashed:
+                await db_manager.restore_org_collection(org_collection_name, trash_name, placement)
+            raise
+        org_cache.invalidate(organization_name)
+        if admin_data:
+            await refresh_tokens.revoke_admin(str(admin_data["_id"]))
+
+        return {
+            "message": "Organization deleted successfully",
+            "organization_name": organization_name,
+            "restore_until": tombstone["purge_after"],
+        }
+
+    @staticmethod
+    async def restore_organization(organization_name: str, email: str, password: str) -> dict:
+        """Bring back the most recent deletion of this name whose admin had this email.
+
+        The deleted admin's credentials authorize the restore, since the admin's tokens were
+        revoked with the delete.
+        """
+        trash = _trash_collection()
+        tombstone = await trash.find_one(
+            {"organization_name": organization_name, "status": TRASHED, "admin.email": email},
+            sort=[("deleted_at", -1)]
+        )
+        # Same answer for an unknown name, email or password, as on login
+        admin_data = tombstone["admin"] if tombstone else None
+        if not admin_data or not await verify_password_async(password, admin_data["hashed_password"]):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid email or password"
+            )
+        if tombstone["purge_after"] <= datetime.utcnow():
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="The restore window for this organization has passed"
+            )
+
+        # Claiming the tombstone keeps the purger (and a concurrent restore) away from it
+        claimed = await trash.find_one_and_update(
+            {"_id": tombstone["_id"], "status": TRASHED},
+            {"$set": {"status": RESTORING, "lease_until": _lease_deadline()}}
+        )
+        if not claimed:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This organization is already being restored or purged"
+            )
+
+        try:
+            await TrashService._restore_records(tombstone)
+        except BaseException:
+            await trash.update_one(
+                {"_id": tombstone["_id"], "status": RESTORING},
+                {"$set": {"status": TRASHED, "lease_until": None}}
+            )
+            raise
+        await trash.delete_one({"_id": tombstone["_id"]})
+        org_cache.invalidate(organization_name)
+
+        org_data = tombstone["organization"]
+        await audit_log.record(
+            "organization.restored",
+            organization_name,
+            actor=str(admin_data["_id"]),
+            deleted_at=tombstone["deleted_at"]
+        )
+        return {
+            "organization_name": org_data["organization_name"],
+            "org_collection_name": org_data["org_collection_name"],
+            "admin_user_id": str(org_data["admin_user_id"]),
+            "created_at": org_data["created_at"],
+            "updated_at": org_data["updated_at"],
+            "version": org_data.get("version", 0)
+        }
+
+    @staticmethod
+    async def _restore_records(tombstone: dict):
+        master_db = db_manager.get_master_db()
+        orgs_collection = master_db["organizations"]
+        admins_collection = master_db["admin_users"]
+        org_data = tombstone["organization"]
+        admin_data = tombstone["admin"]
+        org_collection_name = tombstone["org_collection_name"]
+        placement = Placement.from_dict(tombstone.get("placement"))
+        if placement is not None:
+            org_data = {**org_data, "placement": placement.to_dict()}
+        conflict = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The organization name, its collection or the admin email has been taken since the delete"
+        )
+
+        if await db_manager.collection_exists(org_collection_name, use_registry=False, placement=placement):
+            raise conflict
+        trash_name = tombstone.get("trash_collection")
+        if trash_name:
+            await db_manager.restore_org_collection(org_collection_name, trash_name, placement)
+
+        async def insert_records(session):
+            try:
+                await admins_collection.insert_one(admin_data, session=session)
+            except DuplicateKeyError:
+                raise conflict
+            try:
+                await orgs_collection.insert_one(org_data, session=session)
+            except DuplicateKeyError:
+                if session is None:
+                    await admins_collection.delete_one({"_id": admin_data["_id"]})
+                raise conflict
+
+        try:
+            await db_manager.run_in_transaction(insert_records)
+        except BaseException:
+            if trash_name:
+                await db_manager.trash_org_collection(org_collection_name, trash_name, placement)
+            raise
+        if placement is not None:
+            db_manager.router.remember(org_collection_name, placement)
+
+    @staticmethod
+    async def recover_restore(tombstone: dict):
+        """Finish or undo a restore whose worker died before releasing its tombstone"""
+        master_db = db_manager.get_master_db()
+        orgs_collection = master_db["organizations"]
+        org_data = tombstone["organization"]
+        admin_data = tombstone["admin"]
+        org_collection_name = tombstone["org_collection_name"]
+        placement = Placement.from_dict(tombstone.get("placement"))
+        trash = _trash_collection()
+
+        if await orgs_collection.find_one({"_id": org_data["_id"]}, {"_id": 1}):
+            # The records are back; only the tombstone delete was lost
+            await trash.delete_one({"_id": tombstone["_id"], "status": RESTORING})
+            org_cache.invalidate(tombstone["organization_name"])
+            return
+
+        # Without a transaction the admin may have been inserted on its own
+        if admin_data:
+            await master_db["admin_users"].delete_one({"_id": admin_data["_id"]})
+        trash_name = tombstone.get("trash_collection")
+        if trash_name:
+            db = await db_manager.get_org_database(org_collection_name, placement)
+            renamed_back = not await db.list_collection_names(filter={"name": trash_name})
+            # Only move the collection back to the trash if no other organization has claimed its name since
+            if renamed_back and not await orgs_collection.find_one({"org_collection_name": org_collection_name}, {"_id": 1}):
+                await db_manager.trash_org_collection(org_collection_name, trash_name, placement)
+        await trash.update_one(
+            {"_id": tombstone["_id"], "status": RESTORING},
+            {"$set": {"status": TRASHED, "owner": None, "lease_until": None}}
+        )
+
+
+class TrashPurger:
+    """Background task removing trashed organizations once their restore window has passed.
+
+    One tombstone is claimed at a time under a lease, so several workers can run purgers.
+    Restores whose lease expired (the restoring worker crashed or was cancelled) are
+    finished or rolled back first, so their trash collections are not leaked.
+    Collections up to ``TRASH_PURGE_DROP_MAX_DOCUMENTS`` are dropped in one step; larger ones
+    are emptied in ``_id`` batches at ``TRASH_PURGE_DOCUMENTS_PER_SECOND`` before the drop, so
+    the database never sees one large drop. Purging only runs in the ``TRASH_PURGE_WINDOW``
+    and pauses while the event loop lags, i.e. while this worker is busy with requests.
+    """
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+        self.purged_organizations = 0
+        self.purged_documents = 0
+
+    def start(self):
+        if settings.trash_retention_hours <= 0 or settings.trash_purge_interval_seconds <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @staticmethod
+    def in_window(now: datetime) -> bool:
+        """Whether ``now`` (UTC) falls in the configured purge window"""
+        window = settings.trash_purge_window.strip()
+        if not window:
+            return True
+        start, end = (datetime.strptime(bound.strip(), "%H:%M").time() for bound in window.split("-"))
+        current = now.time()
+        if start <= end:
+            return start <= current < end
+        # Window across midnight, e.g. 22:00-04:00
+        return current >= start or current < end
+
+    def is_quiet(self) -> bool:
+        if not self.in_window(datetime.utcnow()):
+            return False
+        max_lag = settings.trash_purge_max_loop_lag_ms / 1000
+        return max_lag <= 0 or loop_lag_monitor.lag <= max_lag
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.trash_purge_interval_seconds)
+            try:
+                while await self.recover_next():
+                    pass
+                while self.is_quiet() and await self.purge_next():
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error purging trashed organizations: {e}")
+
+    async def recover_next(self) -> bool:
+        """Reclaim one abandoned restore; returns False when none is left"""
+        tombstone = await _trash_collection().find_one_and_update(
+            {"status": RESTORING, "lease_until": {"$lt": datetime.utcnow()}},
+            {"$set": {"owner": self.worker_id, "lease_until": _lease_deadline()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if tombstone is None:
+            return False
+        await TrashService.recover_restore(tombstone)
+        return True
+
+    async def purge_next(self) -> bool:
+        """Purge one expired tombstone; returns False when none is due"""
+        now = datetime.utcnow()
+        tombstone = await _trash_collection().find_one_and_update(
+            {
+                "status": {"$in": [TRASHED, PURGING]},
+                "purge_after": {"$lte": now},
+                "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]
+            },
+            {"$set": {"status": PURGING, "owner": self.worker_id, "lease_until": _lease_deadline()}},
+            sort=[("purge_after", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if tombstone is None:
+            return False
+        try:
+            await self._purge(tombstone)
+        except asyncio.CancelledError:
+            # Let another worker (or this one after a restart) resume right away
+            await _trash_collection().update_one({"_id": tombstone["_id"]}, {"$set": {"lease_until": None}})
+            raise
+        return True
+
+    async def _purge(self, tombstone: dict):
+        trash_name = tombstone.get("trash_collection")
+        documents = 0
+        if trash_name:
+            collection = await db_manager.trashed_collection(
+                tombstone["org_collection_name"],
+                trash_name,
+                Placement.from_dict(tombstone.get("placement"))
+            )
+            if await collection.estimated_document_count() > settings.trash_purge_drop_max_documents:
+                documents = await self._delete_in_batches(tombstone["_id"], collection)
+            await collection.drop()
+        await _trash_collection().delete_one({"_id": tombstone["_id"]})
+        self.purged_organizations += 1
+        await audit_log.record(
+            "organization.purged",
+            tombstone["organization_name"],
+            deleted_at=tombstone["deleted_at"],
+            documents_deleted_in_batches=documents
+        )
+
+    async def _delete_in_batches(self, tombstone_id: ObjectId, collection) -> int:
+        """Empty a trashed collection in throttled ``_id`` batches, pausing outside quiet periods"""
+        rate = settings.trash_purge_documents_per_second
+        deleted = 0
+        paced = 0
+        started = time.monotonic()
+        while True:
+            if not self.is_quiet():
+                while not self.is_quiet():
+                    await self._renew_lease(tombstone_id, 0)
+                    await asyncio.sleep(settings.trash_purge_interval_seconds)
+                # Do not catch up on the time spent paused
+                paced = 0
+                started = time.monotonic()
+
+            batch = await collection.find({}, {"_id": 1}).limit(settings.trash_purge_batch_size).to_list(None)
+            if not batch:
+                return deleted
+            result = await collection.delete_many({"_id": {"$in": [document["_id"] for document in batch]}})
+            deleted += result.deleted_count
+            paced += result.deleted_count
+            self.purged_documents += result.deleted_count
+            await self._renew_lease(tombstone_id, result.deleted_count)
+            if rate > 0:
+                ahead = paced / rate - (time.monotonic() - started)
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+
+    async def _renew_lease(self, tombstone_id: ObjectId, documents: int):
+        await _trash_collection().update_one(
+            {"_id": tombstone_id, "owner": self.worker_id},
+            {"$set": {"lease_until": _lease_deadline()}, "$inc": {"documents_purged": documents}}
+        )
+
+
+# Global trash purger
+trash_purger = TrashPurger()
+
+registry.counter(
+    "trash_purged_total",
+    "Trashed organizations and batch-deleted documents purged by this worker",
+    labels=("unit",),
+    callback=lambda: {
+        ("organizations",): trash_purger.purged_organizations,
+        ("documents",): trash_purger.purged_documents,
+    }
+)
@@ -0,0 +1,136 @@
+"""Tenant snapshot container format.
+
+A snapshot is a stream of frames after an 8-byte magic::
+
+    MAGIC
+    frame("M", manifest JSON)
+    frame("C", chunk) ...
+    frame("E", trailer JSON)
+
+A frame is a 1-byte kind, a little-endian uint32 payload length and the payload. A chunk
+payload is a header (sequence, document count, CRC32 and length of the uncompressed bytes)
+followed by the compressed concatenation of BSON documents, which carry their own length
+prefix. The trailer holds the chunk and document counts and a chained SHA-256 digest:
+``digest = sha256(manifest)``, then ``digest = sha256(digest + sha256(chunk payload))`` per
+chunk, so an import resumed part-way can keep verifying from the digest it stored.
+"""
+import hashlib
+import json
+import struct
+import zlib
+from typing import Iterator, List, Tuple
+
+MAGIC = b"OMSNAP\x00\x01"
+FORMAT_VERSION = 1
+FRAME_MANIFEST = b"M"
+FRAME_CHUNK = b"C"
+FRAME_END = b"E"
+FRAME_HEADER = struct.Struct("<cI")
+CHUNK_HEADER = struct.Struct("<IIII")  # sequence, documents, crc32, uncompressed length
+COMPRESSIONS = ("zlib", "none")
+
+
+class SnapshotError(ValueError):
+    """The stream is not a valid snapshot, or failed a checksum"""
+
+
+def frame_header(kind: bytes, length: int) -> bytes:
+    return FRAME_HEADER.pack(kind, length)
+
+
+def encode_frame(kind: bytes, payload: bytes) -> bytes:
+    return frame_header(kind, len(payload)) + payload
+
+
+def encode_json_frame(kind: bytes, data: dict) -> bytes:
+    return encode_frame(kind, json.dumps(data, separators=(",", ":")).encode())
+
+
+def encode_chunk(sequence: int, documents: int, raw: bytes, compression: str, level: int) -> bytes:
+    """Chunk payload for ``documents`` concatenated BSON documents (CPU-bound; run off the loop)"""
+    data = zlib.compress(raw, level) if compression == "zlib" else raw
+    return CHUNK_HEADER.pack(sequence, documents, zlib.crc32(raw), len(raw)) + data
+
+
+def chunk_header(payload: bytes) -> Tuple[int, int]:
+    """(sequence, document count) without decompressing"""
+    if len(payload) < CHUNK_HEADER.size:
+        raise SnapshotError("Chunk frame too short")
+    sequence, documents, _, _ = CHUNK_HEADER.unpack_from(payload)
+    return sequence, documents
+
+
+def decode_chunk(payload: bytes, compression: str) -> bytes:
+    """Uncompressed BSON bytes of a chunk, verified against its length and CRC32"""
+    sequence, _, crc, length = CHUNK_HEADER.unpack_from(payload)
+    data = payload[CHUNK_HEADER.size:]
+    try:
+        raw = zlib.decompress(data) if compression == "zlib" else data
+    except zlib.error as e:
+        raise SnapshotError(f"Chunk {sequence}: {e}")
+    if len(raw) != length or zlib.crc32(raw) != crc:
+        raise SnapshotError(f"Chunk {sequence}: checksum mismatch")
+    return raw
+
+
+def chunk_digest(payload: bytes) -> bytes:
+    return hashlib.sha256(payload).digest()
+
+
+def chain_digest(previous: bytes, payload_digest: bytes) -> bytes:
+    return hashlib.sha256(previous + payload_digest).digest()
+
+
+class FrameReader:
+    """Incremental frame parser over arbitrarily split input.
+
+    Buffers at most one frame (bounded by ``max_frame_bytes``) plus one input chunk.
+    A non-zero ``start_offset`` starts mid-stream, at a frame boundary.
+    """
+
+    def __init__(self, max_frame_bytes: int, start_offset: int = 0):
+        self.max_frame_bytes = max_frame_bytes
+        self._magic_pending = start_offset == 0
+        self._buffer = bytearray()
+        # Stream offset through the end of the last complete frame
+        self.offset = start_offset
+
+    def feed(self, data: bytes) -> List[Tuple[bytes, bytes, int]]:
+        """Return the (kind, payload, end offset) of every frame completed by ``data``"""
+        self._buffer += data
+        frames = []
+        position = 0
+        if self._magic_pending:
+            if len(self._buffer) < len(MAGIC):
+                return frames
+            if bytes(self._buffer[:len(MAGIC)]) != MAGIC:
+                raise SnapshotError("Not a snapshot (bad magic)")
+            position = len(MAGIC)
+            self._magic_pending = False
+        while len(self._buffer) - position >= FRAME_HEADER.size:
+            kind, length = FRAME_HEADER.unpack_from(self._buffer, position)
+            if kind not in (FRAME_MANIFEST, FRAME_CHUNK, FRAME_END):
+                raise SnapshotError(f"Unknown frame kind {kind!r}")
+            if length > self.max_frame_bytes:
+                raise SnapshotError(f"Frame of {length} bytes exceeds the {self.max_frame_bytes} byte limit")
+            end = position + FRAME_HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            frames.append((kind, bytes(self._buffer[position + FRAME_HEADER.size:end]), self.offset + end))
+            position = end
+        del self._buffer[:position]
+        self.offset += position
+        return frames
+
+    @property
+    def pending_bytes(self) -> int:
+        return len(self._buffer)
+
+
+def iter_frames(data: bytes, max_frame_bytes: int = 1 << 30) -> Iterator[Tuple[bytes, bytes]]:
+    """Frames of a complete in-memory snapshot (tools and benchmarks)"""
+    reader = FrameReader(max_frame_bytes)
+    for kind, payload, _ in reader.feed(data):
+        yield kind, payload
+    if reader.pending_bytes:
+        raise SnapshotError("Trailing partial frame")
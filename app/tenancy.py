@@ -0,0 +1,173 @@
+import hashlib
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from app.cache import TTLCache
+from app.config import settings
+from app.metrics import track_cache
+
+# MongoDB database names must be shorter than 64 bytes
+MAX_DATABASE_NAME_LENGTH = 63
+
+
+@dataclass(frozen=True)
+class Placement:
+    """Where a tenant collection lives: cluster index into the client pool and database name"""
+    cluster: int
+    database: str
+
+    def to_dict(self) -> dict:
+        """Form stored on the organization record"""
+        return {"cluster": self.cluster, "database": self.database}
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["Placement"]:
+        """Stored placement, or None for records written before placements were stored"""
+        if not data:
+            return None
+        return cls(cluster=data["cluster"], database=data["database"])
+
+
+class TenancyStrategy:
+    """Decides the placement of a tenant collection"""
+
+    def place(self, org_collection_name: str, cluster_count: int) -> Placement:
+        raise NotImplementedError
+
+
+class SharedDatabaseStrategy(TenancyStrategy):
+    """Every tenant collection lives in the master database"""
+
+    def place(self, org_collection_name: str, cluster_count: int) -> Placement:
+        return Placement(cluster=0, database=settings.master_db_name)
+
+
+class DatabasePerTenantStrategy(TenancyStrategy):
+    """Each tenant gets its own database on the primary cluster"""
+
+    def place(self, org_collection_name: str, cluster_count: int) -> Placement:
+        return Placement(cluster=0, database=self.database_name(org_collection_name))
+
+    @staticmethod
+    def database_name(org_collection_name: str) -> str:
+        """``<prefix><collection>``; names over MongoDB's limit are truncated and given a hash suffix"""
+        name = f"{settings.tenant_db_prefix}{org_collection_name}"
+        if len(name) <= MAX_DATABASE_NAME_LENGTH:
+            return name
+        digest = hashlib.sha1(name.encode()).hexdigest()[:12]
+        return f"{name[:MAX_DATABASE_NAME_LENGTH - len(digest) - 1]}_{digest}"
+
+
+class HashedPlacementStrategy(TenancyStrategy):
+    """Tenants are spread over a fixed number of databases, round-robined across clusters"""
+
+    def place(self, org_collection_name: str, cluster_count: int) -> Placement:
+        # crc32 is stable across processes, unlike the built-in hash()
+        bucket = zlib.crc32(org_collection_name.encode()) % settings.tenancy_hash_buckets
+        return Placement(
+            cluster=bucket % cluster_count,
+            database=f"{settings.tenant_db_prefix}{bucket:03d}"
+        )
+
+
+TENANCY_STRATEGIES: Dict[str, TenancyStrategy] = {
+    "shared": SharedDatabaseStrategy(),
+    "db_per_tenant": DatabasePerTenantStrategy(),
+    "hashed": HashedPlacementStrategy(),
+}
+
+
+class TenantRouter:
+    """Routes tenant collections to a database on one of a pool of cluster clients.
+
+    A tenant is placed by the strategy once, when it is created, and the placement is stored
+    on its organization record. Existing tenants are routed by that stored placement, so
+    changing ``TENANCY_STRATEGY``, ``TENANCY_HASH_BUCKETS`` or ``TENANT_CLUSTER_URLS`` only
+    affects new tenants. Organizations stored without a placement get the strategy's current
+    one written back on first use.
+    """
+
+    def __init__(self):
+        if settings.tenancy_strategy not in TENANCY_STRATEGIES:
+            raise ValueError(f"Unknown tenancy_strategy: {settings.tenancy_strategy}")
+        self.strategy = TENANCY_STRATEGIES[settings.tenancy_strategy]
+        self.clients: List[AsyncIOMotorClient] = []
+        # Stored placements keyed by collection name, sized like the collection registry
+        self.routes = TTLCache(
+            maxsize=settings.collection_registry_size,
+            ttl=settings.collection_registry_ttl_seconds,
+            name="tenant_routes"
+        )
+        track_cache(self.routes)
+
+    def connect(self, primary_client: AsyncIOMotorClient, **client_options):
+        """Use the primary client for cluster 0 and open one client per extra cluster"""
+        self.close_extra_clients()
+        self.routes.clear()
+        self.clients = [primary_client] + [
+            AsyncIOMotorClient(url, **client_options)
+            for url in settings.tenant_cluster_urls
+        ]
+
+    def close_extra_clients(self):
+        """Close clients owned by the router (the primary client belongs to DatabaseManager)"""
+        for client in self.clients[1:]:
+            client.close()
+        self.clients = []
+
+    def place(self, org_collection_name: str) -> Placement:
+        """Placement the strategy gives a new tenant collection"""
+        return self.strategy.place(org_collection_name, max(1, len(self.clients)))
+
+    def remember(self, org_collection_name: str, placement: Placement):
+        """Route a collection name to a placement, evicting other workers' stale routes for it"""
+        self.routes.invalidate(org_collection_name)
+        self.routes.set(org_collection_name, placement)
+
+    def forget(self, org_collection_name: str):
+        """Drop the route of a collection name that no longer belongs to its tenant"""
+        self.routes.invalidate(org_collection_name)
+
+    async def resolve(self, org_collection_name: str) -> Placement:
+        """Stored placement of a tenant collection (cached), or the strategy's for a new one"""
+        if not self.clients:
+            # Before connect() nothing can be looked up or memoized
+            return self.place(org_collection_name)
+        return await self.routes.get_or_load(org_collection_name, lambda: self._load(org_collection_name))
+
+    async def _load(self, org_collection_name: str) -> Placement:
+        # Reserved rename targets carry the placement of the collection being moved to
+        organizations = self.clients[0][settings.master_db_name]["organizations"]
+        org_data = await organizations.find_one(
+            {"org_collection_name": org_collection_name},
+            {"_id": 1, "placement": 1}
+        )
+        if org_data is None:
+            return self.place(org_collection_name)
+        placement = Placement.from_dict(org_data.get("placement"))
+        if placement is None:
+            # Pin the placement of an organization created before placements were stored
+            placement = self.place(org_collection_name)
+            await organizations.update_one(
+                {"_id": org_data["_id"], "placement": {"$exists": False}},
+                {"$set": {"placement": placement.to_dict()}}
+            )
+        return placement
+
+    async def get_database(
+        self,
+        org_collection_name: str,
+        placement: Optional[Placement] = None
+    ) -> Optional[AsyncIOMotorDatabase]:
+        """Database holding the tenant collection, or None before connect()"""
+        if not self.clients:
+            return None
+        if placement is None:
+            placement = await self.resolve(org_collection_name)
+        if placement.cluster >= len(self.clients):
+            raise RuntimeError(
+                f"{org_collection_name} is placed on cluster {placement.cluster}, "
+                f"but only {len(self.clients)} cluster(s) are configured"
+            )
+        return self.clients[placement.cluster][placement.database]
@@ -0,0 +1,48 @@
+"""Per-request overhead of the get_current_admin dependency, with and without the token cache.
+
+Usage:
+    python -m benchmarks.auth_overhead [--iterations 20000]
+"""
+import argparse
+import asyncio
+import json
+import time
+from fastapi.security import HTTPAuthorizationCredentials
+from app.auth.dependencies import get_current_admin
+from app.auth.jwt_handler import JWTHandler
+from app.auth.token_cache import token_cache
+
+
+async def measure(iterations: int, cache_size: int) -> float:
+    """Return mean microseconds per get_current_admin call"""
+    token = JWTHandler.create_admin_token("65a1f0c2e4b0a1b2c3d4e5f6", "Bench Org")
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    token_cache.maxsize = cache_size
+    token_cache.clear()
+
+    await get_current_admin(credentials)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await get_current_admin(credentials)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    original_size = token_cache.maxsize
+    uncached = asyncio.run(measure(args.iterations, 0))
+    cached = asyncio.run(measure(args.iterations, original_size or 10000))
+    print(json.dumps({
+        "benchmark": "auth_overhead",
+        "iterations": args.iterations,
+        "uncached_us_per_request": round(uncached, 2),
+        "cached_us_per_request": round(cached, 2),
+        "speedup": round(uncached / cached, 1) if cached else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Polling cost of /org/get with and without If-None-Match.
+
+Creates one organization, warms the metadata cache, then polls it repeatedly: once as a
+plain GET (200 with the serialized organization) and once revalidating with the last ETag
+(304, no body). Both are served from the metadata cache, so the difference is the
+serialization and response bytes a poll saves.
+
+Usage:
+    python -m benchmarks.conditional_get [--backend mock] [--iterations 5000]
+"""
+import argparse
+import asyncio
+import json
+import time
+from benchmarks.harness import BACKENDS, backend, http_client, set_bcrypt_rounds
+
+ORGANIZATION = {"organization_name": "Conditional Get Corp", "email": "etag@example.com", "password": "benchmark-pass"}
+
+
+async def poll(client, iterations: int, headers: dict) -> dict:
+    """Mean microseconds and body bytes per poll"""
+    body = {"organization_name": ORGANIZATION["organization_name"]}
+    size = 0
+    status = None
+    start = time.perf_counter()
+    for _ in range(iterations):
+        response = await client.request("GET", "/org/get", json=body, headers=headers)
+        status = response.status_code
+        size += len(response.content)
+    elapsed = time.perf_counter() - start
+    return {
+        "status": status,
+        "us_per_request": round(elapsed / iterations * 1e6, 1),
+        "body_bytes_per_request": size // iterations,
+    }
+
+
+async def run(backend_name: str, iterations: int) -> dict:
+    async with backend(backend_name), http_client() as client:
+        response = await client.post("/org/create", json=ORGANIZATION)
+        assert response.status_code in (201, 400), response.text
+        response = await client.request(
+            "GET", "/org/get", json={"organization_name": ORGANIZATION["organization_name"]}
+        )
+        etag = response.headers["etag"]
+        full = await poll(client, iterations, {})
+        revalidated = await poll(client, iterations, {"If-None-Match": etag})
+    return {
+        "benchmark": "conditional_get",
+        "backend": backend_name,
+        "iterations": iterations,
+        "full_get": full,
+        "if_none_match": revalidated,
+        "saved_us_per_request": round(full["us_per_request"] - revalidated["us_per_request"], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=BACKENDS, default="mock")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="bcrypt cost for creating the organization")
+    args = parser.parse_args()
+    set_bcrypt_rounds(args.bcrypt_rounds)
+    print(json.dumps(asyncio.run(run(args.backend, args.iterations)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
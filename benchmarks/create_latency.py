@@ -0,0 +1,115 @@
+"""End-to-end latency of organization creation: the pipelined service vs the old sequential steps.
+
+Runs against MONGODB_URL. Each mode creates ``--count`` organizations with at most
+``--concurrency`` in flight and reports p50/p99 latency; everything created is removed.
+
+Usage:
+    python -m benchmarks.create_latency [--count 200] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from app.auth.password import hash_password_async
+from app.database import db_manager
+from app.models.organization import AdminUser, Organization
+from app.services.organization_service import OrganizationService
+
+
+async def create_sequential(organization_name: str, email: str, password: str):
+    """Reference: every step waits for the previous one and there is no transaction"""
+    master_db = db_manager.get_master_db()
+    if await OrganizationService.organization_exists(organization_name):
+        raise RuntimeError("Organization name already exists")
+    if await OrganizationService.email_registered(email):
+        raise RuntimeError("Email already registered")
+    hashed_password = await hash_password_async(password)
+    admin_user = AdminUser(email=email, hashed_password=hashed_password, organization_name=organization_name)
+    await master_db["admin_users"].insert_one(admin_user.to_dict())
+    org_collection_name = OrganizationService.sanitize_org_name(organization_name)
+    await master_db["organizations"].insert_one(Organization(
+        organization_name=organization_name,
+        org_collection_name=org_collection_name,
+        admin_user_id=str(admin_user._id)
+    ).to_dict())
+    await db_manager.create_org_collection(org_collection_name)
+
+
+async def create_pipelined(organization_name: str, email: str, password: str):
+    await OrganizationService.create_organization(organization_name, email, password)
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def measure(create, label: str, count: int, concurrency: int) -> dict:
+    """Return latency percentiles in milliseconds for ``count`` creates"""
+    run_id = uuid.uuid4().hex[:8]
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with slots:
+            start = time.perf_counter()
+            await create(f"bench-{label}-{run_id}-{i}", f"bench-{label}-{run_id}-{i}@example.com", "bench-password")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(i) for i in range(count)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await cleanup(f"bench-{label}-{run_id}-")
+
+    return {
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "creates_per_second": round(count / elapsed, 1),
+    }
+
+
+async def cleanup(prefix: str):
+    master_db = db_manager.get_master_db()
+    async for org_data in master_db["organizations"].find(
+        {"organization_name": {"$regex": f"^{prefix}"}},
+        {"_id": 0, "org_collection_name": 1}
+    ):
+        await db_manager.delete_org_collection(org_data["org_collection_name"])
+    await master_db["organizations"].delete_many({"organization_name": {"$regex": f"^{prefix}"}})
+    await master_db["admin_users"].delete_many({"organization_name": {"$regex": f"^{prefix}"}})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    async def run() -> dict:
+        await db_manager.connect(bootstrap_indexes=False)
+        try:
+            sequential = await measure(create_sequential, "seq", args.count, args.concurrency)
+            pipelined = await measure(create_pipelined, "pipe", args.count, args.concurrency)
+        finally:
+            await db_manager.disconnect()
+        return {
+            "benchmark": "create_latency",
+            "count": args.count,
+            "concurrency": args.concurrency,
+            "transactions": db_manager.supports_transactions,
+            "sequential": sequential,
+            "pipelined": pipelined,
+            "p50_speedup": round(sequential["p50_ms"] / pipelined["p50_ms"], 2),
+            "p99_speedup": round(sequential["p99_ms"] / pipelined["p99_ms"], 2),
+        }
+
+    print(json.dumps(asyncio.run(run()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Shared plumbing for the benchmark suite: backends, latency recording, RSS and baselines."""
+import json
+import resource
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from app.audit import audit_log
+from app.auth.password import pwd_context
+from app.config import settings
+from app.database import db_manager
+from app.main import app
+
+BACKENDS = ("mock", "mongod")
+
+
+@asynccontextmanager
+async def backend(name: str):
+    """Point db_manager at a local mongod (MONGODB_URL) or an in-memory mongomock-motor client"""
+    if name == "mongod":
+        await db_manager.connect()
+    elif name == "mock":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("The mock backend needs mongomock-motor: pip install -r benchmarks/requirements.txt")
+        client = AsyncMongoMockClient()
+        db_manager.client = client
+        db_manager.master_db = client[settings.master_db_name]
+        db_manager.router.connect(client)
+        await db_manager.bootstrap_indexes()
+    else:
+        raise ValueError(f"Unknown backend: {name}")
+    # Lifespan events do not run in-process, so the audit writer is started here
+    await audit_log.start()
+    try:
+        yield
+    finally:
+        await audit_log.stop()
+        await db_manager.disconnect()
+
+
+def http_client():
+    """HTTP client that drives the FastAPI app in-process over ASGI"""
+    try:
+        import httpx
+    except ImportError:
+        sys.exit("The HTTP workload needs httpx: pip install -r benchmarks/requirements.txt")
+    # Every request comes from one in-process client, which per-IP limits would throttle
+    settings.admission_enabled = False
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+
+
+def set_bcrypt_rounds(rounds: Optional[int]):
+    """Lower the bcrypt cost so runs measure I/O instead of hashing (thread executor only)"""
+    if rounds:
+        pwd_context.update(bcrypt__rounds=rounds)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class LatencyRecorder:
+    """Collects per-operation latencies and errors for one scenario"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.started = time.perf_counter()
+
+    def record(self, op: str, seconds: float, ok: bool = True):
+        self.samples.setdefault(op, []).append(seconds * 1000)
+        if not ok:
+            self.errors[op] = self.errors.get(op, 0) + 1
+
+    @asynccontextmanager
+    async def timed(self, op: str):
+        """Record the latency of the block; an exception counts as an error and is swallowed"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(op, time.perf_counter() - start, ok=False)
+        else:
+            self.record(op, time.perf_counter() - start)
+
+    def report(self) -> dict:
+        """Throughput over the scenario's wall time plus p50/p95/p99 per operation"""
+        elapsed = time.perf_counter() - self.started
+        report = {}
+        for op, samples in self.samples.items():
+            report[op] = {
+                "count": len(samples),
+                "errors": self.errors.get(op, 0),
+                "throughput_ops_per_second": round(len(samples) / elapsed, 2),
+                "mean_ms": round(statistics.mean(samples), 3),
+                "p50_ms": round(percentile(samples, 50), 3),
+                "p95_ms": round(percentile(samples, 95), 3),
+                "p99_ms": round(percentile(samples, 99), 3),
+            }
+        return report
+
+
+def _flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def _higher_is_better(metric: str) -> bool:
+    return "per_second" in metric
+
+
+def _compared(metric: str) -> bool:
+    return metric.endswith("_ms") or _higher_is_better(metric) or metric.endswith("_mb")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> dict:
+    """Relative change of every latency, throughput and memory metric present in both runs"""
+    current = _flatten(results["scenarios"])
+    current["peak_rss_mb"] = results["peak_rss_mb"]
+    previous = _flatten(baseline["scenarios"])
+    previous["peak_rss_mb"] = baseline["peak_rss_mb"]
+
+    metrics = {}
+    regressions = []
+    for metric in sorted(set(current) & set(previous)):
+        if not _compared(metric) or not previous[metric]:
+            continue
+        change = (current[metric] - previous[metric]) / previous[metric]
+        worse = -change if _higher_is_better(metric) else change
+        metrics[metric] = {
+            "baseline": previous[metric],
+            "current": current[metric],
+            "change_pct": round(change * 100, 1),
+        }
+        if worse > tolerance:
+            regressions.append(metric)
+    return {"tolerance_pct": tolerance * 100, "metrics": metrics, "regressions": regressions}
+
+
+def load_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path: str, data: dict):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
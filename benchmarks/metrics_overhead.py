@@ -0,0 +1,66 @@
+"""Per-request cost of metrics recording: MetricsMiddleware around a no-op ASGI app.
+
+Usage:
+    python -m benchmarks.metrics_overhead [--iterations 100000]
+"""
+import argparse
+import asyncio
+import json
+import time
+from app.metrics import Histogram, MetricsMiddleware
+
+
+class _Route:
+    path = "/org/get"
+
+
+async def noop_app(scope, receive, send):
+    # Routing sets scope["route"]; the middleware reads it after the call
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def time_app(asgi_app, iterations: int) -> float:
+    """Return mean microseconds per request"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await asgi_app({"type": "http", "method": "GET", "path": "/org/get"}, receive, send)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def time_observe(iterations: int) -> float:
+    histogram = Histogram("bench_seconds", "benchmark", labels=("collection", "operation"))
+    start = time.perf_counter()
+    for _ in range(iterations):
+        histogram.observe(0.003, "organizations", "find")
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    bare = asyncio.run(time_app(noop_app, args.iterations))
+    instrumented = asyncio.run(time_app(MetricsMiddleware(noop_app), args.iterations))
+    print(json.dumps({
+        "benchmark": "metrics_overhead",
+        "iterations": args.iterations,
+        "bare_us_per_request": round(bare, 3),
+        "instrumented_us_per_request": round(instrumented, 3),
+        "middleware_overhead_us": round(instrumented - bare, 3),
+        "histogram_observe_us": round(time_observe(args.iterations), 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
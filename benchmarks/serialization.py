@@ -0,0 +1,123 @@
+"""Per-response cost of the default response_model path vs the fast JSON path.
+
+Two minimal FastAPI apps return the same organization through a route declared with
+``response_model``: one returns the pydantic model (FastAPI validates and encodes it
+again), the other goes through JSONResponder in fast mode. Requests are driven over raw
+ASGI, so the difference is the serialization cost.
+
+Usage:
+    python -m benchmarks.serialization [--iterations 20000]
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from fastapi import FastAPI
+from pydantic import TypeAdapter
+from app.responses import JSONResponder, orjson, serialize
+from app.schemas.organization import JobResponse, OrganizationResponse
+
+ORGANIZATION = {
+    "_id": "65a1f0c2e4b0a1b2c3d4e5f6",
+    "organization_name": "Acme Corp",
+    "org_collection_name": "org_acme_corp",
+    "admin_user_id": "65a1f0c2e4b0a1b2c3d4e5f7",
+    "created_at": datetime(2024, 1, 1, 12, 30, 15, 123456),
+    "updated_at": datetime(2024, 1, 2, 8, 0, 0, 654321),
+}
+JOB = {
+    "job_id": "65a1f0c2e4b0a1b2c3d4e5f8",
+    "job_type": "rename_organization",
+    "organization_name": "Acme Corp",
+    "status": "running",
+    "documents_total": 100000,
+    "documents_copied": 42000,
+    "throughput_docs_per_second": 5000.0,
+    "eta_seconds": 11.6,
+    "error": None,
+    "created_at": datetime(2024, 1, 1, 12, 30, 15),
+    "updated_at": datetime(2024, 1, 1, 12, 30, 23),
+    "finished_at": None,
+}
+
+
+def build_app(fast: bool) -> FastAPI:
+    app = FastAPI()
+    responder = JSONResponder("benchmark")
+    responder.fast = fast
+
+    @app.get("/organization", response_model=OrganizationResponse)
+    async def organization():
+        return responder.model(OrganizationResponse, ORGANIZATION)
+
+    @app.get("/job", response_model=JobResponse)
+    async def job():
+        return responder.model(JobResponse, JOB)
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, iterations: int) -> float:
+    """Return mean microseconds per request"""
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message["body"])
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "server": ("benchmark", 80), "client": ("benchmark", 1),
+    }
+    await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    elapsed = (time.perf_counter() - start) / iterations * 1e6
+    assert json.loads(body[-1])["organization_name"] == "Acme Corp"
+    return elapsed
+
+
+def measure_serializers(model, data: dict, iterations: int) -> dict:
+    """Serialization alone: FastAPI's steps (model, re-validation, JSON-mode dump, json.dumps) vs serialize()"""
+    response_field = TypeAdapter(model)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        value = response_field.validate_python(model(**data))
+        json.dumps(response_field.dump_python(value, mode="json"), separators=(",", ":")).encode()
+    default = (time.perf_counter() - start) / iterations * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        serialize(model, data)
+    fast = (time.perf_counter() - start) / iterations * 1e6
+    return {"default_us": round(default, 2), "fast_us": round(fast, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    default_app = build_app(fast=False)
+    fast_app = build_app(fast=True)
+    report = {"benchmark": "serialization", "iterations": args.iterations, "orjson": orjson is not None}
+    for path in ("/organization", "/job"):
+        default = asyncio.run(measure(default_app, path, args.iterations))
+        fast = asyncio.run(measure(fast_app, path, args.iterations))
+        model, data = (OrganizationResponse, ORGANIZATION) if path == "/organization" else (JobResponse, JOB)
+        report[path.strip("/")] = {
+            "default_us_per_response": round(default, 2),
+            "fast_us_per_response": round(fast, 2),
+            "saved_us_per_response": round(default - fast, 2),
+            "serializer_only": measure_serializers(model, data, args.iterations),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Throughput of the snapshot format: chunk encoding (compression, CRC32, digest) and decoding.
+
+Synthetic tenant documents are encoded into chunks exactly as export does and decoded as
+import does, without a database, so the numbers are the format's ceiling. Compare them with
+the disk or network bandwidth the export has to feed.
+
+Usage:
+    python -m benchmarks.snapshot [--megabytes 256] [--level 1]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+import bson
+from app.config import settings
+from app.services.snapshot_service import _decode, _encode
+
+
+def make_documents(total_bytes: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    documents = []
+    size = 0
+    while size < total_bytes:
+        raw = bson.encode({
+            "_id": bson.ObjectId(),
+            "sku": f"SKU-{rng.randrange(1_000_000):07d}",
+            "qty": rng.randrange(1000),
+            "price": round(rng.uniform(1, 500), 2),
+            "tags": rng.sample(["red", "blue", "green", "sale", "new", "bulk"], 3),
+            "note": "lorem ipsum dolor sit amet " * rng.randrange(1, 8),
+            "updated_at": datetime(2024, 1, 1),
+        })
+        documents.append(raw)
+        size += len(raw)
+    return documents
+
+
+def chunks_of(documents: list, chunk_bytes: int) -> list:
+    chunks, parts, size = [], [], 0
+    for raw in documents:
+        parts.append(raw)
+        size += len(raw)
+        if size >= chunk_bytes:
+            chunks.append((len(parts), b"".join(parts)))
+            parts, size = [], 0
+    if parts:
+        chunks.append((len(parts), b"".join(parts)))
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--megabytes", type=int, default=256)
+    parser.add_argument("--level", type=int, default=settings.snapshot_compression_level)
+    parser.add_argument("--chunk-bytes", type=int, default=settings.snapshot_chunk_bytes)
+    args = parser.parse_args()
+
+    chunks = chunks_of(make_documents(args.megabytes * 1024 * 1024), args.chunk_bytes)
+    raw_bytes = sum(len(raw) for _, raw in chunks)
+    report = {"benchmark": "snapshot", "raw_mb": round(raw_bytes / 1e6, 1), "chunks": len(chunks)}
+    for compression in ("none", "zlib"):
+        start = time.perf_counter()
+        payloads = [_encode(sequence, count, raw, compression, args.level)[0] for sequence, (count, raw) in enumerate(chunks)]
+        encode_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for payload in payloads:
+            _decode(payload, compression, raw_documents=True)
+        decode_seconds = time.perf_counter() - start
+        report[compression] = {
+            "snapshot_mb": round(sum(len(payload) for payload in payloads) / 1e6, 1),
+            "encode_mb_per_second": round(raw_bytes / 1e6 / encode_seconds, 1),
+            "decode_mb_per_second": round(raw_bytes / 1e6 / decode_seconds, 1),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
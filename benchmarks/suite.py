@@ -0,0 +1,279 @@
+"""Reproducible benchmark and load-test suite.
+
+Drives the FastAPI app in-process over ASGI against a local mongod or a mongomock-motor
+stand-in, seeds tenants, runs a mixed create/get/login/refresh/rename/delete workload and times
+OrganizationService, DatabaseManager.copy_collection_data and the auth path on their own.
+Prints throughput, p50/p95/p99 and peak RSS as JSON and compares them with a stored baseline.
+
+Usage:
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.suite --backend mock --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --backend mock --baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import sys
+import time
+import uuid
+from bson import ObjectId
+from fastapi.security import HTTPAuthorizationCredentials
+from app.auth.dependencies import get_current_admin
+from app.auth.jwt_handler import JWTHandler
+from app.auth.token_cache import token_cache
+from app.cache import org_cache
+from app.database import db_manager
+from app.services.organization_service import OrganizationService
+from benchmarks.harness import (
+    BACKENDS,
+    LatencyRecorder,
+    backend,
+    compare,
+    http_client,
+    load_json,
+    peak_rss_mb,
+    set_bcrypt_rounds,
+    write_json,
+)
+
+SCENARIOS = ("http", "service", "copy", "auth")
+PASSWORD = "benchmark-password"
+
+# Share of --ops per operation in the mixed HTTP workload
+WORKLOAD_MIX = {"get": 0.4, "login": 0.1, "refresh": 0.15, "create": 0.15, "update_rename": 0.1, "delete": 0.1}
+# Tenants holding a refresh token for the "refresh" operation (each costs one login to set up)
+REFRESH_SESSIONS = 10
+
+
+def tenant(run_id: str, label: str, i: int) -> dict:
+    return {
+        "organization_name": f"bench-{run_id}-{label}-{i}",
+        "email": f"bench-{run_id}-{label}-{i}@example.com",
+        "password": PASSWORD,
+    }
+
+
+async def seed_documents(org_collection_name: str, count: int):
+    """Fill a tenant collection with ``count`` small documents"""
+    collection = (await db_manager.get_org_database(org_collection_name))[org_collection_name]
+    for start in range(0, count, 1000):
+        await collection.insert_many([
+            {"seq": i, "payload": "x" * 128} for i in range(start, min(count, start + 1000))
+        ])
+
+
+async def login(client, item: dict) -> dict:
+    response = await client.post("/admin/login", json={"email": item["email"], "password": item["password"]})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run_http(args, run_id: str) -> dict:
+    """Seed tenants through /org/bulk-create, then run the mixed workload over ASGI"""
+    rng = random.Random(args.seed)
+    counts = {op: max(1, int(args.ops * share)) for op, share in WORKLOAD_MIX.items()}
+    stable = [tenant(run_id, "t", i) for i in range(args.tenants)]
+    renamed = [tenant(run_id, "r", i) for i in range(counts["update_rename"])]
+    deleted = [tenant(run_id, "d", i) for i in range(counts["delete"])]
+
+    async with http_client() as client:
+        seed_start = time.perf_counter()
+        response = await client.post("/org/bulk-create", json=stable + renamed + deleted)
+        response.raise_for_status()
+        seed_seconds = time.perf_counter() - seed_start
+        # Rename targets cycle through the requested collection sizes
+        for i, item in enumerate(renamed):
+            item["size"] = args.collection_sizes[i % len(args.collection_sizes)]
+            await seed_documents(OrganizationService.sanitize_org_name(item["organization_name"]), item["size"])
+        headers = {}
+        for item in renamed + deleted:
+            headers[item["organization_name"]] = await login(client, item)
+        sessions = []
+        for item in stable[:REFRESH_SESSIONS]:
+            response = await client.post("/admin/login", json={"email": item["email"], "password": item["password"]})
+            response.raise_for_status()
+            sessions.append({"refresh_token": response.json()["refresh_token"]})
+
+        ops = []
+        ops += [("get", rng.choice(stable)) for _ in range(counts["get"])]
+        ops += [("login", rng.choice(stable)) for _ in range(counts["login"])]
+        ops += [("refresh", rng.choice(sessions)) for _ in range(counts["refresh"])]
+        ops += [("create", tenant(run_id, "c", i)) for i in range(counts["create"])]
+        ops += [("update_rename", item) for item in renamed]
+        ops += [("delete", item) for item in deleted]
+        rng.shuffle(ops)
+
+        recorder = LatencyRecorder()
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def run_op(op: str, item: dict):
+            async with slots:
+                label = f"update_rename_{item['size']}_docs" if op == "update_rename" else op
+                async with recorder.timed(label):
+                    if op == "get":
+                        response = await client.request(
+                            "GET", "/org/get", json={"organization_name": item["organization_name"]}
+                        )
+                    elif op == "login":
+                        response = await client.post(
+                            "/admin/login", json={"email": item["email"], "password": item["password"]}
+                        )
+                    elif op == "refresh":
+                        response = await client.post("/admin/refresh", json=item)
+                    elif op == "create":
+                        response = await client.post("/org/create", json=item)
+                    elif op == "update_rename":
+                        response = await client.put("/org/update", headers=headers[item["organization_name"]], json={
+                            "organization_name": item["organization_name"],
+                            "new_organization_name": f"{item['organization_name']}-renamed",
+                            "email": item["email"],
+                            "password": item["password"],
+                        })
+                    else:
+                        response = await client.request(
+                            "DELETE", "/org/delete", headers=headers[item["organization_name"]],
+                            json={"organization_name": item["organization_name"]}
+                        )
+                    response.raise_for_status()
+
+        await asyncio.gather(*(run_op(op, item) for op, item in ops))
+        report = recorder.report()
+        report["seed"] = {"tenants": len(stable) + len(renamed) + len(deleted), "seconds": round(seed_seconds, 3)}
+        return report
+
+
+async def run_service(args, run_id: str) -> dict:
+    """OrganizationService without the HTTP layer"""
+    recorder = LatencyRecorder()
+    items = [tenant(run_id, "s", i) for i in range(args.service_ops)]
+    current_admins = {item["organization_name"]: {"organization_name": item["organization_name"]} for item in items}
+    for item in items:
+        async with recorder.timed("create_organization"):
+            await OrganizationService.create_organization(**item)
+    for item in items:
+        org_cache.clear()
+        async with recorder.timed("get_organization_uncached"):
+            await OrganizationService.get_organization(item["organization_name"])
+        async with recorder.timed("get_organization_cached"):
+            await OrganizationService.get_organization(item["organization_name"])
+    for item in items:
+        async with recorder.timed("authenticate_admin"):
+            await OrganizationService.authenticate_admin(item["email"], item["password"])
+    for item in items:
+        async with recorder.timed("delete_organization"):
+            await OrganizationService.delete_organization(
+                item["organization_name"], current_admins[item["organization_name"]]
+            )
+    return recorder.report()
+
+
+async def run_copy(args, run_id: str) -> dict:
+    """DatabaseManager.copy_collection_data per collection size"""
+    report = {}
+    for size in args.collection_sizes:
+        recorder = LatencyRecorder()
+        source = f"org_bench_{run_id}_copy_{size}"
+        await seed_documents(source, size)
+        for repeat in range(args.copy_repeats):
+            target = f"{source}_{repeat}"
+            async with recorder.timed("copy"):
+                if not await db_manager.copy_collection_data(source, target):
+                    raise RuntimeError(f"copy of {source} failed")
+            await db_manager.delete_org_collection(target)
+        await db_manager.delete_org_collection(source)
+        result = recorder.report()["copy"]
+        result["docs_per_second"] = round(size / (result["p50_ms"] / 1000), 1) if result["p50_ms"] else None
+        report[f"copy_{size}_docs"] = result
+    return report
+
+
+async def run_auth(args, run_id: str) -> dict:
+    """get_current_admin with the verified-token cache disabled and enabled"""
+    token = JWTHandler.create_admin_token(str(ObjectId()), f"bench-{run_id}")
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    original_size = token_cache.maxsize
+    recorder = LatencyRecorder()
+    try:
+        for label, cache_size in (("uncached", 0), ("cached", original_size or 10000)):
+            token_cache.maxsize = cache_size
+            token_cache.clear()
+            await get_current_admin(credentials)
+            for _ in range(args.auth_ops):
+                async with recorder.timed(f"get_current_admin_{label}"):
+                    await get_current_admin(credentials)
+    finally:
+        token_cache.maxsize = original_size
+        token_cache.clear()
+    return recorder.report()
+
+
+RUNNERS = {"http": run_http, "service": run_service, "copy": run_copy, "auth": run_auth}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=BACKENDS, default="mock")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--tenants", type=int, default=50, help="seeded tenants for the mixed workload")
+    parser.add_argument("--ops", type=int, default=200, help="operations in the mixed workload")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--collection-sizes", default="0,1000,10000", help="documents per renamed/copied collection")
+    parser.add_argument("--service-ops", type=int, default=20)
+    parser.add_argument("--copy-repeats", type=int, default=3)
+    parser.add_argument("--auth-ops", type=int, default=5000)
+    parser.add_argument("--bcrypt-rounds", type=int, default=None, help="override the bcrypt cost (e.g. 4)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the results to this file")
+    parser.add_argument("--baseline", help="compare against a stored baseline")
+    parser.add_argument("--save-baseline", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression (0.10 = 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    args.collection_sizes = [int(size) for size in args.collection_sizes.split(",")]
+    return args
+
+
+def main():
+    args = parse_args()
+    set_bcrypt_rounds(args.bcrypt_rounds)
+    run_id = uuid.uuid4().hex[:8]
+
+    async def run() -> dict:
+        scenarios = {}
+        # The app logs with print(); keep stdout for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            async with backend(args.backend):
+                for name in args.scenarios:
+                    scenarios[name] = await RUNNERS[name](args, run_id)
+        return scenarios
+
+    results = {
+        "benchmark": "suite",
+        "backend": args.backend,
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "baseline", "save_baseline", "fail_on_regression")
+        },
+        "scenarios": asyncio.run(run()),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if args.baseline:
+        results["comparison"] = compare(results, load_json(args.baseline), args.tolerance)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        write_json(args.output, results)
+    if args.save_baseline:
+        write_json(args.save_baseline, results)
+    if args.fail_on_regression and results.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
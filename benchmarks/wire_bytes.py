@@ -0,0 +1,136 @@
+"""Bytes returned by MongoDB lookups per endpoint, checked against the declared projections.
+
+Runs the create/login/get/update/delete flow through OrganizationService against
+MONGODB_URL and records every ``find`` reply with a pymongo CommandListener. Exits
+non-zero when an endpoint receives a field its projections do not declare, or when
+its find replies exceed a ``--budget``.
+
+Usage:
+    python -m benchmarks.wire_bytes [--budget get=400 --budget login=400 ...]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from collections import defaultdict
+import bson
+from pymongo import monitoring
+from app.cache import org_cache
+from app.database import db_manager
+from app.services.organization_service import PROJECTIONS, OrganizationService
+
+
+def _fields(*projections: str) -> set:
+    fields = set()
+    for name in projections:
+        projection = PROJECTIONS[name]
+        fields.update(field for field, included in projection.items() if included)
+        if projection.get("_id", 1):
+            fields.add("_id")
+    return fields
+
+
+# Fields each endpoint may read from the master database
+ALLOWED_FIELDS = {
+    "create": _fields("organization_exists", "email_exists"),
+    "login": _fields("admin_login"),
+    "get": _fields("organization_public"),
+    "update": _fields("organization_ownership", "organization_public"),
+    "delete": _fields("organization_ownership"),
+}
+
+
+class FindReplyListener(monitoring.CommandListener):
+    """Accumulates find reply sizes and returned field names for the current endpoint"""
+
+    def __init__(self):
+        self.endpoint = None
+        self.commands = defaultdict(int)
+        self.reply_bytes = defaultdict(int)
+        self.fields = defaultdict(set)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if self.endpoint is None or event.command_name not in ("find", "getMore"):
+            return
+        self.commands[self.endpoint] += 1
+        self.reply_bytes[self.endpoint] += len(bson.encode(event.reply))
+        cursor = event.reply.get("cursor", {})
+        for doc in cursor.get("firstBatch", cursor.get("nextBatch", [])):
+            self.fields[self.endpoint].update(doc)
+
+    def failed(self, event):
+        pass
+
+
+async def run_flow(listener: FindReplyListener):
+    suffix = uuid.uuid4().hex[:12]
+    organization_name = f"wire-bytes-{suffix}"
+    email = f"wire-{suffix}@example.com"
+    password = "wire-bytes-password"
+    current_admin = {"organization_name": organization_name}
+
+    listener.endpoint = "create"
+    await OrganizationService.create_organization(organization_name, email, password)
+    listener.endpoint = "login"
+    await OrganizationService.authenticate_admin(email, password)
+    listener.endpoint = "get"
+    # Measure the database read, not a cache hit
+    org_cache.clear()
+    await OrganizationService.get_organization(organization_name)
+    listener.endpoint = "update"
+    await OrganizationService.update_organization(organization_name, email, password, current_admin)
+    listener.endpoint = "delete"
+    await OrganizationService.delete_organization(organization_name, current_admin)
+    listener.endpoint = None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="ENDPOINT=BYTES",
+        help="maximum find reply bytes for an endpoint"
+    )
+    args = parser.parse_args()
+    budgets = {endpoint: int(limit) for endpoint, limit in (b.split("=", 1) for b in args.budget)}
+
+    listener = FindReplyListener()
+    # Registered before connect() so the client picks it up
+    monitoring.register(listener)
+
+    async def run():
+        await db_manager.connect(bootstrap_indexes=False)
+        try:
+            await run_flow(listener)
+        finally:
+            await db_manager.disconnect()
+
+    asyncio.run(run())
+
+    report = {}
+    failures = []
+    for endpoint, allowed in ALLOWED_FIELDS.items():
+        unexpected = sorted(listener.fields[endpoint] - allowed)
+        report[endpoint] = {
+            "find_commands": listener.commands[endpoint],
+            "find_reply_bytes": listener.reply_bytes[endpoint],
+            "fields": sorted(listener.fields[endpoint]),
+        }
+        if unexpected:
+            failures.append(f"{endpoint}: unexpected fields {unexpected}")
+        if endpoint in budgets and listener.reply_bytes[endpoint] > budgets[endpoint]:
+            failures.append(f"{endpoint}: {listener.reply_bytes[endpoint]} bytes > budget {budgets[endpoint]}")
+
+    print(json.dumps({"benchmark": "wire_bytes", "endpoints": report, "failures": failures}, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()